@@ -1,14 +1,16 @@
 from flask import Flask
 from config import config
 from database.connection import close_db_connection
-from routes import web_bp, api_bp
-import google.generativeai as genai
+from routes import web_bp, api_bp, metrics_bp
 from routes.forecast_routes import forecast_bp
+from utils.log import configure_logging
+from utils.serialization import compress_response
 
 def create_app(config_name='default'):
     '''Application factory pattern'''
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    configure_logging(app.config['LOG_LEVEL'], app.config['LOG_FORMAT'])
     
     # Register teardown
     app.teardown_appcontext(close_db_connection)
@@ -17,6 +19,10 @@ def create_app(config_name='default'):
     app.register_blueprint(web_bp)
     app.register_blueprint(api_bp)
     app.register_blueprint(forecast_bp)
+    app.register_blueprint(metrics_bp)
+    
+    # br/gzip response bodies, negotiated per request
+    app.after_request(compress_response)
     
     return app
 
@@ -35,11 +41,6 @@ if __name__ == '__main__':
     print(f"   Gemini Model: {app.config['GEMINI_MODEL']}")
     print(f"\\n🌐 Server running at: http://localhost:5000")
     print("=" * 60)
-
-    print("Available Gemini models for generateContent:")
-    # for m in genai.list_models():
-    #     if 'generateContent' in m.supported_generation_methods:
-    #         print(m.name)
     
     app.run(
         debug=app.config['DEBUG'],
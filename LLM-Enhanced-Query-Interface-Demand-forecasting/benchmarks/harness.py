@@ -0,0 +1,117 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+def time_call(fn, repeat=5, warmup=1):
+    '''
+    Time repeated calls of fn
+
+    Returns:
+        dict with min/median/mean/p95/max seconds and the repeat count
+    '''
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    ordered = sorted(samples)
+    return {
+        'repeat': repeat,
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        'max': ordered[-1]
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+class BenchmarkSuite:
+    '''Named benchmark cases, run in order and written to one JSON document'''
+
+    def __init__(self, metadata=None):
+        self.metadata = metadata or {}
+        self.cases = []
+        self.results = {}
+
+    def add(self, name, fn, repeat=5, warmup=1):
+        '''
+        Register a case
+
+        Args:
+            name: Dotted case name, e.g. 'data.get_sales_data'
+            fn: Zero-argument callable to time
+        '''
+        self.cases.append((name, fn, repeat, warmup))
+
+    def run(self, pattern=None, verbose=True):
+        for name, fn, repeat, warmup in self.cases:
+            if pattern and pattern not in name:
+                continue
+            try:
+                result = time_call(fn, repeat, warmup)
+            except Exception as e:
+                result = {'error': f"{type(e).__name__}: {e}"}
+            self.results[name] = result
+            if verbose:
+                if 'error' in result:
+                    print(f"  ❌ {name:<45} {result['error']}")
+                else:
+                    print(f"  {name:<45} median {result['median'] * 1000:10.2f} ms  "
+                          f"p95 {result['p95'] * 1000:10.2f} ms  (n={repeat})")
+        return self.results
+
+    def to_dict(self):
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            **self.metadata,
+            'results': self.results
+        }
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+def compare(baseline, current, threshold=0.10):
+    '''
+    Median-time ratios between two result documents
+
+    Returns:
+        list of (case, baseline_median, current_median, ratio, flag) where
+        flag is 'slower'/'faster' beyond threshold, else ''
+    '''
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'median' not in before or 'median' not in result:
+            continue
+        ratio = result['median'] / before['median'] if before['median'] else float('inf')
+        flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        rows.append((name, before['median'], result['median'], ratio, flag))
+    return rows
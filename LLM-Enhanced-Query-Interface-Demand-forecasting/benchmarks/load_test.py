@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from benchmarks.harness import git_revision
+from benchmarks.synthetic_m5 import generate_synthetic_m5
+
+QUESTIONS = [
+    'What are the top selling items?',
+    'Show total sales by store',
+    'Which categories sell the most?',
+    'What is the daily sales trend?',
+    'Which items have the highest prices?',
+    'How many items are there?',
+]
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_load(make_call, total_requests, concurrency):
+    '''
+    Issue total_requests calls from concurrency worker threads
+
+    Args:
+        make_call: Called once per worker thread; returns the
+                   callable(i) -> bool (success) that worker uses
+
+    Returns:
+        dict with throughput, error rate and latency percentiles (ms)
+    '''
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def worker(i):
+        nonlocal errors
+        if not hasattr(local, 'call'):
+            local.call = make_call()
+        start = time.perf_counter()
+        try:
+            ok = local.call(i)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(total_requests)))
+    wall = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'wall_seconds': wall,
+        'throughput_rps': total_requests / wall if wall else None,
+        'error_rate': errors / total_requests if total_requests else 0.0,
+        **{f'p{int(q * 100)}_ms': percentile(ordered, q) * 1000 for q in (0.5, 0.95, 0.99)},
+        'max_ms': ordered[-1] * 1000 if ordered else None
+    }
+
+def query_caller(app):
+    '''POST /api/query with rotating questions, one test client per thread'''
+    def make_call():
+        client = app.test_client()
+
+        def call(i):
+            response = client.post('/api/query', json={
+                'query': QUESTIONS[i % len(QUESTIONS)], 'include_raw_data': False
+            })
+            return response.status_code == 200
+        return call
+    return make_call
+
+def summary_caller(app, n_series):
+    '''NLGSummarizer.generate_forecast_summary over n_series distinct inputs'''
+    from nlg.summarizer import NLGSummarizer, _summary_cache
+
+    # Each run starts cold so concurrency levels are comparable
+    _summary_cache.clear()
+
+    def make_call():
+        def call(i):
+            k = i % n_series
+            forecast_result = {
+                'item_id': f'ITEM_{k}', 'store_id': 'CA_1', 'horizon': 28,
+                'summary': {'historical_mean': 3.0 + k, 'forecast_mean': 3.5 + k}
+            }
+            inventory_metrics = {
+                'avg_daily_demand': 3.5 + k, 'total_forecast': 98.0 + 28 * k,
+                'reorder_point': 30.0 + k, 'safety_stock': 5.0, 'eoq': 120.0,
+                'service_level': 0.95, 'lead_time_days': 7, 'current_inventory': 40
+            }
+            with app.app_context():
+                NLGSummarizer().generate_forecast_summary(forecast_result, inventory_metrics, [], [])
+            return True
+        return call
+    return make_call
+
+def load_test():
+    """Load-test the query pipeline or NLG summaries against the local LLM backend"""
+
+    parser = argparse.ArgumentParser(description=load_test.__doc__)
+    parser.add_argument('--target', choices=['query', 'summary'], default='query')
+    parser.add_argument('--database', help='Existing M5 database (default: generate a small one)')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--latency-ms', type=float, default=200, help='Median injected LLM latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal spread of latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of LLM calls that fail')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rpm', type=float, default=0,
+                        help='LLM requests per minute allowed by the scheduler (0: unlimited)')
+    parser.add_argument('--tpm', type=float, default=0,
+                        help='LLM tokens per minute allowed by the scheduler (0: unlimited)')
+    parser.add_argument('--llm-concurrency', type=int, default=Config.LLM_MAX_CONCURRENCY,
+                        help='LLM calls in flight at once')
+    parser.add_argument('--summary-series', type=int, default=50,
+                        help='Distinct summary inputs (fewer means more cache hits)')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    database = args.database
+    if database is None:
+        database = os.path.join(tempfile.mkdtemp(prefix='m5-load-'), 'm5.db')
+        generate_synthetic_m5(database, n_items=20, n_stores=5, n_days=365, seed=args.seed)
+
+    Config.DATABASE_PATH = database
+    Config.LLM_BACKEND = 'local'
+    Config.LLM_LOCAL_LATENCY_MS = args.latency_ms
+    Config.LLM_LOCAL_LATENCY_SIGMA = args.latency_sigma
+    Config.LLM_LOCAL_FAILURE_RATE = args.failure_rate
+    Config.LLM_LOCAL_SEED = args.seed
+    Config.LLM_REQUESTS_PER_MINUTE = args.rpm
+    Config.LLM_TOKENS_PER_MINUTE = args.tpm
+    Config.LLM_MAX_CONCURRENCY = args.llm_concurrency
+
+    from app import create_app
+    from utils.log import configure_logging
+    app = create_app()
+    configure_logging('CRITICAL')
+
+    print(f"🔥 {args.target}: {args.requests} requests, LLM latency ~{args.latency_ms:.0f} ms "
+          f"(sigma {args.latency_sigma}), failure rate {args.failure_rate:.0%}")
+    runs = []
+    for concurrency in args.concurrency:
+        make_call = (query_caller(app) if args.target == 'query'
+                     else summary_caller(app, args.summary_series))
+        result = run_load(make_call, args.requests, concurrency)
+        runs.append(result)
+        print(f"  concurrency {concurrency:>3}: {result['throughput_rps']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+              f"p99 {result['p99_ms']:8.1f} ms  errors {result['error_rate']:.1%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'git_revision': git_revision(),
+                'target': args.target,
+                'llm': {'latency_ms': args.latency_ms, 'latency_sigma': args.latency_sigma,
+                        'failure_rate': args.failure_rate, 'seed': args.seed},
+                'runs': runs
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+if __name__ == "__main__":
+    load_test()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from benchmarks.harness import BenchmarkSuite, compare
+from benchmarks.synthetic_m5 import generate_synthetic_m5
+
+BENCHMARK_QUERIES = {
+    'top_sellers': """
+        SELECT item_id, store_id, SUM(sales) AS total_sales
+        FROM sales_long GROUP BY item_id, store_id
+        ORDER BY total_sales DESC LIMIT 10
+    """,
+    'store_daily_totals': """
+        SELECT store_id, date, SUM(sales) AS sales
+        FROM sales_long WHERE date >= '2016-01-01'
+        GROUP BY store_id, date LIMIT 500
+    """,
+    'single_series': """
+        SELECT date, sales FROM sales_long
+        WHERE item_id = '{item_id}' AND store_id = '{store_id}' LIMIT 500
+    """
+}
+
+def busiest_series(conn):
+    '''Series with the most selling days, so every model has data to fit'''
+    return conn.execute("""
+        SELECT item_id, store_id FROM sales_long
+        GROUP BY item_id, store_id
+        ORDER BY SUM(sales > 0) DESC LIMIT 1
+    """).fetchone()
+
+def build_suite(app, args, metadata):
+    '''Register every benchmark case against the app's database'''
+    from database.connection import get_db_connection
+    from forecasting.custom_data_prep import CustomDataPreparation
+    from forecasting.feature_engineering import FeatureEngineer
+    from forecasting.models.model_selector import ModelSelector
+    from inventory.calculations import InventoryCalculations
+    from utils.executor import execute_query
+    from utils.validator import validate_sql
+
+    suite = BenchmarkSuite(metadata)
+    slow = max(1, args.repeat // 2)
+    item_id, store_id = busiest_series(get_db_connection())
+    suite.metadata['series'] = {'item_id': item_id, 'store_id': store_id}
+
+    # Data preparation and features
+    prep = CustomDataPreparation()
+    df = prep.prepare_forecast_data(item_id, store_id)
+    suite.add('data.get_sales_data', lambda: prep.get_sales_data(item_id, store_id), args.repeat)
+    suite.add('data.prepare_forecast_data', lambda: prep.prepare_forecast_data(item_id, store_id), args.repeat)
+
+    features = FeatureEngineer()
+    suite.add('features.create_all_features', lambda: features.create_all_features(df), args.repeat)
+
+    # Models: fit then predict on the same instance
+    if not args.skip_models:
+        for name in ModelSelector.AVAILABLE_MODELS:
+            model = ModelSelector.get_model(name)
+            suite.add(f'model.{name}.fit', lambda model=model: model.fit(df), slow)
+            suite.add(f'model.{name}.predict', lambda model=model: model.predict(horizon=28), slow)
+
+    # Inventory maths: one series, then the whole fleet as arrays
+    rng = np.random.default_rng(0)
+    forecast = [{'predicted_demand': float(v)} for v in rng.gamma(2.0, 2.0, 28)]
+    suite.add('inventory.calculate_all_metrics',
+              lambda: InventoryCalculations.calculate_all_metrics(forecast, current_inventory=50),
+              args.repeat * 20)
+    n = metadata['scale']['series']
+    demand, std, on_hand = rng.gamma(2.0, 2.0, n), rng.gamma(1.0, 1.0, n), rng.uniform(0, 200, n)
+    suite.add(f'inventory.calculate_batch_metrics[{n}]',
+              lambda: InventoryCalculations.calculate_batch_metrics(demand, std, current_inventory=on_hand),
+              args.repeat * 20)
+
+    # SQL validation and execution
+    queries = {name: sql.format(item_id=item_id, store_id=store_id) for name, sql in BENCHMARK_QUERIES.items()}
+    suite.add('sql.validate_sql', lambda: [validate_sql(sql) for sql in queries.values()], args.repeat * 20)
+    for name, sql in queries.items():
+        sql = validate_sql(sql)[2]
+        suite.add(f'sql.execute_query.{name}', lambda sql=sql: execute_query(sql, use_cache=False), args.repeat)
+        # Warm the result cache once, then time the hits
+        execute_query(sql)
+        suite.add(f'sql.execute_query.{name}.cached', lambda sql=sql: execute_query(sql), args.repeat * 20)
+
+    # HTTP endpoints through the test client with the local LLM backend
+    client = app.test_client()
+
+    def request(method, url, **kwargs):
+        def call():
+            response = client.open(url, method=method, **kwargs)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+        return call
+
+    suite.add('http.GET /api/schema', request('GET', '/api/schema'), args.repeat)
+    suite.add('http.POST /api/query', request('POST', '/api/query', json={'query': 'top sellers'}), args.repeat)
+    suite.add('http.GET /forecast/api/items', request('GET', '/forecast/api/items'), args.repeat)
+    if not args.skip_models:
+        suite.add('http.POST /forecast/api/generate',
+                  request('POST', '/forecast/api/generate', json={'item_id': item_id, 'store_id': store_id}),
+                  slow)
+    suite.add('http.POST /forecast/api/alerts/scan',
+              request('POST', '/forecast/api/alerts/scan', json={'source': 'baseline'}),
+              slow)
+    suite.add('http.POST /forecast/api/replenishment/plan',
+              request('POST', '/forecast/api/replenishment/plan', json={'source': 'baseline'}),
+              slow)
+    return suite
+
+def run_benchmarks():
+    """Benchmark the data, model, inventory, SQL and HTTP paths on synthetic M5 data"""
+
+    parser = argparse.ArgumentParser(description=run_benchmarks.__doc__)
+    parser.add_argument('--database', help='Existing M5 database (default: generate one)')
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--stores', type=int, default=10)
+    parser.add_argument('--days', type=int, default=1941)
+    parser.add_argument('--zero-inflation', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='Repeats for fast cases; model cases use half')
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--skip-models', action='store_true', help='Skip model fit/predict and forecast endpoints')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    scale = {'items': args.items, 'stores': args.stores, 'days': args.days,
+             'zero_inflation': args.zero_inflation, 'seed': args.seed}
+    database = args.database
+    if database is None:
+        database = os.path.join(tempfile.mkdtemp(prefix='m5-bench-'), 'm5.db')
+        info = generate_synthetic_m5(database, args.items, args.stores, args.days,
+                                     args.zero_inflation, args.seed)
+        scale.update(series=info['series'], generation_seconds=info['seconds'])
+        print(f"🧪 Synthetic M5: {info['series']:,} series x {args.days:,} days in {info['seconds']:.1f}s")
+    else:
+        conn = sqlite3.connect(database)
+        scale = {'series': conn.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT item_id, store_id FROM sales_long)"
+        ).fetchone()[0]}
+        conn.close()
+
+    Config.DATABASE_PATH = database
+    Config.NLG_SUMMARY_MODE = 'llm'
+    # Instant canned LLM responses: only our own code is timed
+    Config.LLM_BACKEND = 'local'
+    Config.LLM_LOCAL_LATENCY_MS = 0
+    Config.LLM_LOCAL_FAILURE_RATE = 0
+
+    from app import create_app
+    from utils.log import configure_logging
+    app = create_app()
+    configure_logging('WARNING')
+
+    with app.app_context():
+        suite = build_suite(app, args, {'database': database, 'scale': scale})
+        print(f"⏱️  Running {len(suite.cases)} cases")
+        suite.run(pattern=args.filter)
+
+    suite.write(args.output)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} ({baseline.get('git_revision')}):")
+        for name, before, after, ratio, flag in compare(baseline, suite.to_dict()):
+            print(f"  {name:<45} {before * 1000:10.2f} -> {after * 1000:10.2f} ms  x{ratio:5.2f} {flag}")
+
+if __name__ == "__main__":
+    run_benchmarks()
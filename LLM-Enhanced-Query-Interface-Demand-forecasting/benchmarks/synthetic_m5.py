@@ -0,0 +1,180 @@
+import argparse
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+
+# M5 layout: 3 categories, 7 departments, 10 stores across 3 states
+DEPARTMENTS = ['FOODS_1', 'FOODS_2', 'FOODS_3', 'HOBBIES_1', 'HOBBIES_2',
+               'HOUSEHOLD_1', 'HOUSEHOLD_2']
+STORES = ['CA_1', 'CA_2', 'CA_3', 'CA_4', 'TX_1', 'TX_2', 'TX_3', 'WI_1', 'WI_2', 'WI_3']
+EVENTS = [('SuperBowl', 'Sporting'), ('ValentinesDay', 'Cultural'),
+          ('Easter', 'Cultural'), ('IndependenceDay', 'National'),
+          ('Thanksgiving', 'National'), ('Christmas', 'National')]
+
+# SQLite's default column limit; wider sales_train tables are written without d_ columns
+MAX_WIDE_DAYS = 1900
+
+def make_ids(n_items, n_stores):
+    '''M5-style item ids (FOODS_3_090) and store ids (CA_1)'''
+    items = [f"{DEPARTMENTS[i % len(DEPARTMENTS)]}_{i // len(DEPARTMENTS) + 1:03d}"
+             for i in range(n_items)]
+    stores = [STORES[i % len(STORES)] if i < len(STORES)
+              else f"{STORES[i % len(STORES)][:2]}_{i // 3 + 1}"
+              for i in range(n_stores)]
+    return items, stores
+
+def make_calendar(n_days, start_date, rng):
+    dates = pd.date_range(start_date, periods=n_days, freq='D')
+    event_rows = rng.random(n_days) < 0.03
+    event_index = rng.integers(0, len(EVENTS), n_days)
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'wm_yr_wk': 11101 + np.arange(n_days) // 7,
+        'weekday': dates.day_name(),
+        'wday': (dates.dayofweek + 2) % 7 + 1,  # M5 counts from Saturday = 1
+        'month': dates.month,
+        'year': dates.year,
+        'd': [f'd_{i + 1}' for i in range(n_days)],
+        'event_name_1': np.where(event_rows, [EVENTS[i][0] for i in event_index], None),
+        'event_type_1': np.where(event_rows, [EVENTS[i][1] for i in event_index], None),
+        'event_name_2': None,
+        'event_type_2': None,
+        'snap_CA': (dates.day <= 10).astype(int),
+        'snap_TX': ((dates.day >= 3) & (dates.day <= 12)).astype(int),
+        'snap_WI': ((dates.day >= 5) & (dates.day <= 14)).astype(int)
+    })
+
+def make_sales(n_series, n_days, zero_inflation, rng):
+    '''
+    Intermittent daily demand, shape (n_series, n_days)
+
+    Poisson demand around a log-normal level with weekly seasonality and a
+    slow trend; each day is independently zeroed with the series' own
+    zero-inflation probability.
+    '''
+    level = rng.lognormal(mean=0.3, sigma=1.0, size=(n_series, 1))
+    weekly = 1 + 0.25 * np.sin(2 * np.pi * (np.arange(n_days) % 7) / 7 + rng.uniform(0, 2 * np.pi, (n_series, 1)))
+    trend = 1 + rng.normal(0, 0.2, (n_series, 1)) * np.linspace(0, 1, n_days)
+    rate = np.clip(level * weekly * trend, 0, None)
+
+    sales = rng.poisson(rate).astype(np.int32)
+    p_zero = np.clip(rng.normal(zero_inflation, 0.1, (n_series, 1)), 0, 0.98)
+    sales[rng.random((n_series, n_days)) < p_zero] = 0
+    return sales
+
+def generate_synthetic_m5(path, n_items=100, n_stores=10, n_days=1941,
+                          zero_inflation=0.5, seed=0, start_date='2011-01-29',
+                          create_indexes=True, batch_size=100000):
+    '''
+    Write an M5-shaped SQLite database
+
+    Args:
+        path: Output database file (existing M5 tables are replaced)
+        n_items, n_stores: Series count is n_items x n_stores
+        n_days: Days of history
+        zero_inflation: Mean share of days forced to zero sales
+        seed: RNG seed, the same arguments always produce the same data
+        create_indexes: Index sales_long and sell_prices by series
+
+    Returns:
+        dict with table row counts and generation time
+    '''
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    items, stores = make_ids(n_items, n_stores)
+    calendar = make_calendar(n_days, start_date, rng)
+
+    series = pd.DataFrame(
+        [(item, store) for store in stores for item in items],
+        columns=['item_id', 'store_id']
+    )
+    series['dept_id'] = series['item_id'].str.rsplit('_', n=1).str[0]
+    series['cat_id'] = series['dept_id'].str.split('_').str[0]
+    series['state_id'] = series['store_id'].str[:2]
+    series['id'] = series['item_id'] + '_' + series['store_id'] + '_evaluation'
+    sales = make_sales(len(series), n_days, zero_inflation, rng)
+
+    conn = sqlite3.connect(path)
+    for table in ('calendar', 'sales_long', 'sales_train', 'sell_prices'):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    calendar.to_sql('calendar', conn, index=False)
+
+    conn.execute("""
+        CREATE TABLE sales_long (
+            id TEXT, item_id TEXT, dept_id TEXT, cat_id TEXT, store_id TEXT,
+            state_id TEXT, d TEXT, sales INTEGER, date TEXT
+        )
+    """)
+    meta = series[['id', 'item_id', 'dept_id', 'cat_id', 'store_id', 'state_id']].to_numpy()
+    day_ids = calendar['d'].to_numpy()
+    day_dates = calendar['date'].to_numpy()
+    series_per_batch = max(1, batch_size // n_days)
+    for first in range(0, len(series), series_per_batch):
+        block = slice(first, first + series_per_batch)
+        rows = (
+            (*meta[s], day_ids[t], int(sales[s, t]), day_dates[t])
+            for s in range(*block.indices(len(series)))
+            for t in range(n_days)
+        )
+        conn.executemany("INSERT INTO sales_long VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    wide = series[['id', 'item_id', 'dept_id', 'cat_id', 'store_id', 'state_id']]
+    if n_days <= MAX_WIDE_DAYS:
+        wide = pd.concat([wide, pd.DataFrame(sales, columns=day_ids)], axis=1)
+    wide.to_sql('sales_train', conn, index=False, chunksize=1000)
+
+    # Weekly prices: a base price per item, a store markup and rare changes
+    weeks = np.unique(calendar['wm_yr_wk'].to_numpy())
+    base = rng.lognormal(1.2, 0.6, len(items))
+    item_codes = pd.Categorical(series['item_id'], categories=items).codes
+    price = (base[item_codes] * rng.uniform(0.95, 1.05, len(series)))[:, None]
+    changes = np.cumprod(np.where(rng.random((len(series), len(weeks))) < 0.02,
+                                  rng.uniform(0.85, 1.15, (len(series), len(weeks))), 1.0), axis=1)
+    prices = pd.DataFrame({
+        'store_id': np.repeat(series['store_id'].to_numpy(), len(weeks)),
+        'item_id': np.repeat(series['item_id'].to_numpy(), len(weeks)),
+        'wm_yr_wk': np.tile(weeks, len(series)),
+        'sell_price': np.round(price * changes, 2).ravel()
+    })
+    prices.to_sql('sell_prices', conn, index=False, chunksize=batch_size)
+
+    if create_indexes:
+        conn.execute("CREATE INDEX idx_sales_long_series ON sales_long (item_id, store_id, date)")
+        conn.execute("CREATE INDEX idx_sell_prices_series ON sell_prices (item_id, store_id, wm_yr_wk)")
+    conn.commit()
+    conn.close()
+
+    return {
+        'series': len(series),
+        'days': n_days,
+        'sales_long_rows': len(series) * n_days,
+        'sell_prices_rows': len(prices),
+        'zero_share': float((sales == 0).mean()),
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+def main():
+    """Generate a synthetic M5-shaped SQLite database"""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('path', help='Output SQLite file')
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--stores', type=int, default=10)
+    parser.add_argument('--days', type=int, default=1941)
+    parser.add_argument('--zero-inflation', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-indexes', action='store_true')
+    args = parser.parse_args()
+
+    info = generate_synthetic_m5(
+        args.path, args.items, args.stores, args.days, args.zero_inflation,
+        args.seed, create_indexes=not args.no_indexes
+    )
+    print(f"✅ {info['series']:,} series x {info['days']:,} days "
+          f"({info['sales_long_rows']:,} sales rows, {info['zero_share']:.0%} zeros) "
+          f"written to {args.path} in {info['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import sqlite3
+import time
+from config import Config
+from database.rollups import RollupStore
+
+def build_rollups():
+    """Build or incrementally refresh the pre-aggregated sales rollup tables"""
+
+    parser = argparse.ArgumentParser(description=build_rollups.__doc__)
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild from scratch (needed after rows of sales_long were updated)')
+    parser.add_argument('--database', default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    store = RollupStore(conn)
+
+    start = time.perf_counter()
+    result = store.refresh(full=args.full)
+    elapsed = time.perf_counter() - start
+
+    conn.close()
+    print(f"✅ Rollups {result['mode']}: aggregated {result['rows_aggregated']:,} sales rows "
+          f"in {elapsed:.2f}s")
+    for table, rows in result['tables'].items():
+        print(f"   {table}: {rows:,} rows")
+
+if __name__ == "__main__":
+    build_rollups()
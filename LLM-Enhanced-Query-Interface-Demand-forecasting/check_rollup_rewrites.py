@@ -0,0 +1,112 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+from benchmarks.synthetic_m5 import generate_synthetic_m5
+from database.rollups import RollupStore
+from utils.query_rewriter import rewrite_for_rollups
+
+# (description, SQL, whether it should be answered from a rollup)
+CASES = [
+    ('count, empty filter',
+     "SELECT COUNT(*) AS n FROM sales_long WHERE store_id = 'ZZ_9'", True),
+    ('count(1) and sum, empty filter',
+     "SELECT COUNT(1), SUM(sales) FROM sales_long WHERE store_id = 'ZZ_9'", True),
+    ('avg, empty filter',
+     "SELECT AVG(sales) AS avg_sales FROM sales_long WHERE cat_id = 'NONE'", True),
+    ('grouped, empty filter',
+     "SELECT store_id, COUNT(*) FROM sales_long WHERE store_id = 'ZZ_9' GROUP BY store_id", True),
+    ('ungrouped count',
+     "SELECT COUNT(*) FROM sales_long", True),
+    ('unaliased columns',
+     "SELECT store_id, SUM(sales), COUNT(*), AVG(sales) FROM sales_long GROUP BY store_id ORDER BY store_id", True),
+    ('aliased columns',
+     "SELECT cat_id AS category, SUM(sales) AS total, AVG(sales) AS mean "
+     "FROM sales_long GROUP BY cat_id ORDER BY total DESC", True),
+    ('group by position',
+     "SELECT state_id, dept_id, SUM(sales) FROM sales_long GROUP BY 1, 2 ORDER BY 1, 2", True),
+    ('having count',
+     "SELECT dept_id, SUM(sales) AS total FROM sales_long GROUP BY dept_id "
+     "HAVING COUNT(*) > 100 ORDER BY dept_id", True),
+    ('having avg',
+     "SELECT store_id FROM sales_long GROUP BY store_id HAVING AVG(sales) > 1 ORDER BY store_id", True),
+    ('date range',
+     "SELECT date, SUM(sales) FROM sales_long WHERE date BETWEEN '2011-02-01' AND '2011-02-10' "
+     "GROUP BY date ORDER BY date", True),
+    ('monthly grain',
+     "SELECT strftime('%Y-%m', date) AS month, SUM(sales) AS total, COUNT(*) "
+     "FROM sales_long GROUP BY strftime('%Y-%m', date) ORDER BY month", True),
+    ('monthly grain, unaliased',
+     "SELECT strftime('%Y-%m', date), AVG(sales) FROM sales_long "
+     "WHERE strftime('%Y-%m', date) >= '2011-03' GROUP BY 1 ORDER BY 1", True),
+    ('derived table, count of groups',
+     "SELECT COUNT(*) FROM (SELECT store_id, SUM(sales) FROM sales_long GROUP BY store_id)", True),
+    ('derived table, top stores',
+     "SELECT store_id, total FROM (SELECT store_id, SUM(sales) AS total FROM sales_long "
+     "GROUP BY store_id) ORDER BY total DESC LIMIT 3", True),
+    ('derived table, empty',
+     "SELECT COUNT(*) FROM (SELECT dept_id FROM sales_long WHERE store_id = 'ZZ_9' GROUP BY dept_id)", True),
+    ('scalar subquery in where',
+     "SELECT store_id, SUM(sales) FROM sales_long GROUP BY store_id "
+     "HAVING SUM(sales) > (SELECT AVG(sales) * 10 FROM sales_long) ORDER BY store_id", True),
+    ('union of aggregates',
+     "SELECT 'CA', SUM(sales) FROM sales_long WHERE state_id = 'CA' "
+     "UNION ALL SELECT 'TX', SUM(sales) FROM sales_long WHERE state_id = 'TX'", True),
+    ('distinct derived table',
+     "SELECT COUNT(*) FROM (SELECT DISTINCT store_id, date FROM sales_long)", False),
+    ('rows, not aggregates',
+     "SELECT date, sales FROM sales_long LIMIT 5", False),
+    ('ungrouped column',
+     "SELECT store_id, SUM(sales) FROM sales_long", False),
+    ('item level',
+     "SELECT item_id, SUM(sales) FROM sales_long GROUP BY item_id", False),
+    ('max of sales',
+     "SELECT store_id, MAX(sales) FROM sales_long GROUP BY store_id", False),
+]
+
+def run(conn, sql):
+    cursor = conn.execute(sql)
+    return [column[0] for column in cursor.description], cursor.fetchall()
+
+def check_rollup_rewrites():
+    """Check rollup rewrites return the same rows as the original queries"""
+
+    parser = argparse.ArgumentParser(description=check_rollup_rewrites.__doc__)
+    parser.add_argument('--database', help='Existing M5 database (default: a small synthetic one)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database
+        if path is None:
+            path = os.path.join(tmp, 'm5.db')
+            generate_synthetic_m5(path, n_items=20, n_stores=4, n_days=120)
+        conn = sqlite3.connect(path)
+        RollupStore(conn).refresh()
+
+        failures = 0
+        for description, sql, expect_rewrite in CASES:
+            rewritten = rewrite_for_rollups(sql, conn)
+            if (rewritten is not None) != expect_rewrite:
+                failures += 1
+                print(f"❌ {description}: expected {'a' if expect_rewrite else 'no'} rewrite")
+                continue
+            if rewritten is None:
+                print(f"✅ {description}: runs against sales_long")
+                continue
+            expected, actual = run(conn, sql), run(conn, rewritten)
+            if expected != actual:
+                failures += 1
+                print(f"❌ {description}\n   original:  {sql}\n   rewritten: {rewritten}")
+                print(f"   {expected[0]} {expected[1][:3]}\n   {actual[0]} {actual[1][:3]}")
+                continue
+            print(f"✅ {description}: {len(actual[1])} identical rows")
+        conn.close()
+
+    if failures:
+        print(f"\n❌ {failures} of {len(CASES)} cases failed")
+        sys.exit(1)
+    print(f"\n✅ All {len(CASES)} cases match")
+
+if __name__ == "__main__":
+    check_rollup_rewrites()
@@ -15,10 +15,105 @@ class Config:
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-pro-latest')
     
+    # LLM Backend: gemini, or local (offline canned responses for load tests)
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+    LLM_LOCAL_LATENCY_MS = float(os.getenv('LLM_LOCAL_LATENCY_MS', '0'))  # median injected latency
+    LLM_LOCAL_LATENCY_SIGMA = float(os.getenv('LLM_LOCAL_LATENCY_SIGMA', '0.5'))  # log-normal spread
+    LLM_LOCAL_FAILURE_RATE = float(os.getenv('LLM_LOCAL_FAILURE_RATE', '0'))
+    LLM_LOCAL_SEED = int(os.getenv('LLM_LOCAL_SEED', '0'))
+    LLM_STREAMING = os.getenv('LLM_STREAMING', 'True') == 'True'  # stream answers on /api/query/stream
+    
+    # LLM scheduler: client-side limits shared by every LLM call in the process
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv('LLM_REQUESTS_PER_MINUTE', '60'))  # 0 disables
+    LLM_TOKENS_PER_MINUTE = float(os.getenv('LLM_TOKENS_PER_MINUTE', '1000000'))  # 0 disables
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))  # calls in flight at once
+    LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '30'))  # 0 waits forever
+    LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv('LLM_COMPLETION_TOKEN_ESTIMATE', '256'))  # reserved per call
+    
+    # LLM resilience: per-call timeouts within one budget per question, retries
+    # with jittered exponential backoff, optional hedging and a circuit breaker
+    LLM_REQUEST_BUDGET_SECONDS = float(os.getenv('LLM_REQUEST_BUDGET_SECONDS', '45'))  # all LLM calls of a question
+    LLM_CALL_TIMEOUT_SECONDS = float(os.getenv('LLM_CALL_TIMEOUT_SECONDS', '20'))  # one attempt
+    LLM_RETRY_ATTEMPTS = int(os.getenv('LLM_RETRY_ATTEMPTS', '3'))  # attempts per call, 1 disables retries
+    LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5'))  # seconds, doubled per retry
+    LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '8'))
+    LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'False') == 'True'  # duplicate slow calls
+    LLM_HEDGE_QUANTILE = float(os.getenv('LLM_HEDGE_QUANTILE', '0.95'))  # of recent call latency
+    LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', '5'))  # consecutive failures
+    LLM_CIRCUIT_RESET_SECONDS = float(os.getenv('LLM_CIRCUIT_RESET_SECONDS', '30'))  # open before a trial call
+    
+    # SQL prompt schema context: 'relevant' (ranked tables within a token budget) or 'full'
+    SCHEMA_CONTEXT_MODE = os.getenv('SCHEMA_CONTEXT_MODE', 'relevant')
+    SCHEMA_CONTEXT_TOKEN_BUDGET = int(os.getenv('SCHEMA_CONTEXT_TOKEN_BUDGET', '600'))
+    SCHEMA_CONTEXT_MAX_TABLES = int(os.getenv('SCHEMA_CONTEXT_MAX_TABLES', '3'))
+    SCHEMA_PINNED_TABLES = os.getenv('SCHEMA_PINNED_TABLES', 'sales_long')  # always described
+    SCHEMA_EXCLUDED_TABLES = os.getenv('SCHEMA_EXCLUDED_TABLES', 'sales_train,query_examples,rollup_state')  # named only
+    SCHEMA_SAMPLE_VALUES = int(os.getenv('SCHEMA_SAMPLE_VALUES', '3'))  # per TEXT column
+    
+    # SQL templates answer common parameterised questions without the LLM
+    SQL_TEMPLATES_ENABLED = os.getenv('SQL_TEMPLATES_ENABLED', 'True') == 'True'
+    
+    # SQL that fails validation or execution is sent back to the LLM with the error
+    SQL_REPAIR_ATTEMPTS = int(os.getenv('SQL_REPAIR_ATTEMPTS', '2'))  # 0 disables repair
+    
+    # One LLM call returns the SQL and its explanation as JSON; replies that do
+    # not parse fall back to separate SQL and explanation calls
+    SQL_STRUCTURED_OUTPUT = os.getenv('SQL_STRUCTURED_OUTPUT', 'True') == 'True'
+    
+    # Few-shot examples: verified question -> SQL pairs retrieved into the SQL prompt
+    FEW_SHOT_K = int(os.getenv('FEW_SHOT_K', '3'))  # 0 disables retrieval
+    FEW_SHOT_MIN_SIMILARITY = float(os.getenv('FEW_SHOT_MIN_SIMILARITY', '0.2'))  # cosine, 0-1
+    FEW_SHOT_CAPTURE = os.getenv('FEW_SHOT_CAPTURE', 'True') == 'True'  # store successful queries
+    FEW_SHOT_MAX_EXAMPLES = int(os.getenv('FEW_SHOT_MAX_EXAMPLES', '5000'))  # kept in the index
+    
+    # Result cache for executed SQL, emptied when the database file changes
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'True') == 'True'
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '256'))  # entries
+    RESULT_CACHE_MAX_CELLS = int(os.getenv('RESULT_CACHE_MAX_CELLS', '2000000'))  # rows x columns, all entries
+    
+    # Rollups: aggregates over sales_long are redirected to pre-aggregated tables
+    # (built with build_rollups.py) when those are up to date
+    ROLLUPS_ENABLED = os.getenv('ROLLUPS_ENABLED', 'True') == 'True'
+    
+    # Query results in the answer prompt: listed in full when they fit the
+    # budget, otherwise per-column statistics plus the leading rows
+    ANSWER_RESULTS_TOKEN_BUDGET = int(os.getenv('ANSWER_RESULTS_TOKEN_BUDGET', '800'))
+    ANSWER_RESULTS_TOP_VALUES = int(os.getenv('ANSWER_RESULTS_TOP_VALUES', '5'))  # per text column
+    
+    # API responses
+    API_RESULT_FORMAT = os.getenv('API_RESULT_FORMAT', 'rows')  # rows | columnar | arrow
+    RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'True') == 'True'  # br/gzip per Accept-Encoding
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+    RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+    
     # Query Limits
     MAX_QUERY_LIMIT = int(os.getenv('MAX_QUERY_LIMIT', '500'))
     DEFAULT_QUERY_LIMIT = int(os.getenv('DEFAULT_QUERY_LIMIT', '100'))
     
+    # Forecast charts: history shown next to the forecast, LTTB-downsampled so
+    # the chart carries at most CHART_MAX_POINTS points
+    FORECAST_HISTORY_DAYS = int(os.getenv('FORECAST_HISTORY_DAYS', '730'))  # 0 for the full history
+    CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '400'))
+    CHART_MIN_HISTORY_POINTS = int(os.getenv('CHART_MIN_HISTORY_POINTS', '100'))
+    
+    # Inventory Simulation
+    SIMULATION_PATHS = int(os.getenv('SIMULATION_PATHS', '1000'))
+    SIMULATION_SEED = int(os.getenv('SIMULATION_SEED', '42'))
+    
+    # NLG Summaries
+    NLG_SUMMARY_MODE = os.getenv('NLG_SUMMARY_MODE', 'llm')  # llm | template_first | template
+    NLG_CACHE_SIZE = int(os.getenv('NLG_CACHE_SIZE', '1024'))
+    NLG_CACHE_TTL_SECONDS = int(os.getenv('NLG_CACHE_TTL_SECONDS', '3600'))
+    NLG_BACKGROUND_WORKERS = int(os.getenv('NLG_BACKGROUND_WORKERS', '2'))
+    
+    # Logging
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # DEBUG adds per-forecast data-quality stats
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text | json
+    
+    # Metrics
+    METRICS_WINDOW = int(os.getenv('METRICS_WINDOW', '1024'))  # samples kept per summary for quantiles
+    
     # Security
     ALLOWED_SQL_OPERATIONS = ['select']
     DANGEROUS_KEYWORDS = ['drop', 'delete', 'update', 'insert', 'alter', 
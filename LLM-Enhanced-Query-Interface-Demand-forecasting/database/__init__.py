@@ -1,4 +1,26 @@
+import importlib
 from .connection import get_db_connection, close_db_connection
 from .schema import get_schema, create_schema_context
+from .schema_index import SchemaIndex, create_relevant_schema_context
+from .example_store import ExampleStore, normalize_question
+from .rollups import RollupStore, describe_rollups
 
-__all__ = ['get_db_connection', 'close_db_connection', 'get_schema', 'create_schema_context']
\ No newline at end of file
+# pandas-backed stores load on first attribute access
+_LAZY_EXPORTS = {
+    'ForecastStore': '.forecast_store',
+    'InventoryStore': '.inventory_store'
+}
+
+__all__ = [
+    'get_db_connection', 'close_db_connection', 'get_schema', 'create_schema_context',
+    'SchemaIndex', 'create_relevant_schema_context', 'ExampleStore', 'normalize_question',
+    'RollupStore', 'describe_rollups',
+    'ForecastStore', 'InventoryStore'
+]
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,7 +1,12 @@
 import sqlite3
+import threading
 from flask import g
 from config import Config
 
+# (table group, database file) pairs whose tables exist in this process
+_prepared = set()
+_prepared_lock = threading.Lock()
+
 def get_db_connection():
     '''
     Get database connection from Flask's g object or create new one
@@ -17,4 +22,28 @@ def close_db_connection(e=None):
     '''
     db = g.pop('db', None)
     if db is not None:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def ensure_tables(conn, name, setup):
+    '''
+    Run setup(conn) (CREATE TABLE IF NOT EXISTS, migrations) once per
+    process for each database file, so stores built per request do not
+    repeat the DDL; databases without a file run it every time
+    
+    Args:
+        name: Name of the table group, e.g. 'inventory'
+        setup: Function creating or migrating the tables on conn
+    '''
+    database_file = conn.execute("PRAGMA database_list").fetchone()[2]
+    # In-memory and temporary databases have no file to remember and live as
+    # long as their connection, so their (idempotent) setup always runs
+    if not database_file:
+        setup(conn)
+        return
+    key = (name, database_file)
+    if key in _prepared:
+        return
+    with _prepared_lock:
+        if key not in _prepared:
+            setup(conn)
+            _prepared.add(key)
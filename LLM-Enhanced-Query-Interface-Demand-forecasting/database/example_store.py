@@ -0,0 +1,65 @@
+from datetime import datetime
+from utils.result_cache import record_database_write
+from .connection import ensure_tables, get_db_connection
+
+EXAMPLE_TABLES_DDL = """
+CREATE TABLE IF NOT EXISTS query_examples (
+    normalized_question TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    source TEXT NOT NULL,
+    row_count INTEGER,
+    uses INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT,
+    last_used_at TEXT
+);
+"""
+
+def normalize_question(question):
+    '''Case- and whitespace-insensitive key for a question'''
+    return ' '.join(question.lower().split()).rstrip('?.! ')
+
+class ExampleStore:
+    '''Verified question -> SQL pairs used as few-shot examples'''
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_db_connection()
+        ensure_tables(self.conn, 'examples', lambda conn: conn.executescript(EXAMPLE_TABLES_DDL))
+
+    def save_example(self, question, sql, source='captured', row_count=None):
+        '''
+        Insert or refresh an example; a repeated question keeps its latest SQL
+
+        Returns:
+            True if the question was new
+        '''
+        now = datetime.now().isoformat(timespec='seconds')
+        key = normalize_question(question)
+        with self.conn:
+            existing = self.conn.execute(
+                "SELECT 1 FROM query_examples WHERE normalized_question = ?", (key,)
+            ).fetchone()
+            self.conn.execute("""
+                INSERT INTO query_examples
+                    (normalized_question, question, sql, source, row_count, uses, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (normalized_question) DO UPDATE SET
+                    sql = excluded.sql,
+                    row_count = excluded.row_count,
+                    uses = uses + 1,
+                    last_used_at = excluded.last_used_at
+            """, (key, question, sql, source, row_count, now, now))
+        record_database_write('query_examples')
+        return existing is None
+
+    def load_examples(self, limit=None):
+        '''All examples as (question, sql) tuples, most used first'''
+        query = "SELECT question, sql FROM query_examples ORDER BY uses DESC, last_used_at DESC"
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        return [tuple(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM query_examples").fetchone()[0]
@@ -0,0 +1,98 @@
+import pandas as pd
+from datetime import datetime
+from utils.result_cache import record_database_write
+from .connection import ensure_tables, get_db_connection
+from .inventory_store import scope_condition
+
+FORECAST_TABLES_DDL = """
+CREATE TABLE IF NOT EXISTS forecast_summaries (
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    model TEXT,
+    horizon INTEGER,
+    generated_at TEXT,
+    historical_mean REAL,
+    historical_std REAL,
+    forecast_mean REAL,
+    forecast_std REAL,
+    forecast_total REAL,
+    PRIMARY KEY (item_id, store_id)
+);
+CREATE TABLE IF NOT EXISTS forecast_values (
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    predicted_demand REAL,
+    lower_bound REAL,
+    upper_bound REAL,
+    PRIMARY KEY (item_id, store_id, date)
+);
+"""
+
+class ForecastStore:
+    '''Persist generated forecasts so batch jobs can reuse them'''
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_db_connection()
+        ensure_tables(self.conn, 'forecast', lambda conn: conn.executescript(FORECAST_TABLES_DDL))
+
+    def save_forecast(self, item_id, store_id, model_name, horizon,
+                      forecast_df, summary):
+        '''
+        Replace the cached forecast for one item-store series
+
+        Args:
+            forecast_df: DataFrame returned by the model's predict()
+            summary: Summary dict from Forecaster._calculate_summary
+        '''
+        dates = forecast_df['date'].dt.strftime('%Y-%m-%d')
+        values = zip(
+            [item_id] * len(forecast_df),
+            [store_id] * len(forecast_df),
+            dates,
+            forecast_df['predicted_demand'].astype(float),
+            forecast_df['lower_bound'].astype(float),
+            forecast_df['upper_bound'].astype(float)
+        )
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM forecast_values WHERE item_id = ? AND store_id = ?",
+                (item_id, store_id)
+            )
+            self.conn.executemany(
+                "INSERT INTO forecast_values VALUES (?, ?, ?, ?, ?, ?)", values
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO forecast_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    item_id, store_id, model_name, horizon,
+                    datetime.now().isoformat(timespec='seconds'),
+                    summary['historical_mean'],
+                    summary['historical_std'],
+                    summary['forecast_mean'],
+                    float(forecast_df['predicted_demand'].std(ddof=0)),
+                    summary['forecast_total']
+                )
+            )
+        record_database_write('forecast_values', 'forecast_summaries')
+
+    def load_summaries(self, store_id=None, state_id=None):
+        '''
+        Load cached forecast summaries for all series (optionally one store
+        or one state)
+
+        Returns:
+            DataFrame with one row per item-store series
+        '''
+        query = """
+            SELECT item_id, store_id, model, horizon, generated_at,
+                   historical_mean, historical_std,
+                   forecast_mean, forecast_std, forecast_total
+            FROM forecast_summaries
+        """
+        condition, params = scope_condition(store_id, state_id)
+        if condition:
+            query += f" WHERE {condition}"
+
+        return pd.read_sql_query(query, self.conn, params=params)
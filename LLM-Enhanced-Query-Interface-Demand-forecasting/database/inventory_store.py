@@ -0,0 +1,364 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from utils.result_cache import record_database_write
+from .connection import ensure_tables, get_db_connection
+
+INVENTORY_TABLES_DDL = """
+CREATE TABLE IF NOT EXISTS inventory_snapshots (
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    on_hand REAL NOT NULL,
+    PRIMARY KEY (item_id, store_id, snapshot_date)
+);
+CREATE TABLE IF NOT EXISTS inventory_policies (
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    lead_time_days INTEGER,
+    service_level REAL,
+    order_cost REAL,
+    holding_cost_per_unit REAL,
+    moq REAL,
+    pack_size REAL,
+    unit_cost REAL,
+    unit_volume REAL,
+    PRIMARY KEY (item_id, store_id)
+);
+CREATE TABLE IF NOT EXISTS inventory_alerts (
+    scope TEXT NOT NULL,
+    scanned_at TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    urgency TEXT NOT NULL,
+    severity REAL,
+    message TEXT,
+    current_inventory REAL,
+    reorder_point REAL,
+    days_of_stock REAL,
+    forecast_mean REAL,
+    historical_mean REAL,
+    demand_source TEXT,
+    PRIMARY KEY (scope, rank)
+);
+CREATE TABLE IF NOT EXISTS replenishment_plans (
+    scope TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    item_id TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    on_hand REAL,
+    reorder_point REAL,
+    days_of_cover REAL,
+    recommended_quantity REAL,
+    order_quantity REAL,
+    unit_cost REAL,
+    cost_source TEXT,
+    order_value REAL,
+    order_volume REAL,
+    demand_source TEXT,
+    PRIMARY KEY (scope, rank)
+);
+"""
+
+# Nullable per-series policy parameters; NULL means "use the default"
+POLICY_COLUMNS = [
+    'lead_time_days', 'service_level', 'order_cost', 'holding_cost_per_unit',
+    'moq', 'pack_size', 'unit_cost', 'unit_volume'
+]
+
+# SQLite limits bound parameters per statement, so key lists are chunked
+MAX_KEYS_PER_QUERY = 400
+
+def scope_condition(store_id=None, state_id=None):
+    '''
+    SQL condition restricting rows to one store or one state (region)
+    M5 store ids are prefixed with their state, e.g. CA_1
+    
+    Returns:
+        (condition, params); condition is None for the whole fleet
+    '''
+    if store_id:
+        return "store_id = ?", [store_id]
+    if state_id:
+        return "store_id LIKE ? ESCAPE '\\'", [f"{state_id}\\_%"]
+    return None, []
+
+def dataframe_rows(df, columns=None):
+    '''
+    Convert a DataFrame to tuples of plain Python values
+    NaN and infinite values become None (NULL in SQLite, null in JSON)
+    '''
+    frame = df if columns is None else df[columns]
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return list(frame.itertuples(index=False, name=None))
+
+class InventoryStore:
+    '''Inventory snapshots, policies and scan results stored alongside the sales data'''
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_db_connection()
+        ensure_tables(self.conn, 'inventory', InventoryStore._create_tables)
+    
+    @staticmethod
+    def _create_tables(conn):
+        '''Create the tables and add columns missing from older versions'''
+        conn.executescript(INVENTORY_TABLES_DDL)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(inventory_policies)")}
+        for col in POLICY_COLUMNS:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE inventory_policies ADD COLUMN {col} REAL")
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(replenishment_plans)")}
+        if 'cost_source' not in existing:
+            conn.execute("ALTER TABLE replenishment_plans ADD COLUMN cost_source TEXT")
+        conn.commit()
+
+    @staticmethod
+    def read_table_file(path, chunksize=10000):
+        '''
+        Read a CSV or Parquet file in chunks
+
+        Yields:
+            DataFrames of at most chunksize rows
+        '''
+        path = str(path)
+        if path.lower().endswith(('.parquet', '.pq')):
+            df = pd.read_parquet(path)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+        else:
+            yield from pd.read_csv(path, chunksize=chunksize)
+
+    def _bulk_insert(self, table, columns, frames):
+        '''Insert (or replace) DataFrame chunks in a single transaction'''
+        statement = (
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))})"
+        )
+        total = 0
+        with self.conn:
+            for frame in frames:
+                rows = dataframe_rows(frame, columns)
+                self.conn.executemany(statement, rows)
+                total += len(rows)
+        record_database_write(table)
+        return total
+
+    @staticmethod
+    def _check_columns(frame, required):
+        missing = [col for col in required if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    def load_snapshots(self, source, snapshot_date=None, batch_size=10000):
+        '''
+        Bulk load on-hand snapshots
+
+        Args:
+            source: CSV/Parquet path or DataFrame with item_id, store_id,
+                    on_hand and optionally snapshot_date
+            snapshot_date: Date used when the file has no snapshot_date
+                           column (default: today)
+            batch_size: Rows per executemany batch
+
+        Returns:
+            Number of rows written
+        '''
+        snapshot_date = snapshot_date or date.today().isoformat()
+
+        def frames():
+            chunks = (
+                [source.iloc[i:i + batch_size] for i in range(0, len(source), batch_size)]
+                if isinstance(source, pd.DataFrame)
+                else self.read_table_file(source, batch_size)
+            )
+            for chunk in chunks:
+                self._check_columns(chunk, ['item_id', 'store_id', 'on_hand'])
+                chunk = chunk.copy()
+                if 'snapshot_date' not in chunk.columns:
+                    chunk['snapshot_date'] = snapshot_date
+                chunk['snapshot_date'] = pd.to_datetime(chunk['snapshot_date']).dt.strftime('%Y-%m-%d')
+                chunk['on_hand'] = pd.to_numeric(chunk['on_hand'], errors='raise')
+                yield chunk
+
+        return self._bulk_insert(
+            'inventory_snapshots',
+            ['item_id', 'store_id', 'snapshot_date', 'on_hand'],
+            frames()
+        )
+
+    def load_policies(self, source, batch_size=10000):
+        '''
+        Bulk load per item-store policy parameters
+
+        Args:
+            source: CSV/Parquet path or DataFrame with item_id, store_id and
+                    any of the policy columns; omitted columns are stored
+                    as NULL so the caller's defaults apply
+            batch_size: Rows per executemany batch
+
+        Returns:
+            Number of rows written
+        '''
+        def frames():
+            chunks = (
+                [source.iloc[i:i + batch_size] for i in range(0, len(source), batch_size)]
+                if isinstance(source, pd.DataFrame)
+                else self.read_table_file(source, batch_size)
+            )
+            for chunk in chunks:
+                self._check_columns(chunk, ['item_id', 'store_id'])
+                chunk = chunk.copy()
+                for col in POLICY_COLUMNS:
+                    if col not in chunk.columns:
+                        chunk[col] = np.nan
+                    chunk[col] = pd.to_numeric(chunk[col], errors='raise')
+                yield chunk
+
+        return self._bulk_insert(
+            'inventory_policies',
+            ['item_id', 'store_id'] + POLICY_COLUMNS,
+            frames()
+        )
+
+    def latest_snapshots(self, store_id=None):
+        '''
+        Latest on-hand snapshot for every item-store series
+
+        Returns:
+            DataFrame with item_id, store_id, snapshot_date, on_hand
+        '''
+        state = self.get_inventory_state(store_id=store_id)
+        state = state[state['on_hand'].notna()]
+        return state[['item_id', 'store_id', 'snapshot_date', 'on_hand']].reset_index(drop=True)
+
+    def get_inventory_state(self, store_id=None, pairs=None, defaults=None, state_id=None):
+        '''
+        Latest on-hand level and policy parameters in one set-based query
+
+        Args:
+            store_id: Every series with a snapshot or policy in this store
+                      (all stores when None and no pairs are given)
+            state_id: Every series in this state when no store_id is given
+            pairs: Explicit list of (item_id, store_id) keys; queried in
+                   chunks of MAX_KEYS_PER_QUERY
+            defaults: dict of policy defaults for NULL policy values
+
+        Returns:
+            DataFrame with item_id, store_id, snapshot_date, on_hand and the
+            policy columns (on_hand is NaN when there is no snapshot)
+        '''
+        defaults = defaults or {}
+        policy_select = ",\n".join(
+            f"COALESCE(p.{col}, ?) AS {col}" for col in POLICY_COLUMNS
+        )
+        policy_params = [defaults.get(col) for col in POLICY_COLUMNS]
+
+        query = """
+            WITH requested(item_id, store_id) AS ({requested}),
+            latest AS (
+                SELECT item_id, store_id, MAX(snapshot_date) AS snapshot_date
+                FROM inventory_snapshots
+                WHERE (item_id, store_id) IN (SELECT item_id, store_id FROM requested)
+                GROUP BY item_id, store_id
+            )
+            SELECT r.item_id, r.store_id, l.snapshot_date, s.on_hand,
+                   {policy_select}
+            FROM requested r
+            LEFT JOIN latest l
+                ON l.item_id = r.item_id AND l.store_id = r.store_id
+            LEFT JOIN inventory_snapshots s
+                ON s.item_id = l.item_id AND s.store_id = l.store_id
+               AND s.snapshot_date = l.snapshot_date
+            LEFT JOIN inventory_policies p
+                ON p.item_id = r.item_id AND p.store_id = r.store_id
+        """
+
+        if pairs is None:
+            condition, scope_params = scope_condition(store_id, state_id)
+            where = f"WHERE {condition}" if condition else ""
+            requested = (
+                f"SELECT item_id, store_id FROM inventory_snapshots {where} "
+                f"UNION SELECT item_id, store_id FROM inventory_policies {where}"
+            )
+            params = scope_params * 2
+            sql = query.format(requested=requested, policy_select=policy_select)
+            return pd.read_sql_query(sql, self.conn, params=params + policy_params)
+
+        pairs = list(pairs)
+        frames = []
+        for start in range(0, len(pairs), MAX_KEYS_PER_QUERY):
+            chunk = pairs[start:start + MAX_KEYS_PER_QUERY]
+            requested = "VALUES " + ", ".join(["(?, ?)"] * len(chunk))
+            params = [value for pair in chunk for value in pair]
+            sql = query.format(requested=requested, policy_select=policy_select)
+            frames.append(pd.read_sql_query(sql, self.conn, params=params + policy_params))
+
+        if not frames:
+            columns = ['item_id', 'store_id', 'snapshot_date', 'on_hand'] + POLICY_COLUMNS
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def _replace_scope(self, table, stamp_column, scope, stamp, df, columns):
+        '''Replace all rows of a scope in a ranked result table'''
+        rows = [(scope, stamp) + row for row in dataframe_rows(df, columns)]
+        
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table} WHERE scope = ?", (scope,))
+            self.conn.executemany(
+                f"INSERT INTO {table} (scope, {stamp_column}, {', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * (len(columns) + 2))})",
+                rows
+            )
+        record_database_write(table)
+    
+    def _load_scope(self, table, scope, limit=None):
+        '''Load a ranked result table for a scope'''
+        query = f"SELECT * FROM {table} WHERE scope = ? ORDER BY rank"
+        params = [scope]
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        
+        return pd.read_sql_query(query, self.conn, params=params)
+    
+    def save_alerts(self, scope, scanned_at, alerts):
+        '''
+        Replace the stored alert scan for a scope ('ALL' or a store_id)
+        
+        Args:
+            alerts: Ranked alerts DataFrame from FleetAlertScanner
+        '''
+        columns = [
+            'rank', 'item_id', 'store_id', 'alert_type', 'urgency', 'severity',
+            'message', 'current_inventory', 'reorder_point', 'days_of_stock',
+            'forecast_mean', 'historical_mean', 'demand_source'
+        ]
+        self._replace_scope('inventory_alerts', 'scanned_at', scope, scanned_at, alerts, columns)
+    
+    def load_alerts(self, scope='ALL', limit=None):
+        '''Load the most recent stored alert scan for a scope'''
+        return self._load_scope('inventory_alerts', scope, limit)
+    
+    def save_plan(self, scope, created_at, plan):
+        '''
+        Replace the stored replenishment plan for a scope ('ALL', a store_id
+        or a state_id)
+        
+        Args:
+            plan: Plan DataFrame from ReplenishmentPlanner
+        '''
+        columns = [
+            'rank', 'item_id', 'store_id', 'status', 'on_hand', 'reorder_point',
+            'days_of_cover', 'recommended_quantity', 'order_quantity',
+            'unit_cost', 'cost_source', 'order_value', 'order_volume', 'demand_source'
+        ]
+        self._replace_scope('replenishment_plans', 'created_at', scope, created_at, plan, columns)
+    
+    def load_plan(self, scope='ALL', limit=None):
+        '''Load the most recent stored replenishment plan for a scope'''
+        return self._load_scope('replenishment_plans', scope, limit)
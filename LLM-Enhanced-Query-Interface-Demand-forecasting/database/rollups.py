@@ -0,0 +1,147 @@
+from datetime import datetime
+from utils.result_cache import record_database_write
+from .connection import get_db_connection
+
+# One row per (period, store, department): the finest level of the M5
+# hierarchy above the item. State and category come along with store and
+# department, so every coarser level is a GROUP BY over a few thousand rows.
+ROLLUP_GRAINS = {
+    'daily': ('sales_rollup_daily', 'date', 'date'),
+    'weekly': ('sales_rollup_weekly', 'week_start', "date(date, '-6 days', 'weekday 6')"),
+    'monthly': ('sales_rollup_monthly', 'month', "strftime('%Y-%m', date)"),
+}
+ROLLUP_TABLES = tuple(table for table, _, _ in ROLLUP_GRAINS.values())
+
+ROLLUP_TABLES_DDL = "\n".join(f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    {period} TEXT NOT NULL,
+    store_id TEXT NOT NULL,
+    state_id TEXT,
+    dept_id TEXT NOT NULL,
+    cat_id TEXT,
+    sales INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    PRIMARY KEY ({period}, store_id, dept_id)
+);""" for table, period, _ in ROLLUP_GRAINS.values()) + """
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name TEXT PRIMARY KEY,
+    source_max_rowid INTEGER NOT NULL,
+    refreshed_at TEXT
+);
+"""
+
+class RollupStore:
+    '''
+    Pre-aggregated copies of sales_long at daily, weekly and monthly grain
+
+    sales is the summed daily sales and n_rows the number of sales_long rows
+    behind each rollup row (for COUNT and AVG). Refreshes are incremental:
+    sales_long is append-only, so only rows above the last seen rowid are
+    aggregated into the daily rollup, and the weekly and monthly rollups are
+    rebuilt from the (small) daily one.
+    '''
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_db_connection()
+
+    def _source_max_rowid(self):
+        return self.conn.execute("SELECT MAX(rowid) FROM sales_long").fetchone()[0] or 0
+
+    def _watermark(self):
+        try:
+            row = self.conn.execute(
+                "SELECT source_max_rowid FROM rollup_state WHERE name = 'sales_long'"
+            ).fetchone()
+        except Exception:
+            return None
+        return row[0] if row else None
+
+    def is_fresh(self):
+        '''True when the rollups cover every row currently in sales_long'''
+        watermark = self._watermark()
+        return watermark is not None and watermark == self._source_max_rowid()
+
+    def refresh(self, full=False):
+        '''
+        Bring the rollups up to date with sales_long
+
+        Args:
+            full: Rebuild from scratch instead of adding new rows only; done
+                  automatically when sales_long shrank (rows were deleted)
+
+        Returns:
+            dict with mode ('full', 'incremental' or 'current'), the number of
+            sales_long rows aggregated and the row count of each rollup
+        '''
+        self.conn.executescript(ROLLUP_TABLES_DDL)
+        source_max = self._source_max_rowid()
+        watermark = self._watermark()
+        if watermark is not None and watermark > source_max:
+            full = True
+
+        if not full and watermark == source_max:
+            mode, start = 'current', source_max
+        elif full or watermark is None:
+            mode, start = 'full', 0
+        else:
+            mode, start = 'incremental', watermark
+
+        daily, _, _ = ROLLUP_GRAINS['daily']
+        with self.conn:
+            if mode == 'full':
+                for table in ROLLUP_TABLES:
+                    self.conn.execute(f"DELETE FROM {table}")
+            aggregated = 0
+            if mode != 'current':
+                aggregated = self.conn.execute(
+                    "SELECT COUNT(*) FROM sales_long WHERE rowid > ? AND rowid <= ?", (start, source_max)
+                ).fetchone()[0]
+                self.conn.execute(f"""
+                    INSERT INTO {daily} (date, store_id, state_id, dept_id, cat_id, sales, n_rows)
+                    SELECT date, store_id, MAX(state_id), dept_id, MAX(cat_id), SUM(sales), COUNT(*)
+                    FROM sales_long
+                    WHERE rowid > ? AND rowid <= ?
+                    GROUP BY date, store_id, dept_id
+                    ON CONFLICT (date, store_id, dept_id) DO UPDATE SET
+                        sales = sales + excluded.sales,
+                        n_rows = n_rows + excluded.n_rows
+                """, (start, source_max))
+
+                for grain in ('weekly', 'monthly'):
+                    table, period, expression = ROLLUP_GRAINS[grain]
+                    self.conn.execute(f"DELETE FROM {table}")
+                    self.conn.execute(f"""
+                        INSERT INTO {table} ({period}, store_id, state_id, dept_id, cat_id, sales, n_rows)
+                        SELECT {expression}, store_id, MAX(state_id), dept_id, MAX(cat_id),
+                               SUM(sales), SUM(n_rows)
+                        FROM {daily}
+                        GROUP BY 1, store_id, dept_id
+                    """)
+
+            self.conn.execute("""
+                INSERT OR REPLACE INTO rollup_state (name, source_max_rowid, refreshed_at)
+                VALUES ('sales_long', ?, ?)
+            """, (source_max, datetime.now().isoformat(timespec='seconds')))
+        record_database_write('rollup_state', *ROLLUP_TABLES)
+
+        return {
+            'mode': mode,
+            'rows_aggregated': aggregated,
+            'tables': {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                       for table in ROLLUP_TABLES}
+        }
+
+def describe_rollups(schema):
+    '''
+    Prompt note advertising the rollup tables present in schema, or ""
+    '''
+    present = [(table, period) for table, period, _ in ROLLUP_GRAINS.values() if table in schema]
+    if not present:
+        return ""
+    lines = ["Pre-aggregated sales tables (much faster than sales_long; use them when item_id "
+             "is not needed). sales is already summed; n_rows is the number of daily item rows:"]
+    notes = {'week_start': " (Saturday that starts the Walmart week)", 'month': " ('YYYY-MM')"}
+    for table, period in present:
+        lines.append(f"  - {table} ({period}{notes.get(period, '')}, store_id, state_id, "
+                     f"dept_id, cat_id, sales, n_rows)")
+    return "\n".join(lines)
@@ -0,0 +1,241 @@
+import math
+import re
+import threading
+from collections import Counter
+from config import Config
+from utils.tokens import estimate_tokens
+from .connection import get_db_connection
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Day columns of the wide sales table (d_1 ... d_1941), collapsed to one line
+WIDE_COLUMN = re.compile(r'^d_\d+$')
+
+# Join keys, always described with their type
+KEY_COLUMNS = ('item_id', 'store_id', 'date')
+
+# Sample values longer than this are free text and not worth the tokens
+MAX_SAMPLE_LENGTH = 24
+
+# Unpinned tables scoring below this share of the best table are left out
+MIN_RELATIVE_TABLE_SCORE = 0.5
+
+# Question words -> schema words they usually refer to in the M5 database
+SYNONYMS = {
+    'sold': 'sales', 'sell': 'sales', 'selling': 'sales', 'seller': 'sales',
+    'demand': 'sales', 'unit': 'sales', 'volume': 'sales', 'revenue': 'sales price',
+    'price': 'sell_price', 'priced': 'sell_price', 'cost': 'sell_price unit_cost',
+    'expensive': 'sell_price', 'cheap': 'sell_price', 'cheapest': 'sell_price',
+    'product': 'item', 'category': 'cat_id', 'categories': 'cat_id',
+    'department': 'dept_id', 'dept': 'dept_id', 'shop': 'store', 'outlet': 'store',
+    'region': 'state', 'california': 'ca', 'texas': 'tx', 'wisconsin': 'wi',
+    'holiday': 'event', 'weekend': 'weekday', 'weekly': 'wm_yr_wk week',
+    'day': 'date', 'daily': 'date', 'monthly': 'month', 'yearly': 'year', 'annual': 'year',
+    'stock': 'on_hand inventory', 'stockout': 'alert inventory', 'reorder': 'reorder_point',
+    'purchase': 'order_quantity replenishment', 'order': 'order_quantity',
+    'predicted': 'forecast', 'prediction': 'forecast', 'projected': 'forecast',
+}
+
+def tokenize(text):
+    '''Lower-case word tokens with a crude plural strip, so sales ~ sale'''
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+_SYNONYM_INDEX = {tokenize(word)[0]: tokenize(target) for word, target in SYNONYMS.items()}
+
+def expand_query(question):
+    '''Question tokens plus the schema words their synonyms point to'''
+    tokens = tokenize(question)
+    expanded = list(tokens)
+    for token in tokens:
+        expanded.extend(_SYNONYM_INDEX.get(token, []))
+    return expanded
+
+class SchemaIndex:
+    '''
+    Lexical TF-IDF index over tables, columns and sample values
+
+    Each column is a document made of its name, its table's name and a few
+    distinct sample values; tables are ranked by their best columns.
+    '''
+
+    def __init__(self, schema, sample_values=None):
+        '''
+        Args:
+            schema: dict from get_schema()
+            sample_values: {(table, column): [values]} for TEXT columns
+        '''
+        self.schema = schema
+        self.sample_values = sample_values or {}
+        self.documents = {}
+        for table, info in schema.items():
+            for column in info['columns']:
+                if WIDE_COLUMN.match(column):
+                    continue
+                words = tokenize(column) + [column.lower()] + tokenize(table)
+                for value in self.sample_values.get((table, column), []):
+                    words += tokenize(value)
+                self.documents[(table, column)] = Counter(words)
+
+        document_frequency = Counter()
+        for words in self.documents.values():
+            document_frequency.update(words.keys())
+        n = max(len(self.documents), 1)
+        self.idf = {w: math.log(1 + n / df) for w, df in document_frequency.items()}
+
+    def score_columns(self, question):
+        '''Relevance of every column to the question, {(table, column): score}'''
+        query = Counter(expand_query(question))
+        scores = {}
+        for key, words in self.documents.items():
+            score = sum(self.idf[w] * min(count, words[w]) for w, count in query.items() if w in words)
+            if score:
+                scores[key] = score
+        return scores
+
+    def rank_tables(self, question, column_scores=None):
+        '''Tables ordered by the sum of their three best column scores'''
+        column_scores = column_scores if column_scores is not None else self.score_columns(question)
+        by_table = {}
+        for (table, _), score in column_scores.items():
+            by_table.setdefault(table, []).append(score)
+        totals = {t: sum(sorted(s, reverse=True)[:3]) for t, s in by_table.items()}
+        return sorted(totals, key=lambda t: (-totals[t], t))
+
+    def _table_block(self, table, column_scores, budget, all_columns=True):
+        '''
+        Formatted table description, most relevant columns first, within budget tokens
+
+        With all_columns=False only relevant and key columns get a line;
+        the rest are listed by name.
+        '''
+        info = self.schema[table]
+        columns = [c for c in info['columns'] if not WIDE_COLUMN.match(c)]
+        wide = len(info['columns']) - len(columns)
+        # Relevant columns first, then the rest in table order
+        ordered = sorted(columns, key=lambda c: -column_scores.get((table, c), 0))
+        if not all_columns:
+            named_only = [c for c in ordered
+                          if not column_scores.get((table, c)) and c not in KEY_COLUMNS]
+            ordered = [c for c in ordered if c not in named_only]
+
+        lines = [f"Table: {table}", "Columns:"]
+        used = estimate_tokens('\n'.join(lines))
+        shown = 0
+        for column in ordered:
+            line = f"  - {column} ({info['types'].get(column) or 'TEXT'})"
+            values = self.sample_values.get((table, column))
+            if values:
+                line += " e.g. " + ", ".join(repr(v) for v in values)
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget and shown:
+                break
+            lines.append(line)
+            used += cost
+            shown += 1
+
+        if not all_columns and named_only:
+            lines.append(f"  Other columns: {', '.join(named_only)}")
+        elif shown < len(ordered):
+            lines.append(f"  ... and {len(ordered) - shown} more columns")
+        if wide:
+            lines.append(f"  - d_1 ... d_{wide} (one sales column per day; prefer sales_long)")
+        return '\n'.join(lines), used
+
+    def build_context(self, question, token_budget=None, max_tables=None, pinned_tables=None,
+                      excluded_tables=None):
+        '''
+        Schema description limited to the tables relevant to question
+
+        Args:
+            question: Natural language question
+            token_budget: Approximate token limit for the whole context
+            max_tables: Most tables to describe
+            pinned_tables: Tables always included first (if they exist)
+            excluded_tables: Tables never described, only named
+
+        Returns:
+            Formatted schema context string
+        '''
+        token_budget = token_budget or Config.SCHEMA_CONTEXT_TOKEN_BUDGET
+        max_tables = max_tables or Config.SCHEMA_CONTEXT_MAX_TABLES
+        if pinned_tables is None:
+            pinned_tables = [t.strip() for t in Config.SCHEMA_PINNED_TABLES.split(',') if t.strip()]
+        if excluded_tables is None:
+            excluded_tables = [t.strip() for t in Config.SCHEMA_EXCLUDED_TABLES.split(',') if t.strip()]
+
+        column_scores = self.score_columns(question)
+        pinned = [t for t in pinned_tables if t in self.schema]
+        matches = [t for t in self.rank_tables(question, column_scores)
+                   if t not in pinned and t not in excluded_tables]
+        if matches:
+            totals = {t: sum(sorted((s for (tt, _), s in column_scores.items() if tt == t),
+                                    reverse=True)[:3]) for t in matches}
+            best = totals[matches[0]]
+            matches = [t for t in matches if totals[t] >= MIN_RELATIVE_TABLE_SCORE * best]
+        ranked = (pinned + matches)[:max_tables]
+
+        header = "Database Schema (tables relevant to the question):"
+        blocks = [header]
+        described = []
+        remaining = token_budget - estimate_tokens(header)
+        for table in ranked:
+            if remaining <= 0:
+                break
+            block, used = self._table_block(table, column_scores, remaining,
+                                            all_columns=table in pinned)
+            blocks.append(block)
+            described.append(table)
+            remaining -= used
+
+        omitted = [t for t in self.schema if t not in described]
+        if omitted:
+            blocks.append(f"Other tables: {', '.join(omitted)}")
+        return '\n\n'.join(blocks)
+
+def load_sample_values(conn, schema, limit=None):
+    '''A few distinct non-null values of every TEXT column, {(table, column): [values]}'''
+    limit = Config.SCHEMA_SAMPLE_VALUES if limit is None else limit
+    samples = {}
+    if limit <= 0:
+        return samples
+    for table, info in schema.items():
+        for column in info['columns']:
+            col_type = (info['types'].get(column) or 'TEXT').upper()
+            if WIDE_COLUMN.match(column) or 'CHAR' not in col_type and 'TEXT' not in col_type:
+                continue
+            try:
+                rows = conn.execute(
+                    f'SELECT DISTINCT "{column}" FROM "{table}" WHERE "{column}" IS NOT NULL LIMIT ?',
+                    (limit,)
+                ).fetchall()
+            except Exception:
+                continue
+            values = [str(row[0]) for row in rows]
+            if values and all(len(v) <= MAX_SAMPLE_LENGTH for v in values):
+                samples[(table, column)] = values
+    return samples
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+def get_schema_index(schema):
+    '''SchemaIndex for this schema, built once per database and schema shape'''
+    signature = (Config.DATABASE_PATH,
+                 tuple((t, tuple(info['columns'])) for t, info in sorted(schema.items())))
+    with _index_lock:
+        index = _index_cache.get(signature)
+        if index is None:
+            index = SchemaIndex(schema, load_sample_values(get_db_connection(), schema))
+            _index_cache.clear()
+            _index_cache[signature] = index
+    return index
+
+def create_relevant_schema_context(question, schema, pinned_tables=None, excluded_tables=None):
+    '''Relevance-filtered schema context for the question, see SchemaIndex.build_context'''
+    return get_schema_index(schema).build_context(question, pinned_tables=pinned_tables,
+                                                  excluded_tables=excluded_tables)
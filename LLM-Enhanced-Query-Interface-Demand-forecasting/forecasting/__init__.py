@@ -1,11 +1,26 @@
-from .data_preparation import DataPreparation
-from .feature_engineering import FeatureEngineer
-from .forecaster import Forecaster
-from .evaluator import ForecastEvaluator
+import importlib
+
+# Submodules pull in pandas, sklearn and Prophet, so they are imported
+# only when one of these names is first used
+_LAZY_EXPORTS = {
+    'DataPreparation': '.data_preparation',
+    'FeatureEngineer': '.feature_engineering',
+    'Forecaster': '.forecaster',
+    'ForecastEvaluator': '.evaluator',
+    'ForecastResult': '.result'
+}
 
 __all__ = [
     'DataPreparation',
     'FeatureEngineer', 
     'Forecaster',
-    'ForecastEvaluator'
-]
\ No newline at end of file
+    'ForecastEvaluator',
+    'ForecastResult'
+]
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
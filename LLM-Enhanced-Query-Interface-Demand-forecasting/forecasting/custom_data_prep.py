@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from database.connection import get_db_connection
 from datetime import datetime, timedelta
+from utils.log import get_logger
+
+log = get_logger(__name__)
 
 class CustomDataPreparation:
     '''Data preparation for melted/long format dataset'''
@@ -23,22 +26,15 @@ class CustomDataPreparation:
             ORDER BY date
         """
         
-        print(f"[DEBUG] Fetching data for item={item_id}, store={store_id}")
-        
         try:
             df = pd.read_sql_query(query, conn, params=[item_id, store_id])
-            print(f"[DEBUG] Fetched {len(df)} rows from sales_long")
-            
-            if not df.empty:
-                print(f"[DEBUG] Columns: {df.columns.tolist()}")
-                print(f"[DEBUG] First 5 rows:\n{df.head()}")
+            log.debug('sales_fetched', item_id=item_id, store_id=store_id, rows=len(df),
+                      head=lambda: df.head().to_dict('records'))
             
             return df
             
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch from sales_long: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            log.exception('sales_fetch_failed', item_id=item_id, store_id=store_id)
             return pd.DataFrame()
     
     def merge_calendar_data(self, sales_df):
@@ -58,12 +54,12 @@ class CustomDataPreparation:
             
             # Merge on date
             merged = sales_df.merge(calendar, on='date', how='left')
-            print(f"[DEBUG] After calendar merge: {len(merged)} rows")
+            log.debug('calendar_merged', rows=len(merged))
             
             return merged
             
         except Exception as e:
-            print(f"[WARN] Calendar merge failed: {e}")
+            log.warning('calendar_merge_failed', error=str(e))
             return sales_df
     
     def merge_price_data(self, sales_df):
@@ -97,12 +93,12 @@ class CustomDataPreparation:
                 how='left'
             )
             
-            print(f"[DEBUG] After price merge: {len(merged)} rows")
+            log.debug('prices_merged', rows=len(merged))
             
             return merged
             
         except Exception as e:
-            print(f"[WARN] Price merge failed: {e}")
+            log.warning('price_merge_failed', error=str(e))
             return sales_df
     
     def prepare_forecast_data(self, item_id, store_id, horizon=28):
@@ -117,13 +113,6 @@ class CustomDataPreparation:
         Returns:
             Prepared DataFrame with columns: date, sales, and optional features
         '''
-        print(f"\n{'='*60}")
-        print(f"DATA PREPARATION - LONG FORMAT")
-        print(f"{'='*60}")
-        print(f"Item: {item_id}")
-        print(f"Store: {store_id}")
-        print(f"{'='*60}\n")
-        
         # Step 1: Fetch sales data
         df = self.get_sales_data(item_id, store_id)
         
@@ -150,14 +139,9 @@ class CustomDataPreparation:
         df = self.merge_calendar_data(df)
         df = self.merge_price_data(df)
         
-        # Step 6: Validate data quality
-        print(f"\n[INFO] Data Quality Check:")
-        print(f"  ✓ Total days: {len(df)}")
-        print(f"  ✓ Date range: {df['date'].min()} to {df['date'].max()}")
-        print(f"  ✓ Sales range: {df['sales'].min():.2f} to {df['sales'].max():.2f}")
-        print(f"  ✓ Average sales: {df['sales'].mean():.2f}")
-        print(f"  ✓ Days with sales > 0: {(df['sales'] > 0).sum()}")
-        print(f"  ✓ Zero sales days: {(df['sales'] == 0).sum()}")
+        # Step 6: Data quality stats, only computed when DEBUG is enabled
+        log.debug('data_quality', item_id=item_id, store_id=store_id,
+                  stats=lambda: self._quality_stats(df))
         
         # Step 7: Check minimum data requirement
         if len(df) < 30:
@@ -168,6 +152,21 @@ class CustomDataPreparation:
                 f"This item-store combination doesn't have enough historical data."
             )
         
-        print(f"\n✅ Data preparation successful!\n")
+        log.info('forecast_data_prepared', item_id=item_id, store_id=store_id, days=len(df))
         
         return df
+    
+    @staticmethod
+    def _quality_stats(df):
+        '''Summary of the prepared series for debug logging'''
+        sales = df['sales']
+        return {
+            'days': len(df),
+            'start': str(df['date'].min().date()),
+            'end': str(df['date'].max().date()),
+            'sales_min': float(sales.min()),
+            'sales_max': float(sales.max()),
+            'sales_mean': round(float(sales.mean()), 2),
+            'days_with_sales': int((sales > 0).sum()),
+            'zero_sales_days': int((sales == 0).sum())
+        }
@@ -1,17 +1,25 @@
 import pandas as pd
+from config import Config
 from .data_preparation import DataPreparation
 from forecasting.custom_data_prep import CustomDataPreparation
 from .feature_engineering import FeatureEngineer
 from .models.model_selector import ModelSelector
+from .result import ForecastResult
+from database.forecast_store import ForecastStore
+from utils.log import get_logger
+from utils.metrics import metrics
+
+log = get_logger(__name__)
 
 class Forecaster:
     '''Main forecasting orchestrator'''
     
-    def __init__(self, model_name='prophet'):
+    def __init__(self, model_name='prophet', cache_results=True):
         self.data_prep = CustomDataPreparation()
         self.feature_eng = FeatureEngineer()
         self.model_name = model_name
         self.model = None
+        self.cache_results = cache_results
     
     def generate_forecast(self, item_id, store_id, horizon=28):
         '''
@@ -23,11 +31,14 @@ class Forecaster:
             horizon: Forecast horizon in days
         
         Returns:
-            dict with forecast results and metadata
+            ForecastResult holding the forecast and the last
+            Config.FORECAST_HISTORY_DAYS of history as arrays, or
+            {'success': False, 'error': ...}
         '''
         try:
             # Step 1: Prepare data
-            df = self.data_prep.prepare_forecast_data(item_id, store_id, horizon)
+            with metrics.span('data_prep', pipeline='forecast'):
+                df = self.data_prep.prepare_forecast_data(item_id, store_id, horizon)
             
             if df.empty or len(df) < 30:  # Need minimum data
                 return {
@@ -42,24 +53,25 @@ class Forecaster:
             self.model = ModelSelector.get_model(self.model_name)
             
             # Step 4: Fit model
-            self.model.fit(df)
+            with metrics.span('fit', pipeline='forecast'):
+                self.model.fit(df)
             
             # Step 5: Generate predictions
-            forecast_df = self.model.predict(horizon=horizon)
+            with metrics.span('predict', pipeline='forecast'):
+                forecast_df = self.model.predict(horizon=horizon)
             
             # Step 6: Calculate summary statistics
             summary = self._calculate_summary(df, forecast_df)
             
-            return {
-                'success': True,
-                'item_id': item_id,
-                'store_id': store_id,
-                'horizon': horizon,
-                'model_used': self.model.get_model_name(),
-                'forecast': forecast_df.to_dict('records'),
-                'summary': summary,
-                'historical_data': df[['date', 'sales']].tail(30).to_dict('records')
-            }
+            # Step 7: Cache for fleet-wide alert scans and batch jobs
+            if self.cache_results:
+                with metrics.span('cache_write', pipeline='forecast'):
+                    self._cache_forecast(item_id, store_id, horizon, forecast_df, summary)
+            
+            return ForecastResult.from_frame(
+                item_id, store_id, horizon, self.model.get_model_name(),
+                forecast_df, summary=summary, history=self._history_columns(df)
+            )
             
         except Exception as e:
             return {
@@ -67,12 +79,36 @@ class Forecaster:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _history_columns(df):
+        '''Recent history as NumPy columns (dates as datetime64[D])'''
+        if Config.FORECAST_HISTORY_DAYS:
+            df = df.tail(Config.FORECAST_HISTORY_DAYS)
+        return {
+            'date': df['date'].to_numpy(dtype='datetime64[D]'),
+            'sales': df['sales'].to_numpy(dtype='float64')
+        }
+    
+    def _cache_forecast(self, item_id, store_id, horizon, forecast_df, summary):
+        '''Store the forecast; a cache failure never fails the forecast'''
+        try:
+            ForecastStore().save_forecast(
+                item_id, store_id, self.model.get_model_name(),
+                horizon, forecast_df, summary
+            )
+        except Exception as e:
+            log.warning('forecast_cache_write_failed', item_id=item_id,
+                        store_id=store_id, error=str(e))
+    
     def _calculate_summary(self, historical_df, forecast_df):
         '''Calculate summary statistics'''
+        confidence = 0.95
+        if 'confidence' in forecast_df.columns and len(forecast_df):
+            confidence = float(forecast_df['confidence'].iloc[0])
         return {
             'historical_mean': float(historical_df['sales'].mean()),
             'historical_std': float(historical_df['sales'].std()),
             'forecast_mean': float(forecast_df['predicted_demand'].mean()),
             'forecast_total': float(forecast_df['predicted_demand'].sum()),
-            'confidence_level': 0.95
+            'confidence_level': confidence
         }
\ No newline at end of file
@@ -3,6 +3,9 @@ from .prophet_model import ProphetForecaster
 class ModelSelector:
     '''Select and initialize appropriate forecasting model'''
     
+    # Names accepted by get_model
+    AVAILABLE_MODELS = ('prophet',)
+    
     @staticmethod
     def get_model(model_name='prophet', **kwargs):
         '''
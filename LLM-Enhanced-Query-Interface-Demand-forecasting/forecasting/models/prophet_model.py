@@ -5,12 +5,18 @@ from .base_model import BaseModel
 class ProphetForecaster(BaseModel):
     '''Prophet-based forecasting model'''
     
-    def __init__(self, seasonality_mode='multiplicative'):
+    def __init__(self, seasonality_mode='multiplicative', interval_width=0.95):
+        '''
+        Args:
+            seasonality_mode: 'additive' or 'multiplicative'
+            interval_width: Coverage of the yhat_lower/yhat_upper interval
+        '''
         super().__init__()
         try:
             from prophet import Prophet
             self.Prophet = Prophet
             self.seasonality_mode = seasonality_mode
+            self.interval_width = interval_width
         except ImportError:
             raise ImportError("Prophet not installed. Install with: pip install prophet")
     
@@ -27,6 +33,7 @@ class ProphetForecaster(BaseModel):
         # Initialize and fit model
         self.model = self.Prophet(
             seasonality_mode=self.seasonality_mode,
+            interval_width=self.interval_width,
             daily_seasonality=True,
             weekly_seasonality=True,
             yearly_seasonality=True
@@ -67,7 +74,7 @@ class ProphetForecaster(BaseModel):
             'predicted_demand': forecast_future['yhat'].clip(lower=0),  # No negative sales
             'lower_bound': forecast_future['yhat_lower'].clip(lower=0),
             'upper_bound': forecast_future['yhat_upper'].clip(lower=0),
-            'confidence': 0.95  # Prophet uses 95% confidence interval by default
+            'confidence': self.model.interval_width  # Coverage of the bounds above
         })
         
         return result
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+import numpy as np
+
+# Days of history included in the JSON response (the full window stays
+# available to charts through ForecastResult.history)
+API_HISTORY_DAYS = 30
+
+@dataclass
+class ForecastResult:
+    '''
+    Forecast for one item-store series, as NumPy columns
+
+    Passed as is from the Forecaster through the inventory maths, alerts,
+    simulation and charts; to_dict() turns it into JSON-ready records once,
+    at the HTTP boundary.
+
+    Attributes:
+        dates: Forecast dates, datetime64[D]
+        predicted_demand, lower_bound, upper_bound: float64 arrays, one
+            value per date
+        confidence: Coverage of the lower/upper interval
+        summary: Summary statistics from Forecaster._calculate_summary
+        history: Recent actuals, {'date': datetime64[D], 'sales': float64}
+    '''
+
+    item_id: str
+    store_id: str
+    horizon: int
+    model_used: str
+    dates: np.ndarray
+    predicted_demand: np.ndarray
+    lower_bound: np.ndarray
+    upper_bound: np.ndarray
+    confidence: float = 0.95
+    summary: dict = field(default_factory=dict)
+    history: dict = field(default_factory=dict)
+
+    success = True
+
+    @classmethod
+    def from_frame(cls, item_id, store_id, horizon, model_used, forecast_df,
+                   summary=None, history=None):
+        '''
+        Build from the DataFrame returned by a model's predict()
+
+        Args:
+            forecast_df: date, predicted_demand, lower_bound, upper_bound and
+                         optionally confidence columns
+            history: Optional dict of 'date' and 'sales' arrays
+        '''
+        confidence = 0.95
+        if 'confidence' in forecast_df.columns and len(forecast_df):
+            confidence = float(forecast_df['confidence'].iloc[0])
+        return cls(
+            item_id=item_id,
+            store_id=store_id,
+            horizon=horizon,
+            model_used=model_used,
+            dates=forecast_df['date'].to_numpy(dtype='datetime64[D]'),
+            predicted_demand=forecast_df['predicted_demand'].to_numpy(dtype=np.float64),
+            lower_bound=forecast_df['lower_bound'].to_numpy(dtype=np.float64),
+            upper_bound=forecast_df['upper_bound'].to_numpy(dtype=np.float64),
+            confidence=confidence,
+            summary=summary or {},
+            history=history or {}
+        )
+
+    def __len__(self):
+        return len(self.dates)
+
+    # Mapping-style access to the metadata, for code written against the
+    # plain result dicts (templates, the NLG summarizer, the summary cache)
+    _KEYS = ('success', 'item_id', 'store_id', 'horizon', 'model_used', 'summary')
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def forecast_columns(self):
+        '''Forecast as a dict of arrays (date, predicted_demand, lower_bound, upper_bound)'''
+        return {
+            'date': self.dates,
+            'predicted_demand': self.predicted_demand,
+            'lower_bound': self.lower_bound,
+            'upper_bound': self.upper_bound
+        }
+
+    def forecast_records(self):
+        '''Forecast rows as JSON-ready dicts with YYYY-MM-DD dates'''
+        dates = np.datetime_as_string(self.dates, unit='D').tolist()
+        return [
+            {'date': date, 'predicted_demand': mean, 'lower_bound': lower,
+             'upper_bound': upper, 'confidence': self.confidence}
+            for date, mean, lower, upper in zip(
+                dates, self.predicted_demand.tolist(),
+                self.lower_bound.tolist(), self.upper_bound.tolist()
+            )
+        ]
+
+    def history_records(self, days=API_HISTORY_DAYS):
+        '''Last days of history as JSON-ready dicts with YYYY-MM-DD dates'''
+        if not self.history:
+            return []
+        dates = self.history['date'][-days:]
+        sales = self.history['sales'][-days:]
+        return [
+            {'date': date, 'sales': value}
+            for date, value in zip(np.datetime_as_string(dates, unit='D').tolist(), sales.tolist())
+        ]
+
+    def to_dict(self):
+        '''JSON-ready dict in the shape returned by /forecast/api/generate'''
+        return {
+            'success': True,
+            'item_id': self.item_id,
+            'store_id': self.store_id,
+            'horizon': self.horizon,
+            'model_used': self.model_used,
+            'forecast': self.forecast_records(),
+            'summary': self.summary,
+            'historical_data': self.history_records()
+        }
+
+def forecast_arrays(forecast_data):
+    '''
+    Extract mean/lower/upper arrays from a forecast
+
+    Args:
+        forecast_data: ForecastResult, DataFrame or list of dicts with
+                       predicted_demand and optionally lower_bound and
+                       upper_bound (missing bounds fall back to the mean)
+
+    Returns:
+        (mean, lower, upper) 1-D float arrays
+    '''
+    if isinstance(forecast_data, ForecastResult):
+        return forecast_data.predicted_demand, forecast_data.lower_bound, forecast_data.upper_bound
+
+    if hasattr(forecast_data, 'columns'):
+        mean = forecast_data['predicted_demand'].to_numpy(dtype=float)
+        lower = forecast_data['lower_bound'].to_numpy(dtype=float) if 'lower_bound' in forecast_data.columns else mean
+        upper = forecast_data['upper_bound'].to_numpy(dtype=float) if 'upper_bound' in forecast_data.columns else mean
+        return mean, lower, upper
+
+    mean = np.array([f['predicted_demand'] for f in forecast_data], dtype=float)
+    lower = np.array([f.get('lower_bound', f['predicted_demand']) for f in forecast_data], dtype=float)
+    upper = np.array([f.get('upper_bound', f['predicted_demand']) for f in forecast_data], dtype=float)
+    return mean, lower, upper
@@ -1,5 +1,25 @@
-from .calculations import InventoryCalculations
-from .alerts import AlertGenerator
-from .recommendations import RecommendationEngine
+import importlib
 
-__all__ = ['InventoryCalculations', 'AlertGenerator', 'RecommendationEngine']
\ No newline at end of file
+# NumPy/pandas-backed modules are imported on first use
+_LAZY_EXPORTS = {
+    'InventoryCalculations': '.calculations',
+    'AlertGenerator': '.alerts',
+    'RecommendationEngine': '.recommendations',
+    'InventorySimulator': '.simulation',
+    'DemandStatsLoader': '.demand_stats',
+    'FleetAlertScanner': '.alert_scan',
+    'ReplenishmentPlanner': '.replenishment'
+}
+
+__all__ = [
+    'InventoryCalculations', 'AlertGenerator', 'RecommendationEngine',
+    'InventorySimulator', 'DemandStatsLoader', 'FleetAlertScanner',
+    'ReplenishmentPlanner'
+]
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
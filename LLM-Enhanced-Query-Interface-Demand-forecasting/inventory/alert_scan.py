@@ -0,0 +1,116 @@
+import numpy as np
+from datetime import datetime
+from database.connection import get_db_connection
+from database.inventory_store import InventoryStore
+from .alerts import AlertGenerator
+from .calculations import InventoryCalculations
+from .demand_stats import DemandStatsLoader
+
+class FleetAlertScanner:
+    '''Run the AlertGenerator checks over every item-store series at once'''
+
+    ALERT_COLUMNS = [
+        'rank', 'item_id', 'store_id', 'alert_type', 'urgency', 'severity',
+        'message', 'current_inventory', 'reorder_point', 'days_of_stock',
+        'forecast_mean', 'historical_mean', 'demand_source'
+    ]
+
+    def __init__(self, conn=None, lead_time_days=None, service_level=None,
+                 source='auto', baseline_window_days=28):
+        '''
+        Args:
+            lead_time_days, service_level: Override the stored per-series
+                policies (None = stored policy, else the default policy)
+            source: Demand statistics source, see DemandStatsLoader.load
+        '''
+        self.conn = conn or get_db_connection()
+        self.lead_time_days = lead_time_days
+        self.service_level = service_level
+        self.source = source
+        self.baseline_window_days = baseline_window_days
+
+    def load_series(self, store_id=None):
+        '''Demand statistics joined with the latest snapshot and stored policy'''
+        stats = DemandStatsLoader.load(
+            self.conn, store_id, self.source, self.baseline_window_days
+        )
+        state = InventoryStore(self.conn).get_inventory_state(store_id=store_id)
+
+        series = stats.merge(
+            state.drop(columns=['snapshot_date']),
+            on=['item_id', 'store_id'],
+            how='left'
+        )
+        for col, default in InventoryCalculations.DEFAULT_POLICY.items():
+            series[col] = series[col].astype(float).fillna(default)
+        if self.lead_time_days is not None:
+            series['lead_time_days'] = float(self.lead_time_days)
+        if self.service_level is not None:
+            series['service_level'] = float(self.service_level)
+
+        return series
+
+    def evaluate(self, series):
+        '''
+        Calculate metrics for every series and apply the alert rules
+
+        Returns:
+            DataFrame of alerts (one row per triggered rule), unranked
+        '''
+        metrics = InventoryCalculations.calculate_batch_metrics(
+            series['avg_daily_demand'].to_numpy(dtype=float),
+            series['demand_std'].to_numpy(dtype=float),
+            current_inventory=series['on_hand'].to_numpy(dtype=float),
+            lead_time_days=series['lead_time_days'].to_numpy(dtype=float),
+            service_level=series['service_level'].to_numpy(dtype=float),
+            order_cost=series['order_cost'].to_numpy(dtype=float),
+            holding_cost_per_unit=series['holding_cost_per_unit'].to_numpy(dtype=float)
+        )
+        alerts = AlertGenerator.evaluate_batch(series, metrics)
+        return alerts.rename(columns={'source': 'demand_source'})
+
+    @staticmethod
+    def rank(alerts):
+        '''Order alerts by urgency, then severity, and number them'''
+        # Urgency codes already run from most to least urgent
+        alerts = alerts.assign(_urgency_rank=alerts['urgency'].cat.codes)
+        alerts = alerts.sort_values(
+            ['_urgency_rank', 'severity', 'item_id', 'store_id'],
+            ascending=[True, False, True, True],
+            kind='mergesort'
+        ).reset_index(drop=True)
+        alerts['rank'] = np.arange(1, len(alerts) + 1)
+        return alerts[[c for c in FleetAlertScanner.ALERT_COLUMNS if c in alerts.columns]]
+
+    def scan(self, store_id=None, limit=None, persist=True):
+        '''
+        Scan every series (optionally one store) for inventory alerts
+
+        Args:
+            store_id: Restrict the scan to one store
+            limit: Return only the top N ranked alerts
+            persist: Write the ranked alerts to the inventory_alerts table
+
+        Returns:
+            dict with scan metadata and the ranked alerts DataFrame
+        '''
+        series = self.load_series(store_id)
+        alerts = self.rank(self.evaluate(series))
+
+        # Messages are rendered only for the alerts stored or returned
+        scanned_at = datetime.now().isoformat(timespec='seconds')
+        if persist:
+            alerts = AlertGenerator.with_messages(alerts)
+            InventoryStore(self.conn).save_alerts(store_id or 'ALL', scanned_at, alerts)
+
+        if limit:
+            alerts = alerts.head(limit)
+        if 'message' not in alerts.columns:
+            alerts = AlertGenerator.with_messages(alerts)
+
+        return {
+            'scope': store_id or 'ALL',
+            'scanned_at': scanned_at,
+            'series_scanned': len(series),
+            'alerts': alerts[self.ALERT_COLUMNS]
+        }
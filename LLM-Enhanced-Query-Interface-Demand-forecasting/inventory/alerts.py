@@ -1,6 +1,18 @@
+import numpy as np
+import pandas as pd
+from .records import ALERT_DTYPE, Alert, AlertType, Urgency, alert_message
+
 class AlertGenerator:
     '''Generate inventory alerts'''
     
+    # Thresholds shared with the fleet-wide scanner
+    CRITICAL_STOCK_RATIO = 0.5
+    OVERSTOCK_THRESHOLD_DAYS = 90
+    DEMAND_SURGE_THRESHOLD = 2.0
+    
+    # Urgency levels, most urgent first
+    URGENCY_ORDER = Urgency.names()
+    
     @staticmethod
     def check_stockout_risk(current_inventory, reorder_point):
         '''Check if inventory is below reorder point'''
@@ -8,16 +20,17 @@ class AlertGenerator:
             return None
         
         if current_inventory <= reorder_point:
-            urgency = 'CRITICAL' if current_inventory < reorder_point * 0.5 else 'HIGH'
-            return {
-                'type': 'STOCKOUT_RISK',
-                'urgency': urgency,
-                'message': f'Inventory ({current_inventory:.0f} units) is below reorder point ({reorder_point:.0f} units)'
-            }
+            critical = current_inventory < reorder_point * AlertGenerator.CRITICAL_STOCK_RATIO
+            return Alert(
+                AlertType.STOCKOUT_RISK,
+                Urgency.CRITICAL if critical else Urgency.HIGH,
+                current_inventory, reorder_point,
+                severity=1 - current_inventory / reorder_point if reorder_point > 0 else 1.0
+            )
         return None
     
     @staticmethod
-    def check_overstock(current_inventory, avg_daily_demand, threshold_days=90):
+    def check_overstock(current_inventory, avg_daily_demand, threshold_days=OVERSTOCK_THRESHOLD_DAYS):
         '''Check for overstock situation'''
         if current_inventory is None or avg_daily_demand <= 0:
             return None
@@ -25,51 +38,171 @@ class AlertGenerator:
         days_of_stock = current_inventory / avg_daily_demand
         
         if days_of_stock > threshold_days:
-            return {
-                'type': 'OVERSTOCK',
-                'urgency': 'MEDIUM',
-                'message': f'Excess inventory: {days_of_stock:.0f} days of stock (threshold: {threshold_days} days)'
-            }
+            return Alert(
+                AlertType.OVERSTOCK, Urgency.MEDIUM, days_of_stock, threshold_days,
+                severity=days_of_stock / threshold_days - 1
+            )
         return None
     
     @staticmethod
-    def check_demand_surge(forecast_mean, historical_mean, threshold=2.0):
+    def check_demand_surge(forecast_mean, historical_mean, threshold=DEMAND_SURGE_THRESHOLD):
         '''Check for unusual demand surge'''
         if forecast_mean > historical_mean * threshold:
-            return {
-                'type': 'DEMAND_SURGE',
-                'urgency': 'HIGH',
-                'message': f'Forecasted demand ({forecast_mean:.0f}) is {forecast_mean/historical_mean:.1f}x higher than historical average'
-            }
+            ratio = forecast_mean / historical_mean if historical_mean > 0 else float('inf')
+            return Alert(
+                AlertType.DEMAND_SURGE, Urgency.HIGH, forecast_mean, historical_mean,
+                severity=ratio / threshold - 1
+            )
         return None
     
     @staticmethod
     def generate_all_alerts(inventory_metrics, forecast_summary, current_inventory=None):
-        '''Generate all applicable alerts'''
-        alerts = []
+        '''
+        Generate all applicable alerts
         
-        # Stockout risk
-        if current_inventory:
-            alert = AlertGenerator.check_stockout_risk(
-                current_inventory, inventory_metrics['reorder_point']
-            )
-            if alert:
-                alerts.append(alert)
+        Runs the same rules as evaluate_batch, on one series
         
-        # Overstock
-        if current_inventory:
-            alert = AlertGenerator.check_overstock(
-                current_inventory, inventory_metrics['avg_daily_demand']
-            )
-            if alert:
-                alerts.append(alert)
+        Returns:
+            List of Alert records (stockout, overstock, demand surge order)
+        '''
+        avg_daily_demand = inventory_metrics['avg_daily_demand']
+        # No (or zero) current inventory skips the inventory rules
+        on_hand = float(current_inventory) if current_inventory else np.nan
+        days_of_stock = on_hand / avg_daily_demand if avg_daily_demand > 0 else np.inf
+        
+        records = AlertGenerator.evaluate_arrays(
+            np.array([on_hand]),
+            np.array([inventory_metrics['reorder_point']], dtype=float),
+            np.array([avg_daily_demand], dtype=float),
+            np.array([days_of_stock]),
+            np.array([forecast_summary['forecast_mean']], dtype=float),
+            np.array([forecast_summary['historical_mean']], dtype=float)
+        )
+        return Alert.from_array(records)
+    
+    @staticmethod
+    def evaluate_arrays(current_inventory, reorder_point, avg_daily_demand,
+                        days_of_stock, forecast_mean, historical_mean):
+        '''
+        Alert rules over arrays with one entry per series
+        
+        Args:
+            current_inventory: On-hand units (NaN = unknown, skips the
+                               stockout and overstock rules)
+            reorder_point, avg_daily_demand, days_of_stock: Inventory metrics
+            forecast_mean, historical_mean: Daily demand means
+        
+        Returns:
+            Structured array of ALERT_DTYPE records, stockout alerts first,
+            then overstock, then demand surge; series indexes the inputs
+        '''
+        n = len(current_inventory)
+        has_inventory = ~np.isnan(current_inventory)
         
-        # Demand surge
-        alert = AlertGenerator.check_demand_surge(
-            forecast_summary['forecast_mean'],
-            forecast_summary['historical_mean']
+        stockout = has_inventory & (current_inventory <= reorder_point)
+        critical = current_inventory < reorder_point * AlertGenerator.CRITICAL_STOCK_RATIO
+        overstock = (
+            has_inventory & (avg_daily_demand > 0)
+            & (days_of_stock > AlertGenerator.OVERSTOCK_THRESHOLD_DAYS)
         )
-        if alert:
-            alerts.append(alert)
+        surge = forecast_mean > historical_mean * AlertGenerator.DEMAND_SURGE_THRESHOLD
+        surge_ratio = np.divide(
+            forecast_mean, historical_mean,
+            out=np.full(n, np.inf), where=historical_mean > 0
+        )
+        
+        rules = [
+            (stockout, AlertType.STOCKOUT_RISK,
+             np.where(critical, Urgency.CRITICAL, Urgency.HIGH),
+             current_inventory, reorder_point,
+             1 - np.divide(current_inventory, reorder_point, out=np.zeros(n), where=reorder_point > 0)),
+            (overstock, AlertType.OVERSTOCK, Urgency.MEDIUM,
+             days_of_stock, np.full(n, float(AlertGenerator.OVERSTOCK_THRESHOLD_DAYS)),
+             days_of_stock / AlertGenerator.OVERSTOCK_THRESHOLD_DAYS - 1),
+            (surge, AlertType.DEMAND_SURGE, Urgency.HIGH,
+             forecast_mean, historical_mean,
+             surge_ratio / AlertGenerator.DEMAND_SURGE_THRESHOLD - 1)
+        ]
+        
+        records = np.empty(sum(int(mask.sum()) for mask, *_ in rules), dtype=ALERT_DTYPE)
+        start = 0
+        for mask, alert_type, urgency, value, reference, severity in rules:
+            index = np.flatnonzero(mask)
+            rows = records[start:start + len(index)]
+            rows['series'] = index
+            rows['type'] = alert_type
+            rows['urgency'] = np.broadcast_to(urgency, n)[index]
+            rows['value'] = value[index]
+            rows['reference'] = reference[index]
+            rows['severity'] = severity[index]
+            start += len(index)
+        return records
+    
+    @staticmethod
+    def evaluate_batch(series, metrics):
+        '''
+        Vectorized alert rules over many series at once
+        
+        Args:
+            series: DataFrame with item_id, store_id, on_hand (NaN = unknown),
+                    forecast_mean and historical_mean; any other columns
+                    are carried through to the alert rows
+            metrics: dict of arrays from InventoryCalculations.calculate_batch_metrics
+        
+        Returns:
+            DataFrame with one row per triggered alert (unranked), alert_type
+            and urgency as categoricals and a severity score for ordering
+            alerts within an urgency level; messages are added by
+            with_messages for the rows that are kept
+        '''
+        on_hand = series['on_hand'].to_numpy(dtype=float)
+        forecast_mean = series['forecast_mean'].to_numpy(dtype=float)
+        historical_mean = series['historical_mean'].to_numpy(dtype=float)
+        rop = metrics['reorder_point']
+        days_of_stock = metrics['days_of_stock']
+        
+        records = AlertGenerator.evaluate_arrays(
+            on_hand, rop, metrics['avg_daily_demand'], days_of_stock,
+            forecast_mean, historical_mean
+        )
+        index = records['series']
+        
+        alerts = pd.DataFrame({
+            'item_id': series['item_id'].to_numpy()[index],
+            'store_id': series['store_id'].to_numpy()[index],
+            'current_inventory': on_hand[index],
+            'reorder_point': rop[index],
+            'days_of_stock': days_of_stock[index],
+            'forecast_mean': forecast_mean[index],
+            'historical_mean': historical_mean[index],
+            'alert_type': pd.Categorical.from_codes(records['type'].astype(np.int8), AlertType.names()),
+            'urgency': pd.Categorical.from_codes(records['urgency'].astype(np.int8), Urgency.names()),
+            'severity': records['severity']
+        })
+        for col in series.columns.difference(alerts.columns.union(['on_hand'])):
+            alerts[col] = series[col].to_numpy()[index]
+        
+        return alerts
+    
+    @staticmethod
+    def with_messages(alerts):
+        '''
+        Add the message column to (a slice of) an evaluate_batch DataFrame
         
-        return alerts
\ No newline at end of file
+        Returns:
+            New DataFrame with a message per row
+        '''
+        codes = alerts['alert_type'].cat.codes.to_numpy()
+        threshold = np.full(len(alerts), float(AlertGenerator.OVERSTOCK_THRESHOLD_DAYS))
+        # Figures quoted in the message, by AlertType code
+        value = np.choose(codes, [
+            alerts['current_inventory'].to_numpy(), alerts['days_of_stock'].to_numpy(),
+            alerts['forecast_mean'].to_numpy()
+        ])
+        reference = np.choose(codes, [
+            alerts['reorder_point'].to_numpy(), threshold, alerts['historical_mean'].to_numpy()
+        ])
+        return alerts.assign(message=[
+            alert_message(code, v, r)
+            for code, v, r in zip(codes.tolist(), value.tolist(), reference.tolist())
+        ])
@@ -1,8 +1,28 @@
 import numpy as np
+from forecasting.result import forecast_arrays
+from .records import InventoryMetrics
 
 class InventoryCalculations:
     '''Calculate inventory metrics'''
     
+    # Policy parameters used when a series has no stored policy
+    DEFAULT_POLICY = {
+        'lead_time_days': 7,
+        'service_level': 0.95,
+        'order_cost': 50,
+        'holding_cost_per_unit': 2,
+        'moq': 0,
+        'pack_size': 1,
+        'unit_volume': 0
+    }
+    
+    # Service level -> Z-score
+    Z_SCORES = {
+        0.90: 1.28,
+        0.95: 1.65,
+        0.99: 2.33
+    }
+    
     @staticmethod
     def calculate_reorder_point(avg_daily_demand, lead_time_days, safety_stock):
         '''
@@ -23,13 +43,7 @@ class InventoryCalculations:
         - 95% = Z-score 1.65
         - 99% = Z-score 2.33
         '''
-        z_scores = {
-            0.90: 1.28,
-            0.95: 1.65,
-            0.99: 2.33
-        }
-        
-        z_score = z_scores.get(service_level, 1.65)
+        z_score = InventoryCalculations.Z_SCORES.get(service_level, 1.65)
         safety_stock = z_score * demand_std * np.sqrt(lead_time_days)
         
         return max(0, safety_stock)
@@ -64,7 +78,8 @@ class InventoryCalculations:
         Calculate all inventory metrics at once
         
         Args:
-            forecast_data: List of dicts with forecast predictions
+            forecast_data: ForecastResult, DataFrame or list of dicts with
+                           predicted_demand
             current_inventory: Current inventory level
             lead_time_days: Supplier lead time
             service_level: Desired service level (0.90, 0.95, 0.99)
@@ -72,10 +87,10 @@ class InventoryCalculations:
             holding_cost_per_unit: Annual holding cost per unit
         
         Returns:
-            dict with all metrics
+            InventoryMetrics record
         '''
         # Extract predicted demands
-        demands = [f['predicted_demand'] for f in forecast_data]
+        demands = forecast_arrays(forecast_data)[0]
         
         # Calculate statistics
         avg_daily_demand = np.mean(demands)
@@ -102,14 +117,74 @@ class InventoryCalculations:
                 current_inventory, avg_daily_demand
             )
         
+        return InventoryMetrics(
+            avg_daily_demand=round(float(avg_daily_demand), 2),
+            demand_std=round(float(demand_std), 2),
+            total_forecast=round(float(total_forecast), 2),
+            safety_stock=round(float(safety_stock), 2),
+            reorder_point=round(float(reorder_point), 2),
+            eoq=round(float(eoq), 2),
+            days_of_stock=round(float(days_of_stock), 2) if days_of_stock else None,
+            service_level=service_level,
+            lead_time_days=lead_time_days
+        )
+    
+    @staticmethod
+    def calculate_batch_metrics(avg_daily_demand, demand_std, current_inventory=None,
+                                lead_time_days=7, service_level=0.95,
+                                order_cost=50, holding_cost_per_unit=2):
+        '''
+        Vectorized version of calculate_all_metrics for many series at once
+        
+        Args:
+            avg_daily_demand: Array of average daily demand per series
+            demand_std: Array of daily demand standard deviation per series
+            current_inventory: Optional array of on-hand units (NaN = unknown)
+            lead_time_days, service_level, order_cost, holding_cost_per_unit:
+                Scalars or per-series arrays
+        
+        Returns:
+            dict of NumPy arrays with the same keys as calculate_all_metrics
+        '''
+        avg_daily_demand = np.asarray(avg_daily_demand, dtype=float)
+        demand_std = np.asarray(demand_std, dtype=float)
+        shape = avg_daily_demand.shape
+        
+        lead_time_days = np.broadcast_to(np.asarray(lead_time_days, dtype=float), shape)
+        service_level = np.broadcast_to(np.asarray(service_level, dtype=float), shape)
+        order_cost = np.broadcast_to(np.asarray(order_cost, dtype=float), shape)
+        holding_cost_per_unit = np.broadcast_to(np.asarray(holding_cost_per_unit, dtype=float), shape)
+        
+        z_score = np.full(shape, 1.65)
+        for level, score in InventoryCalculations.Z_SCORES.items():
+            z_score[np.isclose(service_level, level)] = score
+        
+        safety_stock = np.maximum(0, z_score * demand_std * np.sqrt(lead_time_days))
+        reorder_point = np.maximum(0, avg_daily_demand * lead_time_days + safety_stock)
+        
+        annual_demand = avg_daily_demand * 365
+        eoq = np.zeros(shape)
+        has_cost = holding_cost_per_unit > 0
+        eoq[has_cost] = np.sqrt(
+            2 * annual_demand[has_cost] * order_cost[has_cost] / holding_cost_per_unit[has_cost]
+        )
+        
+        days_of_stock = np.full(shape, np.nan)
+        if current_inventory is not None:
+            current_inventory = np.asarray(current_inventory, dtype=float)
+            days_of_stock = np.divide(
+                current_inventory, avg_daily_demand,
+                out=np.full(shape, np.inf), where=avg_daily_demand > 0
+            )
+            days_of_stock[np.isnan(current_inventory)] = np.nan
+        
         return {
-            'avg_daily_demand': round(avg_daily_demand, 2),
-            'demand_std': round(demand_std, 2),
-            'total_forecast': round(total_forecast, 2),
-            'safety_stock': round(safety_stock, 2),
-            'reorder_point': round(reorder_point, 2),
-            'eoq': round(eoq, 2),
-            'days_of_stock': round(days_of_stock, 2) if days_of_stock else None,
+            'avg_daily_demand': avg_daily_demand,
+            'demand_std': demand_std,
+            'safety_stock': safety_stock,
+            'reorder_point': reorder_point,
+            'eoq': np.maximum(0, eoq),
+            'days_of_stock': days_of_stock,
             'service_level': service_level,
             'lead_time_days': lead_time_days
         }
\ No newline at end of file
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from database.connection import get_db_connection
+from database.forecast_store import ForecastStore
+from database.inventory_store import scope_condition
+
+class DemandStatsLoader:
+    '''Per-series demand statistics for fleet-wide inventory jobs'''
+
+    SOURCES = ('auto', 'cache', 'baseline')
+
+    @staticmethod
+    def load_baseline(conn, store_id=None, window_days=28, state_id=None):
+        '''
+        Naive baseline from recent sales history in one set-based query
+
+        The trailing window mean stands in for the forecast; the full
+        history mean is the historical reference used by surge checks.
+        '''
+        query = """
+            WITH cutoff AS (
+                SELECT date(MAX(date), ?) AS start_date FROM sales_long
+            )
+            SELECT item_id, store_id,
+                   AVG(sales) AS historical_mean,
+                   AVG(CASE WHEN date > cutoff.start_date THEN sales END) AS recent_mean,
+                   AVG(CASE WHEN date > cutoff.start_date THEN sales * sales END) AS recent_sq_mean
+            FROM sales_long, cutoff
+            {where}
+            GROUP BY item_id, store_id
+        """
+        condition, scope_params = scope_condition(store_id, state_id)
+        where = f"WHERE {condition}" if condition else ""
+        params = [f'-{int(window_days)} days'] + scope_params
+
+        df = pd.read_sql_query(query.format(where=where), conn, params=params)
+
+        recent_mean = df['recent_mean'].fillna(0).to_numpy(dtype=float)
+        variance = df['recent_sq_mean'].fillna(0).to_numpy(dtype=float) - recent_mean ** 2
+
+        return pd.DataFrame({
+            'item_id': df['item_id'],
+            'store_id': df['store_id'],
+            'avg_daily_demand': recent_mean,
+            'demand_std': np.sqrt(np.maximum(variance, 0)),
+            'forecast_mean': recent_mean,
+            'historical_mean': df['historical_mean'].fillna(0).to_numpy(dtype=float),
+            'source': 'baseline'
+        })
+
+    @staticmethod
+    def load_cached(conn, store_id=None, state_id=None):
+        '''Statistics from forecasts cached by the Forecaster'''
+        df = ForecastStore(conn).load_summaries(store_id, state_id)
+
+        return pd.DataFrame({
+            'item_id': df['item_id'],
+            'store_id': df['store_id'],
+            'avg_daily_demand': df['forecast_mean'].astype(float),
+            'demand_std': df['forecast_std'].astype(float),
+            'forecast_mean': df['forecast_mean'].astype(float),
+            'historical_mean': df['historical_mean'].astype(float),
+            'source': 'cache'
+        })
+
+    @staticmethod
+    def load(conn=None, store_id=None, source='auto', baseline_window_days=28,
+             state_id=None):
+        '''
+        Load demand statistics for every item-store series
+
+        Args:
+            conn: SQLite connection (defaults to the request connection)
+            store_id: Restrict to one store
+            state_id: Restrict to one state (region) when no store is given
+            source: 'cache' (cached forecasts only), 'baseline' (recent
+                    history only) or 'auto' (cache, baseline for the rest)
+            baseline_window_days: Trailing window for the baseline
+
+        Returns:
+            DataFrame with item_id, store_id, avg_daily_demand, demand_std,
+            forecast_mean, historical_mean and source
+        '''
+        if source not in DemandStatsLoader.SOURCES:
+            raise ValueError(f"Unknown source '{source}'. Use one of {DemandStatsLoader.SOURCES}")
+
+        conn = conn or get_db_connection()
+
+        if source == 'cache':
+            return DemandStatsLoader.load_cached(conn, store_id, state_id)
+        if source == 'baseline':
+            return DemandStatsLoader.load_baseline(conn, store_id, baseline_window_days, state_id)
+
+        cached = DemandStatsLoader.load_cached(conn, store_id, state_id)
+        baseline = DemandStatsLoader.load_baseline(conn, store_id, baseline_window_days, state_id)
+
+        combined = pd.concat([cached, baseline], ignore_index=True)
+        return combined.drop_duplicates(subset=['item_id', 'store_id'], keep='first').reset_index(drop=True)
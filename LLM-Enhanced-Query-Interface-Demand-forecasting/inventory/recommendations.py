@@ -1,13 +1,20 @@
+import numpy as np
+import pandas as pd
+from .records import Action, AlertType, Priority, Recommendation
+
 class RecommendationEngine:
     '''Generate actionable recommendations'''
     
+    # Inventory within this multiple of the reorder point is monitored
+    MONITOR_RATIO = 1.2
+    
     @staticmethod
     def generate_recommendations(inventory_metrics, alerts, current_inventory=None):
         '''
         Generate inventory recommendations based on metrics and alerts
         
         Returns:
-            List of recommendation dicts
+            List of Recommendation records
         '''
         recommendations = []
         
@@ -19,50 +26,75 @@ class RecommendationEngine:
         if current_inventory is not None:
             if current_inventory <= rop:
                 order_qty = max(eoq, rop - current_inventory + safety_stock)
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'action': 'PLACE_ORDER',
-                    'message': f'Place order for {order_qty:.0f} units immediately',
-                    'details': f'Current inventory ({current_inventory:.0f}) is at or below reorder point ({rop:.0f})'
-                })
-            elif current_inventory <= rop * 1.2:
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'action': 'MONITOR',
-                    'message': f'Monitor inventory closely - approaching reorder point',
-                    'details': f'Reorder when inventory reaches {rop:.0f} units'
-                })
+                recommendations.append(Recommendation(
+                    Priority.HIGH, Action.PLACE_ORDER, order_quantity=order_qty,
+                    reorder_point=rop, current_inventory=current_inventory
+                ))
+            elif current_inventory <= rop * RecommendationEngine.MONITOR_RATIO:
+                recommendations.append(Recommendation(
+                    Priority.MEDIUM, Action.MONITOR, reorder_point=rop
+                ))
             else:
-                days_of_stock = inventory_metrics.get('days_of_stock')
-                recommendations.append({
-                    'priority': 'LOW',
-                    'action': 'OK',
-                    'message': f'Inventory levels are healthy',
-                    'details': f'Current stock will last approximately {days_of_stock:.0f} days'
-                })
+                recommendations.append(Recommendation(
+                    Priority.LOW, Action.OK,
+                    days_of_stock=inventory_metrics.get('days_of_stock')
+                ))
         else:
-            recommendations.append({
-                'priority': 'INFO',
-                'action': 'SET_REORDER_POINT',
-                'message': f'Set reorder point to {rop:.0f} units',
-                'details': f'Maintain safety stock of {safety_stock:.0f} units'
-            })
+            recommendations.append(Recommendation(
+                Priority.INFO, Action.SET_REORDER_POINT,
+                reorder_point=rop, safety_stock=safety_stock
+            ))
         
         # Add alert-based recommendations
         for alert in alerts:
-            if alert['type'] == 'OVERSTOCK':
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'action': 'REDUCE_STOCK',
-                    'message': 'Consider promotion or discount to clear excess inventory',
-                    'details': alert['message']
-                })
-            elif alert['type'] == 'DEMAND_SURGE':
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'action': 'INCREASE_STOCK',
-                    'message': 'Prepare for demand surge - consider additional safety stock',
-                    'details': alert['message']
-                })
+            if alert.type == AlertType.OVERSTOCK:
+                recommendations.append(Recommendation(Priority.MEDIUM, Action.REDUCE_STOCK, alert=alert))
+            elif alert.type == AlertType.DEMAND_SURGE:
+                recommendations.append(Recommendation(Priority.HIGH, Action.INCREASE_STOCK, alert=alert))
+        
+        return recommendations
+    
+    @staticmethod
+    def generate_batch_recommendations(metrics, current_inventory):
+        '''
+        Vectorized reorder decision for many series at once
+        
+        Applies the same inventory-level rules as generate_recommendations
+        and returns a table instead of Recommendation records.
+        
+        Args:
+            metrics: dict of arrays from InventoryCalculations.calculate_batch_metrics
+            current_inventory: Array of on-hand units (NaN = unknown)
+        
+        Returns:
+            DataFrame with action and priority (categoricals) and
+            order_quantity per series
+        '''
+        on_hand = np.asarray(current_inventory, dtype=float)
+        rop = metrics['reorder_point']
+        safety_stock = metrics['safety_stock']
+        eoq = metrics['eoq']
+        
+        unknown = np.isnan(on_hand)
+        reorder = ~unknown & (on_hand <= rop)
+        monitor = ~unknown & ~reorder & (on_hand <= rop * RecommendationEngine.MONITOR_RATIO)
+        
+        action = np.select(
+            [unknown, reorder, monitor],
+            [Action.SET_REORDER_POINT, Action.PLACE_ORDER, Action.MONITOR],
+            default=Action.OK
+        ).astype(np.int8)
+        priority = np.select(
+            [unknown, reorder, monitor],
+            [Priority.INFO, Priority.HIGH, Priority.MEDIUM],
+            default=Priority.LOW
+        ).astype(np.int8)
+        order_quantity = np.where(
+            reorder, np.maximum(eoq, rop - np.nan_to_num(on_hand) + safety_stock), 0.0
+        )
         
-        return recommendations
\ No newline at end of file
+        return pd.DataFrame({
+            'action': pd.Categorical.from_codes(action, Action.names()),
+            'priority': pd.Categorical.from_codes(priority, Priority.names()),
+            'order_quantity': order_quantity
+        })
\ No newline at end of file
@@ -0,0 +1,217 @@
+from dataclasses import asdict, dataclass
+from enum import IntEnum
+from typing import Optional
+
+class _Code(IntEnum):
+    '''Small-integer code that prints (and formats) as its name'''
+
+    def __str__(self):
+        return self.name
+
+    def __format__(self, spec):
+        return format(self.name, spec)
+
+    @classmethod
+    def names(cls):
+        '''Member names in code order, e.g. for pd.Categorical.from_codes'''
+        return [member.name for member in cls]
+
+class AlertType(_Code):
+    STOCKOUT_RISK = 0
+    OVERSTOCK = 1
+    DEMAND_SURGE = 2
+
+class Urgency(_Code):
+    '''Most urgent first, so codes sort in display order'''
+    CRITICAL = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+
+class Priority(_Code):
+    '''Highest first, so codes sort in display order'''
+    HIGH = 0
+    MEDIUM = 1
+    LOW = 2
+    INFO = 3
+
+class Action(_Code):
+    PLACE_ORDER = 0
+    MONITOR = 1
+    OK = 2
+    SET_REORDER_POINT = 3
+    REDUCE_STOCK = 4
+    INCREASE_STOCK = 5
+
+# Message templates; value and reference are the two figures an alert carries
+ALERT_MESSAGES = {
+    AlertType.STOCKOUT_RISK: 'Inventory ({value:.0f} units) is below reorder point ({reference:.0f} units)',
+    AlertType.OVERSTOCK: 'Excess inventory: {value:.0f} days of stock (threshold: {reference:.0f} days)',
+    AlertType.DEMAND_SURGE: 'Forecasted demand ({value:.0f}) is {ratio:.1f}x higher than historical average'
+}
+# A surge over a zero baseline has no meaningful ratio
+DEMAND_SURGE_NO_HISTORY = 'Forecasted demand ({value:.0f}) with no historical sales'
+
+def alert_message(alert_type, value, reference):
+    '''
+    Render an alert message
+
+    Args:
+        alert_type: AlertType or its code
+        value, reference: current inventory and reorder point (stockout),
+                          days of stock and threshold days (overstock),
+                          forecast and historical mean (demand surge)
+    '''
+    alert_type = AlertType(alert_type)
+    if alert_type is AlertType.DEMAND_SURGE and not reference:
+        return DEMAND_SURGE_NO_HISTORY.format(value=value)
+    ratio = value / reference if reference else 0.0
+    return ALERT_MESSAGES[alert_type].format(value=value, reference=reference, ratio=ratio)
+
+# (message, details) templates per action; None details repeat the alert message
+RECOMMENDATION_TEXT = {
+    Action.PLACE_ORDER: (
+        'Place order for {order_quantity:.0f} units immediately',
+        'Current inventory ({current_inventory:.0f}) is at or below reorder point ({reorder_point:.0f})'
+    ),
+    Action.MONITOR: (
+        'Monitor inventory closely - approaching reorder point',
+        'Reorder when inventory reaches {reorder_point:.0f} units'
+    ),
+    Action.OK: (
+        'Inventory levels are healthy',
+        'Current stock will last approximately {days_of_stock:.0f} days'
+    ),
+    Action.SET_REORDER_POINT: (
+        'Set reorder point to {reorder_point:.0f} units',
+        'Maintain safety stock of {safety_stock:.0f} units'
+    ),
+    Action.REDUCE_STOCK: ('Consider promotion or discount to clear excess inventory', None),
+    Action.INCREASE_STOCK: ('Prepare for demand surge - consider additional safety stock', None)
+}
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    '''
+    One triggered alert rule
+
+    Holds the coded type and urgency and the figures behind the message;
+    the text is rendered by the message property when displayed.
+    '''
+
+    type: AlertType
+    urgency: Urgency
+    value: float
+    reference: float
+    severity: float = 0.0
+
+    @property
+    def message(self):
+        return alert_message(self.type, self.value, self.reference)
+
+    def to_dict(self):
+        '''JSON-ready dict: type, urgency, message and severity'''
+        return {
+            'type': self.type.name,
+            'urgency': self.urgency.name,
+            'message': self.message,
+            'severity': self.severity
+        }
+
+    @classmethod
+    def from_array(cls, records):
+        '''Alerts from a structured array with ALERT_DTYPE fields'''
+        return [
+            cls(AlertType(t), Urgency(u), value, reference, severity)
+            for t, u, value, reference, severity in zip(
+                records['type'].tolist(), records['urgency'].tolist(),
+                records['value'].tolist(), records['reference'].tolist(),
+                records['severity'].tolist()
+            )
+        ]
+
+# Alert records as NumPy rows, for rule evaluation over many series at once;
+# series is the index of the series the alert belongs to
+ALERT_DTYPE = [
+    ('series', 'i8'),
+    ('type', 'u1'),
+    ('urgency', 'u1'),
+    ('value', 'f8'),
+    ('reference', 'f8'),
+    ('severity', 'f8')
+]
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    '''
+    One recommended action; message and details are rendered on access
+    from the figures the action needs
+    '''
+
+    priority: Priority
+    action: Action
+    order_quantity: float = 0.0
+    reorder_point: float = 0.0
+    safety_stock: float = 0.0
+    current_inventory: Optional[float] = None
+    days_of_stock: Optional[float] = None
+    alert: Optional[Alert] = None
+
+    def _render(self, template):
+        return template.format(
+            order_quantity=self.order_quantity,
+            reorder_point=self.reorder_point,
+            safety_stock=self.safety_stock,
+            current_inventory=self.current_inventory,
+            days_of_stock=self.days_of_stock
+        )
+
+    @property
+    def message(self):
+        return self._render(RECOMMENDATION_TEXT[self.action][0])
+
+    @property
+    def details(self):
+        template = RECOMMENDATION_TEXT[self.action][1]
+        if template is None:
+            return self.alert.message if self.alert is not None else ''
+        return self._render(template)
+
+    def to_dict(self):
+        '''JSON-ready dict: priority, action, message and details'''
+        return {
+            'priority': self.priority.name,
+            'action': self.action.name,
+            'message': self.message,
+            'details': self.details
+        }
+
+@dataclass(frozen=True, slots=True)
+class InventoryMetrics:
+    '''
+    Inventory metrics for one series, from InventoryCalculations.calculate_all_metrics
+
+    Readable as a mapping (metrics['eoq'], metrics.get('days_of_stock')) as
+    well as by attribute.
+    '''
+
+    avg_daily_demand: float
+    demand_std: float
+    total_forecast: float
+    safety_stock: float
+    reorder_point: float
+    eoq: float
+    days_of_stock: Optional[float]
+    service_level: float
+    lead_time_days: float
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def to_dict(self):
+        return asdict(self)
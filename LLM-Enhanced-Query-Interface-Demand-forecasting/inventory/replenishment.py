@@ -0,0 +1,224 @@
+import heapq
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from database.connection import get_db_connection
+from database.inventory_store import InventoryStore, scope_condition
+from .calculations import InventoryCalculations
+from .demand_stats import DemandStatsLoader
+from .recommendations import RecommendationEngine
+
+class ReplenishmentPlanner:
+    '''Purchase-order plan for every SKU in a store or region'''
+
+    PLAN_COLUMNS = [
+        'rank', 'item_id', 'store_id', 'status', 'on_hand', 'reorder_point',
+        'days_of_cover', 'recommended_quantity', 'order_quantity',
+        'unit_cost', 'cost_source', 'order_value', 'order_volume', 'demand_source'
+    ]
+
+    def __init__(self, conn=None, source='auto', baseline_window_days=28):
+        self.conn = conn or get_db_connection()
+        self.source = source
+        self.baseline_window_days = baseline_window_days
+
+    def _unit_costs(self, store_id=None, state_id=None):
+        '''Latest sell price per series, the fallback when no unit_cost is stored'''
+        condition, params = scope_condition(store_id, state_id)
+        where = f"WHERE {condition}" if condition else ""
+        # SQLite returns the row holding MAX(wm_yr_wk) for the bare column
+        query = f"""
+            SELECT item_id, store_id, sell_price, MAX(wm_yr_wk) AS wm_yr_wk
+            FROM sell_prices
+            {where}
+            GROUP BY item_id, store_id
+        """
+        try:
+            prices = pd.read_sql_query(query, self.conn, params=params)
+        except Exception:
+            return pd.DataFrame(columns=['item_id', 'store_id', 'sell_price'])
+        return prices[['item_id', 'store_id', 'sell_price']]
+
+    def load_series(self, store_id=None, state_id=None):
+        '''
+        Demand statistics, inventory state and unit costs per series
+
+        unit_cost is the inventory_policies cost where one is set; otherwise
+        the latest retail sell price stands in for it, which overstates the
+        cost, so cost_source records which one was used ('policy',
+        'sell_price', or None when neither is known and the cost is 0).
+        '''
+        stats = DemandStatsLoader.load(
+            self.conn, store_id, self.source, self.baseline_window_days, state_id
+        )
+        state = InventoryStore(self.conn).get_inventory_state(
+            store_id=store_id, state_id=state_id
+        )
+        series = stats.merge(
+            state.drop(columns=['snapshot_date']), on=['item_id', 'store_id'], how='left'
+        )
+        series = series.merge(
+            self._unit_costs(store_id, state_id), on=['item_id', 'store_id'], how='left'
+        )
+
+        for col, default in InventoryCalculations.DEFAULT_POLICY.items():
+            series[col] = series[col].astype(float).fillna(default)
+        policy_cost = series['unit_cost'].astype(float)
+        sell_price = series['sell_price'].astype(float)
+        series['cost_source'] = np.where(
+            policy_cost.notna(), 'policy', np.where(sell_price.notna(), 'sell_price', None)
+        )
+        series['unit_cost'] = policy_cost.fillna(sell_price).fillna(0)
+        return series.drop(columns=['sell_price'])
+
+    @staticmethod
+    def round_quantities(quantity, moq, pack_size):
+        '''Raise to the minimum order quantity, then round up to whole packs'''
+        quantity = np.asarray(quantity, dtype=float)
+        pack_size = np.where(np.asarray(pack_size, dtype=float) > 0, pack_size, 1)
+        ordered = quantity > 0
+        quantity = np.where(ordered, np.maximum(quantity, moq), 0)
+        return np.ceil(quantity / pack_size - 1e-9) * pack_size
+
+    @staticmethod
+    def allocate(order_quantity, unit_cost, unit_volume, urgency, moq, pack_size,
+                 budget=None, capacity=None):
+        '''
+        Greedy allocation of orders under budget and capacity limits
+
+        Orders are popped from a min-heap keyed on urgency (days of cover);
+        an order that no longer fits is cut to the largest whole number of
+        packs that fits and still meets the MOQ, otherwise deferred.
+
+        Returns:
+            (final quantities, status array)
+        '''
+        n = len(order_quantity)
+        final = np.zeros(n)
+        status = np.where(order_quantity > 0, 'PLANNED', 'NO_ORDER').astype(object)
+
+        if budget is None and capacity is None:
+            final[:] = order_quantity
+            return final, status
+
+        remaining_budget = np.inf if budget is None else float(budget)
+        remaining_capacity = np.inf if capacity is None else float(capacity)
+
+        heap = [(urgency[i], i) for i in np.flatnonzero(order_quantity > 0)]
+        heapq.heapify(heap)
+
+        while heap:
+            _, i = heapq.heappop(heap)
+            qty = order_quantity[i]
+
+            # Largest quantity the remaining budget and capacity allow
+            limit = qty
+            if unit_cost[i] > 0:
+                limit = min(limit, remaining_budget / unit_cost[i])
+            if unit_volume[i] > 0:
+                limit = min(limit, remaining_capacity / unit_volume[i])
+
+            if limit < qty:
+                pack = pack_size[i] if pack_size[i] > 0 else 1
+                qty = np.floor(limit / pack + 1e-9) * pack
+                if qty <= 0 or qty < moq[i]:
+                    status[i] = 'DEFERRED'
+                    continue
+                status[i] = 'PARTIAL'
+
+            final[i] = qty
+            remaining_budget -= qty * unit_cost[i]
+            remaining_capacity -= qty * unit_volume[i]
+
+        return final, status
+
+    def plan(self, store_id=None, state_id=None, budget=None, capacity=None,
+             include_all=False, persist=True):
+        '''
+        Build the purchase-order plan
+
+        Args:
+            store_id: Plan one store
+            state_id: Plan every store in a state (region)
+            budget: Optional spend limit (sum of quantity x unit_cost)
+            capacity: Optional volume limit (sum of quantity x unit_volume)
+            include_all: Keep series that need no order in the table
+            persist: Write the plan to the replenishment_plans table
+
+        Returns:
+            dict with plan totals and the plan DataFrame
+        '''
+        series = self.load_series(store_id, state_id)
+        on_hand = series['on_hand'].to_numpy(dtype=float)
+
+        metrics = InventoryCalculations.calculate_batch_metrics(
+            series['avg_daily_demand'].to_numpy(dtype=float),
+            series['demand_std'].to_numpy(dtype=float),
+            current_inventory=on_hand,
+            lead_time_days=series['lead_time_days'].to_numpy(dtype=float),
+            service_level=series['service_level'].to_numpy(dtype=float),
+            order_cost=series['order_cost'].to_numpy(dtype=float),
+            holding_cost_per_unit=series['holding_cost_per_unit'].to_numpy(dtype=float)
+        )
+        decisions = RecommendationEngine.generate_batch_recommendations(metrics, on_hand)
+
+        moq = series['moq'].to_numpy(dtype=float)
+        pack_size = series['pack_size'].to_numpy(dtype=float)
+        unit_cost = series['unit_cost'].to_numpy(dtype=float)
+        unit_volume = series['unit_volume'].to_numpy(dtype=float)
+        recommended = decisions['order_quantity'].to_numpy(dtype=float)
+        rounded = self.round_quantities(recommended, moq, pack_size)
+
+        # Least days of cover first; unknown inventory sorts last
+        days_of_cover = metrics['days_of_stock']
+        urgency = np.nan_to_num(days_of_cover, nan=np.inf)
+
+        order_quantity, status = self.allocate(
+            rounded, unit_cost, unit_volume, urgency, moq, pack_size,
+            budget=budget, capacity=capacity
+        )
+
+        plan = pd.DataFrame({
+            'item_id': series['item_id'].to_numpy(),
+            'store_id': series['store_id'].to_numpy(),
+            'status': status,
+            'on_hand': on_hand,
+            'reorder_point': metrics['reorder_point'],
+            'days_of_cover': days_of_cover,
+            'recommended_quantity': rounded,
+            'order_quantity': order_quantity,
+            'unit_cost': unit_cost,
+            'cost_source': series['cost_source'].to_numpy(),
+            'order_value': order_quantity * unit_cost,
+            'order_volume': order_quantity * unit_volume,
+            'demand_source': series['source'].to_numpy(),
+            '_urgency': urgency
+        })
+        if not include_all:
+            plan = plan[plan['status'] != 'NO_ORDER']
+
+        plan = plan.sort_values(
+            ['_urgency', 'item_id', 'store_id'], kind='mergesort'
+        ).reset_index(drop=True)
+        plan['rank'] = np.arange(1, len(plan) + 1)
+        plan = plan[self.PLAN_COLUMNS]
+
+        scope = store_id or state_id or 'ALL'
+        created_at = datetime.now().isoformat(timespec='seconds')
+        if persist:
+            InventoryStore(self.conn).save_plan(scope, created_at, plan)
+
+        status_counts = plan['status'].value_counts()
+        return {
+            'scope': scope,
+            'created_at': created_at,
+            'series_planned': len(series),
+            'orders': int((plan['order_quantity'] > 0).sum()),
+            'total_units': float(plan['order_quantity'].sum()),
+            'total_value': float(plan['order_value'].sum()),
+            'total_volume': float(plan['order_volume'].sum()),
+            # Orders valued at retail price because no unit_cost is stored
+            'sell_price_costs': int(((plan['cost_source'] == 'sell_price') & (plan['order_quantity'] > 0)).sum()),
+            'status_counts': {k: int(v) for k, v in status_counts.items()},
+            'plan': plan
+        }
@@ -0,0 +1,220 @@
+from statistics import NormalDist
+import numpy as np
+from config import Config
+from forecasting.result import forecast_arrays
+
+class InventorySimulator:
+    '''Monte Carlo simulation of inventory policies over forecast intervals'''
+
+    POLICIES = ('sQ', 'RS')
+
+    def __init__(self, n_paths=None, seed=None, batch_size=256):
+        '''
+        Args:
+            n_paths: Number of demand paths sampled per SKU
+            seed: Seed for the random generator (fixed for reproducible runs)
+            batch_size: Number of SKUs simulated together per NumPy batch
+        '''
+        self.n_paths = n_paths or Config.SIMULATION_PATHS
+        self.seed = Config.SIMULATION_SEED if seed is None else seed
+        self.batch_size = batch_size
+
+    # ForecastResult, DataFrame or records -> (mean, lower, upper) arrays
+    forecast_arrays = staticmethod(forecast_arrays)
+
+    @classmethod
+    def interval_sigma(cls, mean, lower, upper, confidence=0.95):
+        '''
+        Recover the per-day demand standard deviation from forecast intervals
+
+        Uses the wider half-width, since Prophet bounds are clipped at zero
+        and the lower half-width understates spread for slow movers.
+
+        Args:
+            confidence: Two-sided coverage of the interval, e.g. 0.8 for
+                        Prophet's default interval_width
+        '''
+        if not 0 < confidence < 1:
+            raise ValueError(f'Interval coverage must be between 0 and 1, got {confidence}')
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half_width = np.maximum(upper - mean, mean - lower)
+        return np.maximum(half_width, 0) / z
+
+    def simulate(self, mean, lower, upper, initial_inventory, policy='sQ',
+                 reorder_point=None, order_quantity=None,
+                 review_period=7, order_up_to=None,
+                 lead_time_days=7, confidence=0.95):
+        '''
+        Replay an inventory policy over sampled demand paths
+
+        Args:
+            mean, lower, upper: Arrays of shape (n_skus, horizon) or (horizon,)
+            initial_inventory: On-hand units at the start, per SKU
+            policy: 'sQ' (order Q when position <= s) or
+                    'RS' (every R days, order up to S)
+            reorder_point: s for the (s, Q) policy, per SKU
+            order_quantity: Q for the (s, Q) policy, per SKU
+            review_period: R in days for the (R, S) policy
+            order_up_to: S for the (R, S) policy, per SKU
+            lead_time_days: Supplier lead time in days, scalar or per SKU
+            confidence: Coverage of the forecast intervals
+
+        Returns:
+            dict of per-SKU arrays: stockout_probability, fill_rate,
+            avg_on_hand, expected_lost_sales, avg_orders
+        '''
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Use one of {self.POLICIES}")
+
+        mean = np.atleast_2d(np.asarray(mean, dtype=float))
+        lower = np.atleast_2d(np.asarray(lower, dtype=float))
+        upper = np.atleast_2d(np.asarray(upper, dtype=float))
+        n_skus, horizon = mean.shape
+        sigma = self.interval_sigma(mean, lower, upper, confidence)
+
+        def per_sku(values, name):
+            if values is None:
+                raise ValueError(f"{name} is required for policy '{policy}'")
+            return np.broadcast_to(np.asarray(values, dtype=float), (n_skus,))
+
+        initial = per_sku(initial_inventory, 'initial_inventory')
+        lead_time = np.maximum(per_sku(lead_time_days, 'lead_time_days').astype(int), 1)
+        if policy == 'sQ':
+            s = per_sku(reorder_point, 'reorder_point')
+            q = per_sku(order_quantity, 'order_quantity')
+        else:
+            s = per_sku(order_up_to, 'order_up_to')
+            q = None
+
+        result = {
+            'stockout_probability': np.empty(n_skus),
+            'fill_rate': np.empty(n_skus),
+            'avg_on_hand': np.empty(n_skus),
+            'expected_lost_sales': np.empty(n_skus),
+            'avg_orders': np.empty(n_skus)
+        }
+
+        rng = np.random.default_rng(self.seed)
+        for start in range(0, n_skus, self.batch_size):
+            batch = slice(start, min(start + self.batch_size, n_skus))
+            batch_result = self._simulate_batch(
+                rng, mean[batch], sigma[batch], initial[batch], lead_time[batch],
+                policy, s[batch], None if q is None else q[batch], review_period
+            )
+            for key, values in batch_result.items():
+                result[key][batch] = values
+
+        return result
+
+    def _simulate_batch(self, rng, mean, sigma, initial, lead_time,
+                        policy, level, quantity, review_period):
+        '''Simulate one batch of SKUs; arrays are shaped (skus, paths)'''
+        n_skus, horizon = mean.shape
+        shape = (n_skus, self.n_paths)
+        dtype = np.float32
+
+        # Outstanding orders live in a ring buffer indexed by arrival day
+        ring_size = int(lead_time.max()) + 1
+        pipeline = np.zeros((ring_size,) + shape, dtype=dtype)
+        sku_index = np.arange(n_skus)
+
+        on_hand = np.repeat(initial.astype(dtype)[:, None], self.n_paths, axis=1)
+        on_order = np.zeros(shape, dtype=dtype)
+        level = level.astype(dtype)[:, None]
+        if quantity is not None:
+            quantity = quantity.astype(dtype)[:, None]
+
+        stocked_out = np.zeros(shape, dtype=bool)
+        fulfilled = np.zeros(shape, dtype=dtype)
+        total_demand = np.zeros(shape, dtype=dtype)
+        on_hand_sum = np.zeros(shape, dtype=dtype)
+        orders = np.zeros(shape, dtype=dtype)
+
+        for t in range(horizon):
+            # Receive orders due today
+            slot = t % ring_size
+            arrivals = pipeline[slot]
+            on_hand += arrivals
+            on_order -= arrivals
+            pipeline[slot] = 0
+
+            # Serve demand (lost sales, no backorders)
+            demand = rng.standard_normal(shape, dtype=dtype)
+            demand *= sigma[:, t, None].astype(dtype)
+            demand += mean[:, t, None].astype(dtype)
+            np.maximum(demand, 0, out=demand)
+            sold = np.minimum(on_hand, demand)
+            on_hand -= sold
+            stocked_out |= demand > sold
+            fulfilled += sold
+            total_demand += demand
+            on_hand_sum += on_hand
+
+            # Review inventory position and place orders
+            position = on_hand + on_order
+            if policy == 'sQ':
+                order = np.where(position <= level, quantity, 0).astype(dtype)
+            elif t % review_period == 0:
+                order = np.maximum(level - position, 0)
+            else:
+                continue
+
+            arrival_slot = (t + lead_time) % ring_size
+            pipeline[arrival_slot, sku_index] += order
+            on_order += order
+            orders += order > 0
+
+        fill_rate = np.divide(
+            fulfilled, total_demand,
+            out=np.ones(shape, dtype=dtype), where=total_demand > 0
+        )
+
+        return {
+            'stockout_probability': stocked_out.mean(axis=1),
+            'fill_rate': fill_rate.mean(axis=1),
+            'avg_on_hand': on_hand_sum.mean(axis=1) / horizon,
+            'expected_lost_sales': (total_demand - fulfilled).mean(axis=1),
+            'avg_orders': orders.mean(axis=1)
+        }
+
+    def simulate_forecast(self, forecast_data, inventory_metrics,
+                          current_inventory=None, policy='sQ', review_period=7):
+        '''
+        Simulate a single forecast using its calculated inventory metrics
+
+        (s, Q) uses the reorder point and EOQ; (R, S) orders up to
+        reorder point + EOQ. Without a current inventory the simulation
+        starts from the order-up-to level.
+
+        Returns:
+            dict with simulation results for the SKU
+        '''
+        mean, lower, upper = self.forecast_arrays(forecast_data)
+        rop = inventory_metrics['reorder_point']
+        eoq = inventory_metrics['eoq']
+        order_up_to = rop + eoq
+
+        if current_inventory is None:
+            current_inventory = order_up_to
+
+        result = self.simulate(
+            mean, lower, upper, current_inventory,
+            policy=policy,
+            reorder_point=rop,
+            order_quantity=eoq,
+            review_period=review_period,
+            order_up_to=order_up_to,
+            lead_time_days=inventory_metrics['lead_time_days'],
+            confidence=getattr(forecast_data, 'confidence', 0.95)
+        )
+
+        return {
+            'policy': policy,
+            'n_paths': self.n_paths,
+            'seed': self.seed,
+            'stockout_probability': round(float(result['stockout_probability'][0]), 4),
+            'fill_rate': round(float(result['fill_rate'][0]), 4),
+            'avg_on_hand': round(float(result['avg_on_hand'][0]), 2),
+            'expected_lost_sales': round(float(result['expected_lost_sales'][0]), 2),
+            'avg_orders': round(float(result['avg_orders'][0]), 2)
+        }
@@ -1,13 +1,53 @@
-from .gemini_client import GeminiClient
+from .backends import LLMBackend, GeminiBackend, LocalBackend, create_backend
+from .gemini_client import GeminiClient, get_gemini_client
+from .scheduler import LLMScheduler, TokenBucket, get_llm_scheduler
+from .errors import (
+    LLMError,
+    LLMTimeoutError,
+    LLMRateLimitError,
+    LLMUnavailableError,
+    LLMDeadlineExceeded,
+    LLMCircuitOpenError,
+    LLMQueueTimeout
+)
+from .resilience import CircuitBreaker, request_deadline
+from .few_shot import FewShotIndex, ExampleLibrary, example_library
+from .sql_templates import match_sql_template, format_template_answer
+from .result_summary import summarize_results
 from .prompt_builder import (
     build_sql_prompt, 
+    build_sql_repair_prompt,
     build_explanation_prompt,
     build_natural_language_answer_prompt
 )
 
 __all__ = [
+    'LLMBackend',
+    'GeminiBackend',
+    'LocalBackend',
+    'create_backend',
     'GeminiClient', 
+    'get_gemini_client',
+    'LLMScheduler',
+    'TokenBucket',
+    'get_llm_scheduler',
+    'LLMError',
+    'LLMTimeoutError',
+    'LLMRateLimitError',
+    'LLMUnavailableError',
+    'LLMDeadlineExceeded',
+    'LLMCircuitOpenError',
+    'LLMQueueTimeout',
+    'CircuitBreaker',
+    'request_deadline',
+    'FewShotIndex',
+    'ExampleLibrary',
+    'example_library',
+    'match_sql_template',
+    'format_template_answer',
+    'summarize_results',
     'build_sql_prompt', 
+    'build_sql_repair_prompt',
     'build_explanation_prompt',
     'build_natural_language_answer_prompt'
 ]
\ No newline at end of file
@@ -0,0 +1,214 @@
+import json
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from config import Config
+from utils.metrics import metrics
+
+class LLMBackend(ABC):
+    '''A text-in, text-out model behind GeminiClient'''
+
+    name = 'base'
+
+    @abstractmethod
+    def generate(self, prompt, timeout=None):
+        '''
+        Return the completion text for prompt; raise on failure
+
+        timeout (seconds) bounds the request; past it the backend raises
+        TimeoutError (or its SDK's deadline error)
+        '''
+        pass
+
+    def generate_stream(self, prompt, timeout=None):
+        '''
+        Yield the completion in chunks as the model produces them
+
+        Backends without a streaming API yield the whole completion once.
+        '''
+        yield self.generate(prompt, timeout)
+
+class GeminiBackend(LLMBackend):
+    '''Google Gemini through the google.generativeai SDK'''
+
+    name = 'gemini'
+
+    def __init__(self, model_name=None, api_key=None):
+        # Imported here: the SDK takes ~1s to import
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or Config.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(model_name or Config.GEMINI_MODEL)
+
+    @staticmethod
+    def _request_options(timeout):
+        return {'timeout': timeout} if timeout else None
+
+    def generate(self, prompt, timeout=None):
+        response = self.model.generate_content(prompt, request_options=self._request_options(timeout))
+        self._record_usage(response)
+        return response.text
+
+    def generate_stream(self, prompt, timeout=None):
+        response = self.model.generate_content(prompt, stream=True,
+                                               request_options=self._request_options(timeout))
+        for chunk in response:
+            text = getattr(chunk, 'text', '')
+            if text:
+                yield text
+        # Usage metadata is complete once the stream has been consumed
+        self._record_usage(response)
+
+    @staticmethod
+    def _record_usage(response):
+        '''Add the token counts Gemini reports to llm_tokens_total'''
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        for kind, field in (('prompt', 'prompt_token_count'),
+                            ('completion', 'candidates_token_count')):
+            count = getattr(usage, field, None)
+            if count:
+                metrics.inc('llm_tokens_total', count, kind=kind)
+
+class LocalBackend(LLMBackend):
+    '''
+    Deterministic offline stand-in for load tests and benchmarks
+
+    Prompts are classified by the marker text the prompt builders use and
+    answered from canned responses; SQL is chosen by matching the user's
+    question against SQL_RULES. Latency (log-normal around latency_ms) and
+    failures (failure_rate, raised as connection errors) are injected from
+    a seeded RNG so runs repeat; calls slower than their timeout time out.
+    '''
+
+    name = 'local'
+
+    DEFAULT_SQL = (
+        "SELECT item_id, store_id, SUM(sales) AS total_sales FROM sales_long "
+        "GROUP BY item_id, store_id ORDER BY total_sales DESC LIMIT 10"
+    )
+
+    # (pattern on the question, SQL), first match wins
+    SQL_RULES = [
+        (r'\bstores?\b.*\b(total|sales)\b|\bsales\b.*\bby store\b',
+         "SELECT store_id, SUM(sales) AS total_sales FROM sales_long "
+         "GROUP BY store_id ORDER BY total_sales DESC LIMIT 10"),
+        (r'\b(categor(y|ies)|cat_id)\b',
+         "SELECT cat_id, SUM(sales) AS total_sales FROM sales_long "
+         "GROUP BY cat_id ORDER BY total_sales DESC LIMIT 10"),
+        (r'\b(daily|per day|trend)\b',
+         "SELECT date, SUM(sales) AS total_sales FROM sales_long "
+         "GROUP BY date ORDER BY date DESC LIMIT 28"),
+        (r'\bprices?\b',
+         "SELECT item_id, store_id, AVG(sell_price) AS avg_price FROM sell_prices "
+         "GROUP BY item_id, store_id ORDER BY avg_price DESC LIMIT 10"),
+        (r'\bhow many items\b|\bcount\b',
+         "SELECT COUNT(DISTINCT item_id) AS item_count FROM sales_long LIMIT 1"),
+    ]
+
+    # (marker in the prompt, canned response)
+    RESPONSES = [
+        ('Explain this SQL query', 'This query aggregates sales from the M5 database.'),
+        ('Natural Language Answer:', 'Here is a summary of the results from the query.'),
+        ('inventory management assistant',
+         'Demand is stable over the forecast horizon. Review the reorder point '
+         'and the recommendations above before placing the next order.'),
+    ]
+
+    def __init__(self, latency_ms=None, latency_sigma=None, failure_rate=None, seed=None):
+        self.latency_ms = Config.LLM_LOCAL_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_sigma = Config.LLM_LOCAL_LATENCY_SIGMA if latency_sigma is None else latency_sigma
+        self.failure_rate = Config.LLM_LOCAL_FAILURE_RATE if failure_rate is None else failure_rate
+        self._rng = random.Random(Config.LLM_LOCAL_SEED if seed is None else seed)
+        self._rng_lock = threading.Lock()
+        self._sql_rules = [(re.compile(p, re.IGNORECASE), sql) for p, sql in self.SQL_RULES]
+
+    @staticmethod
+    def _question(prompt):
+        '''The user's question from an SQL prompt, without the schema text'''
+        match = re.search(r'Natural Language Query:\s*(.*)', prompt)
+        return match.group(1) if match else ''
+
+    def respond(self, prompt):
+        '''Canned response for prompt, without latency or failures'''
+        if 'SQL query generator' in prompt:
+            question = self._question(prompt)
+            sql = next((sql for pattern, sql in self._sql_rules if pattern.search(question)),
+                       self.DEFAULT_SQL)
+            if 'Generate the JSON object' in prompt:
+                return json.dumps({'sql': sql, 'explanation': self.RESPONSES[0][1]})
+            return sql
+        for marker, response in self.RESPONSES:
+            if marker in prompt:
+                return response
+        return 'OK'
+
+    def _sample(self):
+        '''(delay in seconds, whether to fail) for one call'''
+        with self._rng_lock:
+            delay = self._rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+            fail = self._rng.random() < self.failure_rate
+        return delay, fail
+
+    @staticmethod
+    def _record_usage(prompt, text):
+        # Rough 4-characters-per-token estimate keeps the token metrics populated
+        metrics.inc('llm_tokens_total', len(prompt) // 4, kind='prompt')
+        metrics.inc('llm_tokens_total', len(text) // 4, kind='completion')
+
+    def generate(self, prompt, timeout=None):
+        delay, fail = self._sample()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'local LLM backend did not answer within {timeout:.2f}s')
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError('injected failure from local LLM backend')
+
+        text = self.respond(prompt)
+        self._record_usage(prompt, text)
+        return text
+
+    def generate_stream(self, prompt, timeout=None):
+        '''
+        Canned response word by word: a third of the injected latency
+        before the first chunk, the rest spread over the remaining ones
+        '''
+        delay, fail = self._sample()
+        if timeout is not None and delay / 3 > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'local LLM backend did not start within {timeout:.2f}s')
+        if delay > 0:
+            time.sleep(delay / 3)
+        if fail:
+            raise ConnectionError('injected failure from local LLM backend')
+
+        text = self.respond(prompt)
+        chunks = re.findall(r'\S+\s*', text) or [text]
+        for i, chunk in enumerate(chunks):
+            if i and delay > 0:
+                time.sleep(delay * 2 / 3 / (len(chunks) - 1))
+            yield chunk
+        self._record_usage(prompt, text)
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'local': LocalBackend,
+}
+
+def create_backend(name=None, **kwargs):
+    '''
+    Instantiate an LLM backend by name
+
+    Args:
+        name: 'gemini' or 'local', defaults to Config.LLM_BACKEND
+        **kwargs: Passed to the backend constructor
+    '''
+    name = (name or Config.LLM_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Use one of {list(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,85 @@
+class LLMError(Exception):
+    '''
+    Base class for LLM call failures
+
+    Attributes:
+        retriable: Another attempt may succeed (timeouts, quota, outages)
+        status: Label for llm_requests_total
+        http_status: Status the API answers with when the question fails on it
+    '''
+
+    retriable = False
+    status = 'error'
+    http_status = 502
+
+    def __init__(self, message, backend=None):
+        self.backend = backend
+        prefix = f"LLM API error ({backend}): " if backend else ""
+        super().__init__(f"{prefix}{message}")
+
+class LLMTimeoutError(LLMError):
+    '''One attempt ran past its per-call timeout'''
+    retriable = True
+    status = 'timeout'
+    http_status = 504
+
+class LLMRateLimitError(LLMError):
+    '''The provider rejected the call for quota or rate reasons'''
+    retriable = True
+    status = 'rate_limited'
+    http_status = 503
+
+class LLMUnavailableError(LLMError):
+    '''Connection failures and provider-side errors (5xx)'''
+    retriable = True
+    status = 'unavailable'
+    http_status = 503
+
+class LLMDeadlineExceeded(LLMError):
+    '''The request's overall LLM time budget is spent'''
+    status = 'deadline_exceeded'
+    http_status = 504
+
+class LLMCircuitOpenError(LLMError):
+    '''Calls are short-circuited after repeated provider failures'''
+    status = 'circuit_open'
+    http_status = 503
+
+class LLMQueueTimeout(LLMError):
+    '''An LLM call waited longer than LLM_QUEUE_TIMEOUT_SECONDS for quota or a slot'''
+    status = 'throttled'
+    http_status = 503
+
+# Exception class names (google.api_core, requests, grpc, builtins) by the
+# error they stand for; matched by name so the SDKs need not be imported
+_ERRORS_BY_NAME = {
+    'DeadlineExceeded': LLMTimeoutError,
+    'GatewayTimeout': LLMTimeoutError,
+    'Timeout': LLMTimeoutError,
+    'TimeoutError': LLMTimeoutError,
+    'ReadTimeout': LLMTimeoutError,
+    'ResourceExhausted': LLMRateLimitError,
+    'TooManyRequests': LLMRateLimitError,
+    'ServiceUnavailable': LLMUnavailableError,
+    'InternalServerError': LLMUnavailableError,
+    'BadGateway': LLMUnavailableError,
+    'ServerError': LLMUnavailableError,
+    'ConnectionError': LLMUnavailableError,
+    'ConnectionResetError': LLMUnavailableError,
+    'RetryError': LLMUnavailableError,
+}
+
+def classify_error(error, backend=None):
+    '''
+    Wrap an exception raised by a backend in the matching LLMError
+
+    LLMErrors are returned unchanged; unknown exceptions become a plain,
+    non-retriable LLMError.
+    '''
+    if isinstance(error, LLMError):
+        return error
+    for cls in type(error).__mro__:
+        error_class = _ERRORS_BY_NAME.get(cls.__name__)
+        if error_class is not None:
+            return error_class(str(error) or cls.__name__, backend)
+    return LLMError(str(error) or type(error).__name__, backend)
@@ -0,0 +1,202 @@
+import math
+import threading
+from collections import Counter
+from config import Config
+from database.connection import get_db_connection
+from database.example_store import ExampleStore, normalize_question
+from database.schema_index import tokenize
+from utils.log import get_logger
+from utils.metrics import metrics
+
+log = get_logger(__name__)
+
+# Hand-checked examples so retrieval has something to offer before any capture
+SEED_EXAMPLES = [
+    ("What are the top 10 selling items overall?",
+     "SELECT item_id, SUM(sales) AS total_sales FROM sales_long "
+     "GROUP BY item_id ORDER BY total_sales DESC LIMIT 10"),
+    ("Show total sales by store",
+     "SELECT store_id, SUM(sales) AS total_sales FROM sales_long "
+     "GROUP BY store_id ORDER BY total_sales DESC LIMIT 100"),
+    ("What were the total daily sales in CA_1 over the last 28 days?",
+     "SELECT date, SUM(sales) AS total_sales FROM sales_long WHERE store_id = 'CA_1' "
+     "AND date > (SELECT date(MAX(date), '-28 days') FROM sales_long) "
+     "GROUP BY date ORDER BY date LIMIT 28"),
+    ("Which category sells the most in each state?",
+     "SELECT state_id, cat_id, SUM(sales) AS total_sales FROM sales_long "
+     "GROUP BY state_id, cat_id ORDER BY state_id, total_sales DESC LIMIT 100"),
+    ("What is the average sell price of FOODS_3_090 by store?",
+     "SELECT store_id, AVG(sell_price) AS avg_price FROM sell_prices "
+     "WHERE item_id = 'FOODS_3_090' GROUP BY store_id LIMIT 100"),
+    ("How do sales on event days compare to normal days?",
+     "SELECT CASE WHEN c.event_name_1 IS NULL THEN 'no event' ELSE 'event' END AS day_type, "
+     "AVG(s.sales) AS avg_sales FROM sales_long s JOIN calendar c ON s.date = c.date "
+     "GROUP BY day_type LIMIT 10"),
+]
+
+def _terms(question):
+    '''Unigram and bigram terms of a question'''
+    tokens = tokenize(question)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+class FewShotIndex:
+    '''
+    In-memory TF-IDF index over example questions
+
+    Vectors are L2-normalised and kept in an inverted index, so a search
+    only touches examples sharing a term with the query. An added example
+    is indexed with the IDF of that moment; all weights are recomputed once
+    the collection has changed by REBUILD_RATIO since the last full pass.
+    With max_examples set, the least recently added example is evicted.
+    '''
+
+    REBUILD_RATIO = 0.25
+    REBUILD_MIN_CHANGES = 16
+
+    def __init__(self, max_examples=None):
+        self.max_examples = max_examples
+        self.examples = {}        # id -> (question, sql), least recently added first
+        self.keys = {}            # normalized question -> id
+        self.term_counts = {}     # id -> Counter
+        self.document_frequency = Counter()
+        self._postings = {}       # term -> {id: weight}
+        self._next_id = 0
+        self._built_size = 0      # collection size at the last full pass
+        self._changes = 0         # adds and evictions since then
+
+    def add(self, question, sql):
+        key = normalize_question(question)
+        doc_id = self.keys.get(key)
+        if doc_id is not None:
+            # Same question again: new SQL, and it counts as recent
+            del self.examples[doc_id]
+            self.examples[doc_id] = (question, sql)
+            return
+
+        doc_id = self._next_id
+        self._next_id += 1
+        self.keys[key] = doc_id
+        self.examples[doc_id] = (question, sql)
+        counts = Counter(_terms(question))
+        self.term_counts[doc_id] = counts
+        self.document_frequency.update(counts.keys())
+        self._changes += 1
+        if self.max_examples and len(self.examples) > self.max_examples:
+            self._evict(next(iter(self.examples)))
+
+        if self._changes > max(self.REBUILD_MIN_CHANGES, self.REBUILD_RATIO * self._built_size):
+            self._rebuild()
+        else:
+            self._index(doc_id)
+
+    def _evict(self, doc_id):
+        question, _ = self.examples.pop(doc_id)
+        del self.keys[normalize_question(question)]
+        for term in self.term_counts.pop(doc_id):
+            self.document_frequency[term] -= 1
+            if not self.document_frequency[term]:
+                del self.document_frequency[term]
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._changes += 1
+
+    def __len__(self):
+        return len(self.examples)
+
+    def _idf(self, term):
+        return math.log((1 + len(self.examples)) / (1 + self.document_frequency.get(term, 0))) + 1
+
+    def _vector(self, counts):
+        vector = {t: (1 + math.log(c)) * self._idf(t) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {t: w / norm for t, w in vector.items()}
+
+    def _index(self, doc_id):
+        for term, weight in self._vector(self.term_counts[doc_id]).items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+
+    def _rebuild(self):
+        self._postings = {}
+        for doc_id in self.term_counts:
+            self._index(doc_id)
+        self._built_size = len(self.examples)
+        self._changes = 0
+
+    def search(self, question, k=3, min_score=0.0):
+        '''
+        Most similar examples to question
+
+        Returns:
+            list of (score, question, sql), best first
+        '''
+        if not self.examples:
+            return []
+
+        scores = {}
+        for term, weight in self._vector(Counter(_terms(question))).items():
+            for doc_id, doc_weight in self._postings.get(term, {}).items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * doc_weight
+
+        best = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [(score, *self.examples[doc_id]) for doc_id, score in best if score >= min_score]
+
+class ExampleLibrary:
+    '''Example store plus its search index, loaded once per process'''
+
+    def __init__(self):
+        self.index = None
+        self.database_path = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self.index is not None and self.database_path == Config.DATABASE_PATH:
+            return
+        with self._lock:
+            if self.index is not None and self.database_path == Config.DATABASE_PATH:
+                return
+            store = ExampleStore(get_db_connection())
+            if store.count() == 0:
+                for question, sql in SEED_EXAMPLES:
+                    store.save_example(question, sql, source='seed')
+            index = FewShotIndex(max_examples=Config.FEW_SHOT_MAX_EXAMPLES)
+            # Least used first, so captures evict those before the most used
+            for question, sql in reversed(store.load_examples(Config.FEW_SHOT_MAX_EXAMPLES)):
+                index.add(question, sql)
+            self.index = index
+            self.database_path = Config.DATABASE_PATH
+
+    def search(self, question, k=None, min_score=None):
+        '''Top-k (question, sql) examples for the prompt'''
+        k = Config.FEW_SHOT_K if k is None else k
+        if k <= 0:
+            return []
+        min_score = Config.FEW_SHOT_MIN_SIMILARITY if min_score is None else min_score
+        self._ensure_loaded()
+        with self._lock:
+            matches = self.index.search(question, k, min_score)
+        metrics.inc('few_shot_examples_total', len(matches), event='retrieved')
+        return [(q, sql) for _, q, sql in matches]
+
+    def capture(self, question, sql, row_count):
+        '''Remember a question whose SQL validated, executed and returned rows'''
+        if not Config.FEW_SHOT_CAPTURE or not row_count:
+            return
+        try:
+            self._ensure_loaded()
+            ExampleStore(get_db_connection()).save_example(question, sql, row_count=row_count)
+            with self._lock:
+                self.index.add(question, sql)
+            metrics.inc('few_shot_examples_total', event='captured')
+        except Exception as e:
+            # A read-only database must not fail the query that produced the example
+            log.warning('example_capture_failed', error=str(e))
+
+    def reset(self):
+        with self._lock:
+            self.index = None
+
+# Shared by the query pipeline
+example_library = ExampleLibrary()
@@ -1,35 +1,286 @@
-import google.generativeai as genai
+import json
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from config import Config
+from utils.log import get_logger
+from utils.metrics import metrics
+from .backends import create_backend
+from .errors import LLMCircuitOpenError, LLMDeadlineExceeded, LLMError, LLMTimeoutError, classify_error
+from .resilience import CircuitBreaker, LatencyTracker, backoff_delay, remaining_time
+from .scheduler import get_llm_scheduler
+
+log = get_logger(__name__)
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+# Hedged attempts run on their own threads so the first answer can be taken
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+def get_gemini_client():
+    '''
+    Shared GeminiClient, created on first use
+    Keeps the LLM SDK out of app start-up and reuses one client per process
+    '''
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = GeminiClient()
+    return _shared_client
+
+_JSON_STRING_FIELD = r'"{}"\s*:\s*"((?:[^"\\]|\\.)*)"'
+
+def _clean_sql(text):
+    '''Strip markdown fences and semicolons from generated SQL'''
+    sql = text.replace('```sql', '').replace('```', '').strip()
+    return sql.replace(';', '').strip()
+
+def parse_sql_and_explanation(text):
+    '''
+    Parse a combined SQL + explanation reply
+
+    Accepts the JSON object asked for, also inside code fences or
+    surrounded by prose, with raw newlines in its strings, or broken JSON
+    whose "sql" and "explanation" fields can still be picked out. A reply
+    that is bare SQL gives the SQL without an explanation.
+
+    Returns:
+        (sql, explanation); sql is None when nothing usable was found and
+        explanation None when only the SQL was
+    '''
+    body = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+    start, end = body.find('{'), body.rfind('}')
+    data = None
+    if start != -1 and end > start:
+        try:
+            data = json.loads(body[start:end + 1], strict=False)
+        except ValueError:
+            pass
+    if not isinstance(data, dict):
+        data = {}
+        for field in ('sql', 'explanation'):
+            match = re.search(_JSON_STRING_FIELD.format(field), body, re.DOTALL)
+            if match:
+                try:
+                    data[field] = json.loads(f'"{match.group(1)}"', strict=False)
+                except ValueError:
+                    data[field] = match.group(1)
+    if isinstance(data.get('sql'), str) and data['sql'].strip():
+        explanation = data.get('explanation')
+        explanation = ' '.join(explanation.split()) if isinstance(explanation, str) else ''
+        return _clean_sql(data['sql']), explanation or None
+    
+    sql = _clean_sql(text)
+    if re.match(r'(?is)(select|with)\b', sql):
+        return sql, None
+    return None, None
+
+def _get_hedge_pool():
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=2 * Config.LLM_MAX_CONCURRENCY,
+                                                 thread_name_prefix='llm-hedge')
+    return _hedge_pool
 
 class GeminiClient:
-    def __init__(self):
-        '''Initialize Gemini client with API key'''
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+    def __init__(self, backend=None, scheduler=None, breaker=None):
+        '''
+        Initialize the client
+        Args:
+            backend: LLMBackend instance or name ('gemini', 'local');
+                     defaults to Config.LLM_BACKEND
+            scheduler: LLMScheduler applying rate limits, concurrency and
+                       coalescing; defaults to the process-wide one
+            breaker: CircuitBreaker for the backend; a new one by default
+        '''
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend)
+        self.backend = backend
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.breaker = breaker or CircuitBreaker(self.backend.name)
+        self.latency = LatencyTracker()
     
     def generate_content(self, prompt):
         '''
-        Generate content using Gemini
+        Generate content using the configured backend
+        
+        Each attempt gets LLM_CALL_TIMEOUT_SECONDS, cut to what is left of
+        the request budget (see request_deadline). Timeouts, quota and
+        provider errors are retried up to LLM_RETRY_ATTEMPTS times with
+        jittered exponential backoff, within the budget. With
+        LLM_HEDGE_ENABLED, an attempt still running after the recent p95
+        latency gets a duplicate request and the first answer wins.
         Args:
-            prompt (str): The prompt to send to Gemini
+            prompt (str): The prompt to send to the model
         Returns:
             str: Generated response
+        Raises:
+            LLMError: subclass naming the failure (timeout, rate limit,
+                      circuit open, deadline exceeded, ...)
         '''
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            text = self.scheduler.coalesce(prompt, lambda: self._generate_with_retries(prompt)).strip()
+        except LLMError as e:
+            metrics.inc('llm_requests_total', backend=self.backend.name, status=e.status)
+            raise
+        
+        metrics.inc('llm_requests_total', backend=self.backend.name, status='ok')
+        return text
+    
+    def _attempt_timeout(self):
+        '''Timeout for the next attempt: the per-call limit within the request budget'''
+        timeout = Config.LLM_CALL_TIMEOUT_SECONDS or None
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise LLMDeadlineExceeded('request time budget spent', self.backend.name)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+    
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            raise LLMCircuitOpenError(
+                f"circuit open after repeated failures, retry in {self.breaker.retry_after():.0f}s",
+                self.backend.name
+            )
+    
+    def _generate_with_retries(self, prompt):
+        attempts = max(1, Config.LLM_RETRY_ATTEMPTS)
+        for attempt in range(attempts):
+            self._check_circuit()
+            timeout = self._attempt_timeout()
+            start = time.monotonic()
+            try:
+                text = self._hedged_attempt(prompt, timeout)
+            except Exception as e:
+                error = classify_error(e, self.backend.name)
+                if error.retriable:
+                    self.breaker.record_failure()
+                elif type(error) is LLMError:
+                    # The provider answered (bad request, blocked prompt)
+                    self.breaker.record_success()
+                if not error.retriable or attempt + 1 >= attempts:
+                    raise error from e
+                
+                delay = backoff_delay(attempt)
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    raise error from e
+                metrics.inc('llm_retries_total', backend=self.backend.name, reason=error.status)
+                log.info('llm_retry', backend=self.backend.name, attempt=attempt + 1,
+                         reason=error.status, delay_ms=round(delay * 1000), error=str(e))
+                time.sleep(delay)
+                continue
+            
+            self.breaker.record_success()
+            self.latency.observe(time.monotonic() - start)
+            return text
+    
+    def _attempt(self, prompt, timeout, kind='generate'):
+        return self.scheduler.attempt(prompt, lambda: self.backend.generate(prompt, timeout),
+                                      kind=kind, timeout=timeout)
+    
+    def _hedged_attempt(self, prompt, timeout):
+        '''
+        One attempt, plus a duplicate request if it outlives the hedge delay
+        '''
+        hedge_delay = self.latency.quantile(Config.LLM_HEDGE_QUANTILE) if Config.LLM_HEDGE_ENABLED else None
+        if hedge_delay is None or (timeout is not None and hedge_delay >= timeout):
+            return self._attempt(prompt, timeout)
+        
+        pool = _get_hedge_pool()
+        started = time.monotonic()
+        primary = pool.submit(self._attempt, prompt, timeout)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+        
+        hedge_timeout = None if timeout is None else timeout - (time.monotonic() - started)
+        hedge = pool.submit(self._attempt, prompt, hedge_timeout, 'hedge')
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            left = None if timeout is None else timeout - (time.monotonic() - started)
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                metrics.inc('llm_hedges_total', backend=self.backend.name,
+                            result='won' if future is hedge else 'lost')
+                return text
+        metrics.inc('llm_hedges_total', backend=self.backend.name, result='failed')
+        raise error or LLMTimeoutError(f"no answer within {timeout:.1f}s", self.backend.name)
+    
+    def generate_content_stream(self, prompt):
+        '''
+        Generate content chunk by chunk
+        Falls back to a single non-streaming call (with its retries) when
+        streaming is turned off (LLM_STREAMING) or the stream fails before
+        its first chunk
+        Args:
+            prompt (str): The prompt to send to the model
+        Yields:
+            str: Pieces of the response, in order
+        '''
+        if not Config.LLM_STREAMING:
+            yield self.generate_content(prompt)
+            return
+        
+        started = False
+        try:
+            self._check_circuit()
+            timeout = self._attempt_timeout()
+            stream = self.scheduler.run_stream(
+                prompt, lambda: self.backend.generate_stream(prompt, timeout), timeout=timeout
+            )
+            for chunk in stream:
+                if not started:
+                    # Leading whitespace would otherwise reach the client
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                started = True
+                yield chunk
         except Exception as e:
-            raise Exception(f"Gemini API error: {str(e)}")
+            error = classify_error(e, self.backend.name)
+            if error.retriable:
+                self.breaker.record_failure()
+            if started or not error.retriable:
+                metrics.inc('llm_requests_total', backend=self.backend.name, status=error.status)
+                raise error from e
+            metrics.inc('llm_stream_fallbacks_total', backend=self.backend.name)
+            yield self.generate_content(prompt)
+            return
+        
+        self.breaker.record_success()
+        metrics.inc('llm_requests_total', backend=self.backend.name, status='ok')
     
     def generate_sql(self, prompt):
         '''
         Generate SQL query from prompt
         '''
         response = self.generate_content(prompt)
-        # Clean up response
-        sql = response.replace('```sql', '').replace('```', '').strip()
-        sql = sql.replace(';', '').strip()
-        return sql
+        return _clean_sql(response)
+    
+    def generate_sql_with_explanation(self, prompt):
+        '''
+        Generate SQL and its explanation in one call
+        (prompt from build_sql_prompt(..., with_explanation=True))
+        Returns:
+            (sql, explanation), see parse_sql_and_explanation
+        '''
+        return parse_sql_and_explanation(self.generate_content(prompt))
     
     def generate_explanation(self, prompt):
         '''
@@ -41,4 +292,10 @@ class GeminiClient:
         '''
         Generate natural language answer from query results
         '''
-        return self.generate_content(prompt)
\ No newline at end of file
+        return self.generate_content(prompt)
+    
+    def generate_natural_language_answer_stream(self, prompt):
+        '''
+        Stream the natural language answer, see generate_content_stream
+        '''
+        return self.generate_content_stream(prompt)
\ No newline at end of file
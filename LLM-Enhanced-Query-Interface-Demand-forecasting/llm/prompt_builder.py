@@ -1,10 +1,51 @@
+import re
+from config import Config
 from database.schema import create_schema_context
+from database.schema_index import create_relevant_schema_context
+from database.rollups import ROLLUP_TABLES, describe_rollups
+from .result_summary import summarize_results
 
-def build_sql_prompt(natural_query, schema):
+def build_schema_context(natural_query, schema, pinned_tables=None):
+    '''
+    Build the schema section of the SQL prompts
+    Only the tables relevant to the question are described unless
+    SCHEMA_CONTEXT_MODE is 'full'; rollup tables, when built, get a short
+    note of their own
+    '''
+    if Config.SCHEMA_CONTEXT_MODE == 'full':
+        schema_context = create_schema_context(schema)
+    else:
+        excluded = [t.strip() for t in Config.SCHEMA_EXCLUDED_TABLES.split(',') if t.strip()]
+        schema_context = create_relevant_schema_context(
+            natural_query, schema, pinned_tables, excluded + list(ROLLUP_TABLES)
+        )
+    
+    rollups = describe_rollups(schema)
+    if rollups:
+        schema_context += f"\n\n{rollups}"
+    
+    return schema_context
+
+# Output rule for prompts answered with the SQL and its explanation together
+JSON_OUTPUT_RULE = ('Return ONLY a JSON object {"sql": "<the SQL query>", "explanation": '
+                    '"<one concise sentence explaining the query>"} without markdown or code blocks')
+
+def build_sql_prompt(natural_query, schema, examples=None, with_explanation=False):
     '''
     Build prompt for SQL generation
+    examples are (question, sql) pairs of similar, previously verified queries
+    with_explanation asks for a JSON object holding the SQL and a one-sentence
+    explanation, so a single call replaces the SQL and explanation prompts
     '''
-    schema_context = create_schema_context(schema)
+    schema_context = build_schema_context(natural_query, schema)
+    examples_context = format_examples_for_prompt(examples)
+    
+    if with_explanation:
+        output_rule = f"6.{JSON_OUTPUT_RULE}"
+        instruction = "Generate the JSON object:"
+    else:
+        output_rule = "6.Return ONLY the SQL query without any explanation, markdown, or code blocks"
+        instruction = "Generate the SQL query:"
     
     prompt = f"""You are an expert SQL query generator for an M5 forecasting inventory database.
 
@@ -16,16 +57,72 @@ Important Rules:
 3.Use the sales_long table for sales data instead of wide-format columns
 4.Each row in sales_long represents daily sales with columns (item_id, store_id, date, sales)
 5.Use the most recent date column for current sales analysis
-6.Return ONLY the SQL query without any explanation, markdown, or code blocks
+{output_rule}
 7.Do not include semicolons at the end
 8.Use proper SQL syntax for SQLite
+{examples_context}
+Natural Language Query: {natural_query}
+
+{instruction}"""
+    
+    return prompt
+
+def build_sql_repair_prompt(natural_query, sql, error, schema, with_explanation=False):
+    '''
+    Build prompt to fix SQL that failed validation or execution
+    The schema slice always describes the tables the failed SQL referenced,
+    since that is where a bad column or join usually comes from
+    with_explanation asks for the corrected SQL and its explanation as JSON,
+    as in build_sql_prompt
+    '''
+    referenced = re.findall(r'\b(?:from|join)\s+["`]?(\w+)', sql, re.IGNORECASE)
+    pinned = [t.strip() for t in Config.SCHEMA_PINNED_TABLES.split(',') if t.strip()]
+    pinned += [t for t in referenced if t in schema and t not in pinned]
+    schema_context = build_schema_context(natural_query, schema, pinned)
+    
+    if with_explanation:
+        output_rule = f"4.{JSON_OUTPUT_RULE}"
+        instruction = "Generate the JSON object with the corrected SQL:"
+    else:
+        output_rule = "4.Return ONLY the corrected SQL query without any explanation, markdown, or code blocks"
+        instruction = "Generate the corrected SQL query:"
+    
+    prompt = f"""You are an expert SQL query generator for an M5 forecasting inventory database.
+A previous SQL query for this question failed. Fix it.
+
+{schema_context}
+
+Failed SQL: {sql}
+
+Error: {error}
+
+Important Rules:
+1.Use only the tables and columns listed above
+2.ALWAYS include a LIMIT clause (max 1000 rows)
+3.Only generate SELECT queries (no INSERT, UPDATE, DELETE, DROP, etc.)
+{output_rule}
+5.Do not include semicolons at the end
+6.Use proper SQL syntax for SQLite
 
 Natural Language Query: {natural_query}
 
-Generate the SQL query:"""
+{instruction}"""
     
     return prompt
 
+def format_examples_for_prompt(examples):
+    '''
+    Format few-shot examples as a prompt section (empty when there are none)
+    '''
+    if not examples:
+        return ""
+    
+    formatted = "\nExamples of verified questions and their SQL:\n"
+    for question, sql in examples:
+        formatted += f"\nQuestion: {question}\nSQL: {sql}\n"
+    
+    return formatted
+
 def build_explanation_prompt(sql):
     '''
     Build prompt for SQL explanation
@@ -41,7 +138,7 @@ def build_natural_language_answer_prompt(natural_query, sql, results):
     '''
     Build prompt to convert query results into natural language answer
     '''
-    # Format results for the prompt (limit to avoid token overflow)
+    # Format results for the prompt (bounded by ANSWER_RESULTS_TOKEN_BUDGET)
     results_summary = format_results_for_prompt(results)
     
     prompt = f"""You are a helpful data analyst assistant. Convert the SQL query results into a clear, natural language answer.
@@ -67,34 +164,7 @@ Natural Language Answer:"""
 
 def format_results_for_prompt(results):
     '''
-    Format query results into a readable string for the LLM prompt
+    Format query results into a compact string for the LLM prompt
+    (the full table when small, column statistics and leading rows otherwise)
     '''
-    if not results['success']:
-        return "No results available"
-    
-    data = results['data']
-    columns = results['columns']
-    row_count = results['row_count']
-    
-    if row_count == 0:
-        return "No data found"
-    
-    # Limit rows to avoid token overflow
-    max_rows = min(50, row_count)
-    
-    formatted = f"Total Rows: {row_count}\nColumns: {', '.join(columns)}\n\n"
-    formatted += "Sample Data:\n"
-    
-    for i, row in enumerate(data[:max_rows]):
-        formatted += f"Row {i+1}: "
-        row_parts = []
-        for col in columns:
-            value = row.get(col, 'NULL')
-            row_parts.append(f"{col}={value}")
-        formatted += ", ".join(row_parts)
-        formatted += "\n"
-    
-    if row_count > max_rows:
-        formatted += f"\n... and {row_count - max_rows} more rows\n"
-    
-    return formatted
\ No newline at end of file
+    return summarize_results(results)
\ No newline at end of file
@@ -0,0 +1,145 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+from utils.metrics import metrics
+
+_deadline = contextvars.ContextVar('llm_deadline', default=None)
+
+@contextmanager
+def request_deadline(seconds=None):
+    '''
+    Share one time budget between every LLM call made inside the block
+
+    Each call's timeout is cut to what is left of the budget, and retries
+    stop once it is spent. Nested blocks keep the tighter deadline.
+
+    Args:
+        seconds: Budget, Config.LLM_REQUEST_BUDGET_SECONDS by default; 0 for none
+    '''
+    seconds = Config.LLM_REQUEST_BUDGET_SECONDS if seconds is None else seconds
+    current = _deadline.get()
+    deadline = time.monotonic() + seconds if seconds else None
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time():
+    '''Seconds left of the current request budget, or None outside request_deadline'''
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def backoff_delay(retry, base=None, cap=None):
+    '''
+    Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**retry)]
+
+    Args:
+        retry: 0 for the first retry
+    '''
+    base = Config.LLM_RETRY_BASE_DELAY if base is None else base
+    cap = Config.LLM_RETRY_MAX_DELAY if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** retry))
+
+class LatencyTracker:
+    '''Recent successful call latencies, for picking the hedge delay'''
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q):
+        '''Latency at quantile q, or None until min_samples calls were seen'''
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class CircuitBreaker:
+    '''
+    Stops calling a failing backend for a while
+
+    closed: calls go through; failure_threshold consecutive failures open
+    the circuit. open: calls are rejected until reset_timeout has passed,
+    then the circuit is half-open and lets one trial call through (another
+    one every reset_timeout while the trial is outstanding). A success
+    closes it again, a failure reopens it.
+
+    The state is exported as the llm_circuit_state gauge (0 closed,
+    1 half-open, 2 open) and transitions are counted.
+    '''
+
+    CLOSED = 'closed'
+    HALF_OPEN = 'half_open'
+    OPEN = 'open'
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.LLM_CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = Config.LLM_CIRCUIT_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_at = None
+        self._lock = threading.Lock()
+        metrics.set('llm_circuit_state', 0, backend=name)
+
+    def _transition(self, state):
+        '''Lock held'''
+        if state != self.state:
+            self.state = state
+            metrics.set('llm_circuit_state', self.STATE_VALUES[state], backend=self.name)
+            metrics.inc('llm_circuit_transitions_total', backend=self.name, state=state)
+
+    def allow(self):
+        '''True if a call may be made now'''
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+                self._trial_at = None
+            if self.state == self.HALF_OPEN:
+                if self._trial_at is not None and now - self._trial_at < self.reset_timeout:
+                    return False
+                self._trial_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_at = None
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+                self._transition(self.OPEN)
+
+    def retry_after(self):
+        '''Seconds until an open circuit lets a trial call through'''
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def snapshot(self):
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
@@ -0,0 +1,163 @@
+from config import Config
+from utils.metrics import metrics
+from utils.tokens import estimate_tokens
+
+# Long text values are cut to this many characters in the prompt
+MAX_VALUE_CHARS = 40
+
+def _format_value(value):
+    '''Compact prompt form of a single value'''
+    if value is None:
+        return 'NULL'
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return f"{int(value):,}"
+        return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.4g}"
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"{value:,}"
+    text = str(value).replace('\n', ' ').replace('|', '/')
+    if len(text) > MAX_VALUE_CHARS:
+        text = text[:MAX_VALUE_CHARS - 1] + '…'
+    return text
+
+def summarize_column(name, values, top_k=None):
+    '''
+    One-line statistics for a result column
+
+    Numeric columns get min/max/mean/sum, text columns their distinct count,
+    range and most common values. Computed with numpy over the whole column.
+
+    Args:
+        name: Column name
+        values: Column values (None for NULL)
+        top_k: Most common values listed for text columns
+
+    Returns:
+        str like "- total_sales (number): min 0, max 1,204, mean 57.31, sum 28,655"
+    '''
+    # Imported here: numpy is only needed once a result is too large to list
+    import numpy as np
+
+    top_k = Config.ANSWER_RESULTS_TOP_VALUES if top_k is None else top_k
+
+    # Numeric columns convert to one float array (None -> NaN) and are
+    # summarised without touching values one by one
+    try:
+        numbers = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        numbers = None
+    if numbers is not None:
+        missing = np.isnan(numbers)
+        nulls = int(missing.sum())
+        null_note = f", {nulls:,} NULL" if nulls else ""
+        if nulls == len(numbers):
+            return f"- {name}: all NULL"
+        # Digit-only text such as '0042' converts too; SQLite columns hold
+        # one type in practice, so the first value decides
+        if not isinstance(values[int(np.argmin(missing))], str):
+            stats = [
+                f"min {_format_value(float(np.nanmin(numbers)))}",
+                f"max {_format_value(float(np.nanmax(numbers)))}",
+                f"mean {_format_value(float(np.nanmean(numbers)))}",
+                f"sum {_format_value(float(np.nansum(numbers)))}",
+            ]
+            return f"- {name} (number): {', '.join(stats)}{null_note}"
+
+    column = np.array(values, dtype=object)
+    present = column[np.not_equal(column, None)]
+    nulls = len(column) - len(present)
+    null_note = f", {nulls:,} NULL" if nulls else ""
+
+    if not len(present):
+        return f"- {name}: all NULL"
+
+    distinct, counts = np.unique(present.astype(str), return_counts=True)
+    if len(distinct) == 1:
+        return f"- {name} (text): always {_format_value(distinct[0])}{null_note}"
+
+    parts = [f"{len(distinct):,} distinct",
+             f"range {_format_value(distinct[0])} to {_format_value(distinct[-1])}"]
+    if counts.min() == counts.max():
+        parts[0] += " (all unique)" if counts[0] == 1 else f", {counts[0]:,} rows each"
+    elif top_k:
+        # Stable sort keeps ties in value order
+        order = np.argsort(-counts, kind='stable')[:top_k]
+        top = ', '.join(f"{_format_value(distinct[i])} ({counts[i]:,})" for i in order)
+        parts.append(f"most common {top}")
+    return f"- {name} (text): {'; '.join(parts)}{null_note}"
+
+def _row_line(row, columns):
+    return ' | '.join(_format_value(row.get(col)) for col in columns)
+
+def summarize_results(results, token_budget=None):
+    '''
+    Compact representation of query results for the answer prompt
+
+    Results that fit the budget are listed in full as a table. Larger ones
+    are described by per-column statistics over every row, followed by as
+    many leading rows as the remaining budget allows, so the prompt stays
+    roughly the same size however many rows the query returned.
+
+    Args:
+        results: execute_query result
+        token_budget: Approximate token limit, Config.ANSWER_RESULTS_TOKEN_BUDGET by default
+
+    Returns:
+        Formatted results section
+    '''
+    if not results['success']:
+        return "No results available"
+
+    data = results['data']
+    columns = results['columns']
+    row_count = results['row_count']
+
+    if row_count == 0:
+        return "No data found"
+
+    token_budget = token_budget or Config.ANSWER_RESULTS_TOKEN_BUDGET
+    header = f"Total Rows: {row_count}\nColumns: {', '.join(columns)}\n"
+    table_header = ' | '.join(columns)
+    remaining = token_budget - estimate_tokens(header) - estimate_tokens(table_header) - 1
+
+    # Small results: the whole table
+    lines = []
+    for row in data:
+        line = _row_line(row, columns)
+        remaining -= estimate_tokens(line) + 1
+        if remaining < 0:
+            break
+        lines.append(line)
+    else:
+        summary = f"{header}\n{table_header}\n" + '\n'.join(lines)
+        metrics.observe('answer_results_tokens', estimate_tokens(summary), mode='table')
+        return summary
+
+    # Too large: statistics first, then the leading rows
+    sections = [header, "Column Summary (all rows):"]
+    remaining = token_budget - estimate_tokens(header) - 6
+    for i, col in enumerate(columns):
+        line = summarize_column(col, [row.get(col) for row in data])
+        cost = estimate_tokens(line) + 1
+        if cost > remaining:
+            sections.append(f"... and {len(columns) - i} more columns")
+            remaining = 0
+            break
+        sections.append(line)
+        remaining -= cost
+
+    remaining -= estimate_tokens(table_header) + 10
+    rows = []
+    for row in data:
+        line = _row_line(row, columns)
+        remaining -= estimate_tokens(line) + 1
+        if remaining < 0:
+            break
+        rows.append(line)
+    if rows:
+        sections.append(f"\nFirst {len(rows)} of {row_count} rows:\n{table_header}")
+        sections.extend(rows)
+
+    summary = '\n'.join(sections)
+    metrics.observe('answer_results_tokens', estimate_tokens(summary), mode='summary')
+    return summary
@@ -0,0 +1,249 @@
+import threading
+import time
+from config import Config
+from utils.metrics import metrics
+from utils.tokens import estimate_tokens
+from .errors import LLMDeadlineExceeded, LLMQueueTimeout
+from .resilience import remaining_time
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+# Buckets hold this many seconds' worth of quota, so short bursts go out
+# immediately while the per-minute rate still holds
+BURST_SECONDS = 10
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket refilled continuously at rate per second
+
+    take() reserves capacity up front and lets the level go negative, so
+    callers are served in arrival order and each one sleeps only for its
+    own share of the deficit.
+    '''
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, amount, timeout=None):
+        '''
+        Reserve amount (capped at the capacity) and wait until it is covered
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            LLMQueueTimeout: The wait would exceed timeout; nothing is reserved
+        '''
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, (amount - self._level) / self.rate)
+            if timeout is not None and wait > timeout:
+                raise LLMQueueTimeout(f"rate limit wait of {wait:.1f}s exceeds {timeout:.1f}s")
+            self._level -= amount
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def adjust(self, amount):
+        '''Charge (positive) or refund (negative) amount once the real cost is known'''
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - amount)
+
+class _Call:
+    '''One in-flight prompt shared by every caller asking for it'''
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class LLMScheduler:
+    '''
+    Client-side admission control for LLM calls
+
+    Every call made through the shared GeminiClient passes here:
+    - identical prompts already in flight are not sent again; later callers
+      wait for the first one and share its result (single-flight)
+    - requests and tokens per minute are held under the provider quota with
+      two token buckets; a call reserves its prompt tokens plus
+      LLM_COMPLETION_TOKEN_ESTIMATE, corrected once the answer is known
+    - at most max_concurrency calls run at once; the rest queue
+
+    Time spent waiting is recorded in llm_queue_seconds.
+    '''
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None,
+                 max_concurrency=None, queue_timeout=None):
+        '''
+        Args (defaults from Config; a rate of 0 disables that limit):
+            requests_per_minute: LLM_REQUESTS_PER_MINUTE
+            tokens_per_minute: LLM_TOKENS_PER_MINUTE
+            max_concurrency: LLM_MAX_CONCURRENCY
+            queue_timeout: LLM_QUEUE_TIMEOUT_SECONDS, the longest a call may wait
+        '''
+        rpm = Config.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tpm = Config.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.queue_timeout = Config.LLM_QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+
+        self.request_bucket = TokenBucket(rpm / 60, max(1.0, rpm / 60 * BURST_SECONDS)) if rpm > 0 else None
+        self.token_bucket = TokenBucket(tpm / 60, tpm / 60 * BURST_SECONDS) if tpm > 0 else None
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _admit(self, prompt, kind, timeout=None):
+        '''Wait for rate limit quota and a concurrency slot, at most timeout seconds'''
+        start = time.monotonic()
+        if self.queue_timeout and (timeout is None or self.queue_timeout < timeout):
+            timeout = self.queue_timeout
+        deadline = start + timeout if timeout is not None else None
+
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        reserved = estimate_tokens(prompt) + Config.LLM_COMPLETION_TOKEN_ESTIMATE
+        # Quota taken so far, given back if a later step times out
+        taken = []
+        try:
+            if self.request_bucket is not None:
+                self.request_bucket.take(1, remaining())
+                taken.append((self.request_bucket, 1))
+            if self.token_bucket is not None:
+                self.token_bucket.take(reserved, remaining())
+                taken.append((self.token_bucket, min(reserved, self.token_bucket.capacity)))
+            if not self._slots.acquire(timeout=remaining()):
+                raise LLMQueueTimeout(f"no LLM slot free within {timeout:.1f}s "
+                                      f"({self.max_concurrency} calls running)")
+        except LLMQueueTimeout:
+            for bucket, amount in taken:
+                bucket.adjust(-amount)
+            metrics.inc('llm_queue_timeouts_total', kind=kind)
+            raise
+        finally:
+            metrics.observe('llm_queue_seconds', time.monotonic() - start, kind=kind)
+
+    def _settle(self, text):
+        self._slots.release()
+        if self.token_bucket is not None and text is not None:
+            self.token_bucket.adjust(estimate_tokens(text) - Config.LLM_COMPLETION_TOKEN_ESTIMATE)
+
+    def coalesce(self, prompt, call, kind='generate'):
+        '''
+        Run call() unless the same prompt is already in flight, in which
+        case wait for that call and share its result (or error); the wait
+        ends with LLMDeadlineExceeded when the caller's request_deadline
+        passes first
+
+        Args:
+            prompt: Prompt text, the single-flight key
+            call: Zero-argument function producing the response text
+            kind: Label for the metrics
+        '''
+        with self._lock:
+            shared = self._in_flight.get(prompt)
+            if shared is None:
+                shared = self._in_flight[prompt] = _Call()
+                leader = True
+            else:
+                shared.waiters += 1
+                leader = False
+
+        if not leader:
+            metrics.inc('llm_coalesced_total', kind=kind)
+            # The leader may retry past this caller's own request budget
+            remaining = remaining_time()
+            if not shared.done.wait(None if remaining is None else max(0.0, remaining)):
+                with self._lock:
+                    shared.waiters -= 1
+                raise LLMDeadlineExceeded('request time budget spent waiting for an identical call')
+            if shared.error is not None:
+                raise shared.error
+            return shared.result
+
+        try:
+            shared.result = call()
+        except BaseException as e:
+            shared.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(prompt, None)
+            shared.done.set()
+        return shared.result
+
+    def attempt(self, prompt, call, kind='generate', timeout=None):
+        '''
+        Make one provider request under the rate limits and the pool
+
+        Args:
+            prompt: Prompt text, for the token estimate
+            call: Zero-argument function making the request, returns text
+            kind: Label for the queue metrics
+            timeout: Longest wait for admission (capped by queue_timeout)
+        '''
+        self._admit(prompt, kind, timeout)
+        text = None
+        try:
+            text = call()
+        finally:
+            self._settle(text)
+        return text
+
+    def run(self, prompt, call, kind='generate'):
+        '''
+        coalesce() around a single attempt(): call() for prompt under the
+        limits, sharing identical in-flight calls
+        '''
+        return self.coalesce(prompt, lambda: self.attempt(prompt, call, kind), kind)
+
+    def run_stream(self, prompt, stream, kind='stream', timeout=None):
+        '''
+        Iterate stream() under the limits; the slot is held until it ends
+
+        Streams are not coalesced: each caller consumes its own chunks.
+        '''
+        self._admit(prompt, kind, timeout)
+        chunks = []
+        try:
+            for chunk in stream():
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            self._settle(''.join(chunks))
+
+    def stats(self):
+        '''Current queue state for monitoring'''
+        with self._lock:
+            in_flight = len(self._in_flight)
+            waiters = sum(c.waiters for c in self._in_flight.values())
+        return {
+            'max_concurrency': self.max_concurrency,
+            'in_flight_prompts': in_flight,
+            'coalesced_waiters': waiters,
+        }
+
+def get_llm_scheduler():
+    '''
+    Process-wide LLMScheduler, created on first use so the limits are read
+    from Config at that point; all clients share one quota
+    '''
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = LLMScheduler()
+    return _shared_scheduler
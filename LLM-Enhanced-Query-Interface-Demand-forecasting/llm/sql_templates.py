@@ -0,0 +1,242 @@
+import re
+from config import Config
+
+# Slots are pulled out of the question first (most specific pattern first);
+# the words left over must match an intent grammar exactly.
+SLOT_PATTERNS = [
+    ('item', re.compile(r'\b(?:(?:item|product)\s+)?((?:foods|hobbies|household)_\d+_\d{3})\b',
+                        re.IGNORECASE)),
+    ('dept', re.compile(r'\b(?:(?:department|dept)\s+)?((?:foods|hobbies|household)_\d+)\b'
+                        r'(?:\s+department)?', re.IGNORECASE)),
+    ('store', re.compile(r'\b(?:store\s+)?([a-z]{2}_\d+)\b(?:\s+store)?', re.IGNORECASE)),
+    ('window', re.compile(r'\b(?:last|past|previous)\s+(\d+\s+)?(day|week|month|year)s?\b', re.IGNORECASE)),
+    ('category', re.compile(r'\b(?:category\s+)?(foods?|hobby|hobbies|household)\b'
+                            r'(?:\s+category)?', re.IGNORECASE)),
+    ('state', re.compile(r'\b(?:state\s+)?(ca|tx|wi|california|texas|wisconsin)\b(?:\s+state)?',
+                         re.IGNORECASE)),
+]
+
+STATE_CODES = {'california': 'CA', 'texas': 'TX', 'wisconsin': 'WI'}
+CATEGORY_CODES = {'food': 'FOODS', 'foods': 'FOODS', 'hobby': 'HOBBIES', 'hobbies': 'HOBBIES',
+                  'household': 'HOUSEHOLD'}
+WINDOW_DAYS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+# Slot -> sales_long column it filters on
+FILTER_COLUMNS = {'item': 'item_id', 'dept': 'dept_id', 'store': 'store_id',
+                  'category': 'cat_id', 'state': 'state_id'}
+
+# Words that carry no meaning for the query; anything else left over sends
+# the question to the LLM
+FILLER_WORDS = {
+    'what', 'which', 'who', 'is', 'are', 'was', 'were', 'the', 'a', 'an', 'me', 'show', 'list',
+    'give', 'get', 'find', 'tell', 'please', 'in', 'at', 'for', 'of', 'from', 'during', 'over',
+    'within', 'and', 'all', 'there', 'our', 'overall', 'did', 'do', 'does', 'have', 'has',
+    'been', 'to',
+}
+
+DIMENSIONS = {
+    'item': 'item_id', 'items': 'item_id', 'product': 'item_id', 'products': 'item_id',
+    'store': 'store_id', 'stores': 'store_id',
+    'category': 'cat_id', 'categories': 'cat_id',
+    'department': 'dept_id', 'departments': 'dept_id', 'dept': 'dept_id', 'depts': 'dept_id',
+    'state': 'state_id', 'states': 'state_id',
+}
+# column -> (singular, plural) for explanations and answers
+DIMENSION_LABELS = {'item_id': ('item', 'items'), 'store_id': ('store', 'stores'),
+                    'cat_id': ('category', 'categories'), 'dept_id': ('department', 'departments'),
+                    'state_id': ('state', 'states')}
+_DIM = r'(?P<dim>' + '|'.join(sorted(DIMENSIONS, key=len, reverse=True)) + r')'
+_SALES = r'(?:sales|units(?: sold)?|sold|demand)'
+
+# (intent, grammar over the filler-free skeleton), first match wins
+INTENTS = [
+    ('ranking', re.compile(
+        rf'(?:top|best|most sold|highest selling|best selling|top selling)(?: (?P<n>\d+))?'
+        rf'(?: selling)? {_DIM}(?: by (?:total )?{_SALES})?')),
+    ('ranking', re.compile(rf'{_DIM} (?:sells?|sold|selling) (?:the )?most(?: (?P<n>\d+))?')),
+    ('breakdown', re.compile(rf'(?:total )?{_SALES} (?:by|per|for each|across) {_DIM}')),
+    ('breakdown', re.compile(rf'{_DIM} by (?:total )?{_SALES}')),
+    ('trend', re.compile(rf'daily(?: {_SALES})?(?: trend)?|{_SALES} (?:trend|per day|by day)')),
+    ('count', re.compile(rf'how many (?:distinct |different )?{_DIM}')),
+    ('total', re.compile(rf'total {_SALES}|{_SALES} total|how many {_SALES}(?: sold)?'
+                         rf'|sum (?:of )?{_SALES}')),
+]
+
+DEFAULT_TOP_N = 10
+DEFAULT_TREND_DAYS = 28
+
+def _extract_slots(question):
+    '''
+    Pull item, department, store, time window, category and state out of question
+
+    Returns:
+        (slots dict, skeleton string with the slots removed), or None when a
+        slot appears twice (e.g. two stores) and the template cannot express it
+    '''
+    text = question.strip().rstrip('?.!').strip()
+    slots = {}
+    for name, pattern in SLOT_PATTERNS:
+        matches = list(pattern.finditer(text))
+        if not matches:
+            continue
+        if len(matches) > 1:
+            return None
+        match = matches[0]
+        if name == 'window':
+            count = int(match.group(1)) if match.group(1) else 1
+            slots['window_days'] = count * WINDOW_DAYS[match.group(2).lower()]
+        elif name == 'state':
+            value = match.group(1).lower()
+            slots['state'] = STATE_CODES.get(value, value.upper())
+        elif name == 'category':
+            slots['category'] = CATEGORY_CODES[match.group(1).lower()]
+        else:
+            slots[name] = match.group(1).upper()
+        text = text[:match.start()] + ' ' + text[match.end():]
+
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    skeleton = ' '.join(w for w in words if w not in FILLER_WORDS)
+    return slots, skeleton
+
+def _where_clause(slots):
+    conditions = [f"{column} = '{slots[slot]}'" for slot, column in FILTER_COLUMNS.items()
+                  if slot in slots]
+    if 'window_days' in slots:
+        conditions.append(
+            f"date > (SELECT date(MAX(date), '-{slots['window_days']} days') FROM sales_long)"
+        )
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+def _describe_filters(slots):
+    '''Human-readable scope, e.g. "in store CA_1 over the last 30 days"'''
+    parts = []
+    labels = (('item', 'for item'), ('dept', 'in department'), ('category', 'in category'),
+              ('store', 'in store'), ('state', 'in state'))
+    for slot, label in labels:
+        if slot in slots:
+            parts.append(f"{label} {slots[slot]}")
+    if 'window_days' in slots:
+        parts.append(f"over the last {slots['window_days']} days")
+    return ' '.join(parts)
+
+def match_sql_template(question):
+    '''
+    Answer a common parameterised question with a SQL template, without the LLM
+
+    Recognises rankings ("top 5 items in CA_1"), breakdowns ("sales by
+    category in TX"), daily trends, distinct counts and totals ("total sales
+    of FOODS_3_090 last month"), filtered by item, department, category,
+    store, state and a trailing time window.
+
+    Args:
+        question: The user's natural language question
+
+    Returns:
+        dict with template, sql, explanation and slots, or None when the
+        question does not fit a template and should go to the LLM
+    '''
+    extracted = _extract_slots(question)
+    if extracted is None:
+        return None
+    slots, skeleton = extracted
+
+    for intent, grammar in INTENTS:
+        match = grammar.fullmatch(skeleton)
+        if match:
+            break
+    else:
+        return None
+
+    groups = match.groupdict()
+    where = _where_clause(slots)
+    scope = _describe_filters(slots)
+    scope = f" {scope}" if scope else ""
+
+    if intent in ('ranking', 'breakdown'):
+        column = DIMENSIONS[groups['dim']]
+        # Ranking items within a single item is not a question worth a template
+        if any(FILTER_COLUMNS[slot] == column for slot in FILTER_COLUMNS if slot in slots):
+            return None
+        singular, plural = DIMENSION_LABELS[column]
+        if intent == 'ranking':
+            limit = int(groups.get('n') or DEFAULT_TOP_N)
+            explanation = f"Ranks {plural} by total units sold{scope} and returns the top {limit}."
+        else:
+            limit = Config.DEFAULT_QUERY_LIMIT
+            explanation = f"Totals units sold per {singular}{scope}."
+        if limit > Config.MAX_QUERY_LIMIT:
+            return None
+        sql = (f"SELECT {column}, SUM(sales) AS total_sales FROM sales_long{where} "
+               f"GROUP BY {column} ORDER BY total_sales DESC LIMIT {limit}")
+        slots['dimension'] = column
+
+    elif intent == 'trend':
+        slots.setdefault('window_days', DEFAULT_TREND_DAYS)
+        if slots['window_days'] > Config.MAX_QUERY_LIMIT:
+            return None
+        where = _where_clause(slots)
+        scope = f" {_describe_filters(slots)}"
+        sql = (f"SELECT date, SUM(sales) AS total_sales FROM sales_long{where} "
+               f"GROUP BY date ORDER BY date LIMIT {slots['window_days']}")
+        explanation = f"Totals units sold per day{scope}."
+
+    elif intent == 'count':
+        column = DIMENSIONS[groups['dim']]
+        plural = DIMENSION_LABELS[column][1]
+        sql = f"SELECT COUNT(DISTINCT {column}) AS {plural}_count FROM sales_long{where} LIMIT 1"
+        explanation = f"Counts the distinct {plural} with sales records{scope}."
+        slots['dimension'] = column
+
+    else:
+        sql = f"SELECT SUM(sales) AS total_sales FROM sales_long{where} LIMIT 1"
+        explanation = f"Adds up all units sold{scope}."
+
+    return {'template': intent, 'sql': sql, 'explanation': explanation, 'slots': slots}
+
+def _number(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+def format_template_answer(match, results):
+    '''
+    Natural language answer for a template query, built from the rows directly
+
+    Args:
+        match: dict from match_sql_template
+        results: dict from execute_query
+    '''
+    data = results['data']
+    slots = match['slots']
+    scope = _describe_filters(slots)
+    scope = f" {scope}" if scope else ""
+
+    if not data:
+        return f"No sales records were found{scope}."
+
+    intent = match['template']
+    if intent in ('ranking', 'breakdown'):
+        column = slots['dimension']
+        singular, plural = DIMENSION_LABELS[column]
+        heading = (f"Top {len(data)} {plural} by units sold{scope}:" if intent == 'ranking'
+                   else f"Units sold by {singular}{scope}:")
+        lines = [f"• {row[column]}: {_number(row['total_sales'])}" for row in data[:20]]
+        if len(data) > 20:
+            lines.append(f"… and {len(data) - 20} more")
+        return '\n'.join([heading] + lines)
+
+    if intent == 'trend':
+        values = [row['total_sales'] or 0 for row in data]
+        peak = max(data, key=lambda row: row['total_sales'] or 0)
+        scope = _describe_filters({k: v for k, v in slots.items() if k != 'window_days'})
+        scope = f" {scope}" if scope else ""
+        return (f"Across the last {len(data)} days of data{scope}, {_number(sum(values))} units were sold, "
+                f"an average of {_number(sum(values) / len(values))} per day. "
+                f"The busiest day was {peak['date']} with {_number(peak['total_sales'])} units.")
+
+    if intent == 'count':
+        plural = DIMENSION_LABELS[slots['dimension']][1]
+        value = next(iter(data[0].values()))
+        return f"There are {_number(value)} distinct {plural} with sales records{scope}."
+
+    if data[0]['total_sales'] is None:
+        return f"No sales records were found{scope}."
+    return f"Total units sold{scope}: {_number(data[0]['total_sales'])}."
@@ -0,0 +1,35 @@
+import argparse
+import sqlite3
+import time
+from config import Config
+from database.inventory_store import InventoryStore
+
+def load_inventory():
+    """Bulk load inventory snapshots or policy parameters from CSV/Parquet"""
+
+    parser = argparse.ArgumentParser(description=load_inventory.__doc__)
+    parser.add_argument('kind', choices=['snapshots', 'policies'],
+                        help='snapshots: item_id, store_id, on_hand[, snapshot_date]; '
+                             'policies: item_id, store_id[, lead_time_days, service_level, '
+                             'order_cost, holding_cost_per_unit]')
+    parser.add_argument('path', help='CSV or Parquet file')
+    parser.add_argument('--snapshot-date', help='Date for files without a snapshot_date column')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--database', default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    store = InventoryStore(conn)
+
+    start = time.perf_counter()
+    if args.kind == 'snapshots':
+        rows = store.load_snapshots(args.path, args.snapshot_date, args.batch_size)
+    else:
+        rows = store.load_policies(args.path, args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    conn.close()
+    print(f"✅ Loaded {rows:,} {args.kind} rows into {args.database} in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    load_inventory()
@@ -1,3 +1,4 @@
 from .summarizer import NLGSummarizer
+from .summary_cache import SummaryCache
 
-__all__ = ['NLGSummarizer']
\ No newline at end of file
+__all__ = ['NLGSummarizer', 'SummaryCache']
\ No newline at end of file
@@ -1,16 +1,59 @@
-from llm.gemini_client import GeminiClient
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from llm.gemini_client import get_gemini_client
+from utils.log import get_logger
+from .summary_cache import SummaryCache, summary_cache_key
+
+log = get_logger(__name__)
+
+# Shared across requests: one cache, one background pool
+_summary_cache = SummaryCache(
+    max_entries=Config.NLG_CACHE_SIZE,
+    ttl_seconds=Config.NLG_CACHE_TTL_SECONDS
+)
+_background = ThreadPoolExecutor(
+    max_workers=Config.NLG_BACKGROUND_WORKERS,
+    thread_name_prefix='nlg-summary'
+)
+_in_flight = set()
+_in_flight_lock = threading.Lock()
 
 class NLGSummarizer:
     '''Generate natural language summaries using Gemini'''
     
-    def __init__(self):
-        self.gemini = GeminiClient()
+    MODES = ('llm', 'template_first', 'template')
+    
+    def __init__(self, mode=None, gemini=None, cache=None):
+        '''
+        Args:
+            mode: 'llm' (wait for Gemini on cache miss), 'template_first'
+                  (return the template now, generate with Gemini in the
+                  background for the next view) or 'template' (never call
+                  Gemini). Defaults to Config.NLG_SUMMARY_MODE
+            gemini: Optional client; defaults to the shared client
+            cache: Optional SummaryCache; defaults to the shared cache
+        '''
+        self.mode = mode or Config.NLG_SUMMARY_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown NLG summary mode '{self.mode}'. Use one of {self.MODES}")
+        self._gemini = gemini
+        self.cache = cache or _summary_cache
+    
+    @property
+    def gemini(self):
+        if self._gemini is None:
+            self._gemini = get_gemini_client()
+        return self._gemini
     
     def generate_forecast_summary(self, forecast_result, inventory_metrics, 
                                   alerts, recommendations):
         '''
         Generate comprehensive natural language summary
         
+        Cached Gemini summaries are keyed on rounded metrics plus the
+        alert/recommendation signatures, so repeat views skip the LLM.
+        
         Args:
             forecast_result: Forecast results dict
             inventory_metrics: Inventory calculations dict
@@ -20,12 +63,31 @@ class NLGSummarizer:
         Returns:
             Natural language summary string
         '''
+        if self.mode == 'template':
+            return self._template_summary(
+                forecast_result, inventory_metrics, recommendations
+            )
+        
+        key = summary_cache_key(
+            forecast_result, inventory_metrics, alerts, recommendations
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
         prompt = self._build_summary_prompt(
             forecast_result, inventory_metrics, alerts, recommendations
         )
         
+        if self.mode == 'template_first':
+            self._generate_in_background(key, prompt)
+            return self._template_summary(
+                forecast_result, inventory_metrics, recommendations
+            )
+        
         try:
             summary = self.gemini.generate_content(prompt)
+            self.cache.set(key, summary)
             return summary
         except:
             # Fallback to template-based summary
@@ -33,6 +95,27 @@ class NLGSummarizer:
                 forecast_result, inventory_metrics, recommendations
             )
     
+    def _generate_in_background(self, key, prompt):
+        '''Fill the cache with the Gemini summary without blocking the request'''
+        with _in_flight_lock:
+            if key in _in_flight:
+                return
+            _in_flight.add(key)
+        
+        gemini = self.gemini
+        cache = self.cache
+        
+        def generate():
+            try:
+                cache.set(key, gemini.generate_content(prompt))
+            except Exception as e:
+                log.warning('background_summary_failed', error=str(e))
+            finally:
+                with _in_flight_lock:
+                    _in_flight.discard(key)
+        
+        _background.submit(generate)
+    
     def _build_summary_prompt(self, forecast_result, inventory_metrics, 
                              alerts, recommendations):
         '''Build prompt for Gemini'''
@@ -76,13 +159,13 @@ Summary:"""
         '''Format alerts for prompt'''
         if not alerts:
             return "No alerts"
-        return "\n".join([f"- [{a['urgency']}] {a['message']}" for a in alerts])
+        return "\n".join([f"- [{a.urgency}] {a.message}" for a in alerts])
     
     def _format_recommendations(self, recommendations):
         '''Format recommendations for prompt'''
         if not recommendations:
             return "No specific recommendations"
-        return "\n".join([f"- [{r['priority']}] {r['message']}" for r in recommendations])
+        return "\n".join([f"- [{r.priority}] {r.message}" for r in recommendations])
     
     def _template_summary(self, forecast_result, inventory_metrics, recommendations):
         '''Fallback template-based summary'''
@@ -102,7 +185,7 @@ totaling {total_forecast:.0f} units.
 """
         
         for rec in recommendations[:3]:  # Top 3 recommendations
-            summary += f"\n• {rec['message']}"
+            summary += f"\n• {rec.message}"
         
         summary += f"\n\n📌 Reorder when inventory reaches {rop:.0f} units to maintain optimal stock levels."
         
@@ -0,0 +1,88 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import metrics
+
+def round_significant(value, digits=2):
+    '''Round to significant digits so near-identical metrics share a key'''
+    if value is None:
+        return None
+    value = float(value)
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+
+def summary_cache_key(forecast_result, inventory_metrics, alerts, recommendations,
+                      digits=2):
+    '''
+    Cache key for a forecast summary
+
+    Built from the series identity, the rounded metrics shown in the prompt
+    and the alert/recommendation signatures (type and severity, not text).
+    '''
+    summary = forecast_result.get('summary', {})
+    rounded = tuple(
+        round_significant(inventory_metrics.get(name), digits)
+        for name in ('avg_daily_demand', 'total_forecast', 'reorder_point',
+                     'safety_stock', 'eoq')
+    )
+    return (
+        forecast_result.get('item_id'),
+        forecast_result.get('store_id'),
+        forecast_result.get('horizon'),
+        inventory_metrics.get('service_level'),
+        round_significant(summary.get('historical_mean'), digits),
+        rounded,
+        tuple(sorted((a.type, a.urgency) for a in alerts)),
+        tuple(sorted((r.action, r.priority) for r in recommendations))
+    )
+
+class SummaryCache:
+    '''Thread-safe LRU cache with expiry for generated summaries'''
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, name='nlg_summary'):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        '''Return the cached value or None'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                metrics.inc('cache_requests_total', cache=self.name, result='miss')
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.inc('cache_requests_total', cache=self.name, result='hit')
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        '''Hit/miss counters for monitoring'''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
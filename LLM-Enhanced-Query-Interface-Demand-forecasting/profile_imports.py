@@ -0,0 +1,62 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must only be imported when a request needs them
+HEAVY_MODULES = ('pandas', 'numpy', 'prophet', 'sklearn', 'google.generativeai')
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+print('ELAPSED', time.perf_counter() - start)
+print('LOADED', ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into (cumulative_us, module) pairs"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split(':', 1)[1].split('|')
+        entries.append((int(cumulative_us), module.strip()))
+    return entries
+
+def profile_imports():
+    """Measure app start-up time and check heavy modules are loaded lazily"""
+
+    parser = argparse.ArgumentParser(description=profile_imports.__doc__)
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    args = parser.parse_args()
+
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         STARTUP_SCRIPT.format(heavy=HEAVY_MODULES)],
+        cwd=app_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(result.returncode)
+
+    output = dict(line.split(' ', 1) for line in result.stdout.splitlines()
+                  if line.startswith(('ELAPSED', 'LOADED')))
+    entries = parse_importtime(result.stderr)
+
+    print(f"⏱️  create_app() cold start: {float(output['ELAPSED']):.3f}s "
+          f"({len(entries)} modules imported)")
+    print(f"\nTop {args.top} imports by cumulative time:")
+    for cumulative_us, module in sorted(entries, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {module}")
+
+    loaded = [m for m in output.get('LOADED', '').strip().split(',') if m]
+    if loaded:
+        print(f"\n❌ Heavy modules imported at start-up: {', '.join(loaded)}")
+        sys.exit(1)
+    print(f"\n✅ None of {', '.join(HEAVY_MODULES)} imported at start-up")
+
+if __name__ == "__main__":
+    profile_imports()
@@ -1,4 +1,5 @@
 from .web_routes import web_bp
 from .api_routes import api_bp
+from .metrics_routes import metrics_bp
 
-__all__ = ['web_bp', 'api_bp']
\ No newline at end of file
+__all__ = ['web_bp', 'api_bp', 'metrics_bp']
\ No newline at end of file
@@ -1,85 +1,133 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from database.schema import get_schema
-from llm.gemini_client import GeminiClient
-from llm.prompt_builder import (
-    build_sql_prompt, 
-    build_explanation_prompt,
-    build_natural_language_answer_prompt
+from llm.errors import LLMError
+from llm.resilience import request_deadline
+from utils.log import get_logger
+from utils.query_pipeline import iter_query_pipeline, run_query_pipeline
+from utils.serialization import (
+    RESULT_FORMATS, arrow_available, arrow_response, json_response,
+    requested_result_format, sse_event, to_columnar
 )
-from utils.validator import validate_sql
-from utils.executor import execute_query
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
-gemini_client = GeminiClient()
+log = get_logger(__name__)
 
 @api_bp.route('/query', methods=['POST'])
 def api_query():
     '''
     API endpoint for programmatic query access
     POST /api/query
-    Body: {"query": "natural language query", "include_raw_data": true/false}
+    Body: {"query": "natural language query", "include_raw_data": true/false,
+           "format": "rows" | "columnar" | "arrow"}
+    
+    rows returns results as one dict per row; columnar as column arrays
+    next to the column names; arrow as an Arrow IPC stream of the result
+    with sql, explanation and natural_answer in the schema metadata
+    (also selected by Accept: application/vnd.apache.arrow.stream)
     '''
     data = request.get_json()
     natural_query = data.get('query', '')
     include_raw_data = data.get('include_raw_data', True)
+    result_format = requested_result_format(data)
     
     if not natural_query:
         return jsonify({'error': 'Query parameter is required'}), 400
+    if result_format not in RESULT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(RESULT_FORMATS)}"}), 400
+    if result_format == 'arrow' and not arrow_available():
+        return jsonify({'error': 'Arrow output needs pyarrow installed (pip install pyarrow)'}), 400
     
     schema = get_schema()
     
     try:
-        # Generate SQL using Gemini
-        sql_prompt = build_sql_prompt(natural_query, schema)
-        sql = gemini_client.generate_sql(sql_prompt)
+        output = run_query_pipeline(natural_query, schema)
         
-        # Generate explanation
-        explanation_prompt = build_explanation_prompt(sql)
-        explanation = gemini_client.generate_explanation(explanation_prompt)
+        # Invalid SQL is a client error, a failed execution a server error
+        if output['error']:
+            return jsonify({
+                'error': output['error'],
+                'sql': output['sql'],
+                'explanation': output['explanation']
+            }), 400 if output['error_stage'] == 'validation' else 500
         
-        # Validate SQL
-        is_valid, error_msg, sql = validate_sql(sql)
+        result = output['results']
+        response = {
+            'sql': output['sql'],
+            'sql_source': output['sql_source'],
+            'repair_attempts': output['repair_attempts'],
+            'explanation': output['explanation'],
+            'natural_answer': output['natural_answer'],
+            'row_count': result['row_count'],
+            'columns': result['columns']
+        }
         
-        if not is_valid:
-            return jsonify({
-                'error': error_msg,
-                'sql': sql,
-                'explanation': explanation
-            }), 400
+        if result_format == 'arrow':
+            return arrow_response(result, metadata={
+                key: response[key] for key in ('sql', 'sql_source', 'explanation', 'natural_answer')
+            })
         
-        # Execute query
-        result = execute_query(sql)
+        # Optionally include raw data
+        if include_raw_data:
+            response['results'] = to_columnar(result) if result_format == 'columnar' else result
         
-        if result['success']:
-            # Generate natural language answer
-            nl_prompt = build_natural_language_answer_prompt(
-                natural_query, sql, result
-            )
-            natural_answer = gemini_client.generate_natural_language_answer(nl_prompt)
-            
-            response = {
-                'sql': sql,
-                'explanation': explanation,
-                'natural_answer': natural_answer,
-                'row_count': result['row_count'],
-                'columns': result['columns']
-            }
-            
-            # Optionally include raw data
-            if include_raw_data:
-                response['results'] = result
-            
-            return jsonify(response)
-        else:
-            return jsonify({
-                'error': result['error'],
-                'sql': sql,
-                'explanation': explanation
-            }), 500
-            
+        return json_response(response)
+    
+    except LLMError as e:
+        # Timeouts, quota and provider outages: retriable by the client
+        log.warning('query_llm_failed', query=natural_query, error=str(e), status=e.status)
+        return jsonify({'error': str(e), 'error_stage': 'llm'}), e.http_status
     except Exception as e:
+        log.exception('query_failed', query=natural_query)
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/query/stream', methods=['GET', 'POST'])
+def api_query_stream():
+    '''
+    Server-Sent Events version of /api/query
+    GET /api/query/stream?query=...&include_raw_data=false
+    POST /api/query/stream with the /api/query JSON body
+    
+    Events: sql (as soon as it is generated, again if it changes),
+    explanation, results (row_count and columns, plus columnar data with
+    include_raw_data), answer (natural language answer chunks as the model
+    produces them), then done, or error
+    '''
+    if request.method == 'POST':
+        data = request.get_json() or {}
+    else:
+        data = {
+            'query': request.args.get('query', ''),
+            'include_raw_data': request.args.get('include_raw_data', 'false').lower() == 'true'
+        }
+    natural_query = data.get('query', '')
+    include_raw_data = data.get('include_raw_data', False)
+    
+    if not natural_query:
+        return jsonify({'error': 'Query parameter is required'}), 400
+    
+    schema = get_schema()
+    
+    def events():
+        try:
+            with request_deadline():
+                for event, payload in iter_query_pipeline(natural_query, schema, stream_answer=True):
+                    if event == 'results':
+                        payload = to_columnar(payload) if include_raw_data else {
+                            'row_count': payload['row_count'], 'columns': payload['columns']
+                        }
+                    yield sse_event(event, payload)
+        except LLMError as e:
+            log.warning('query_stream_llm_failed', query=natural_query, error=str(e), status=e.status)
+            yield sse_event('error', {'error': str(e), 'error_stage': 'llm'})
+        except Exception as e:
+            log.exception('query_stream_failed', query=natural_query)
+            yield sse_event('error', {'error': str(e), 'error_stage': 'internal'})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @api_bp.route('/schema', methods=['GET'])
 def api_schema():
     '''
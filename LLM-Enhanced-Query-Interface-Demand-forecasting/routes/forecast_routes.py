@@ -1,18 +1,38 @@
 from flask import Blueprint, render_template, request, jsonify
-from forecasting.forecaster import Forecaster
-from inventory.calculations import InventoryCalculations
-from inventory.alerts import AlertGenerator
-from inventory.recommendations import RecommendationEngine
 from nlg.summarizer import NLGSummarizer
 from visualization.charts import ChartGenerator
 from database.connection import get_db_connection
-import traceback
+from utils.log import get_logger
+from utils.metrics import metrics
+
+# The forecasting and inventory stacks (pandas, NumPy, Prophet) are imported
+# inside the handlers so registering this blueprint stays cheap
 
 forecast_bp = Blueprint('forecast', __name__, url_prefix='/forecast')
+log = get_logger(__name__)
+
+def _inventory_state(pairs):
+    '''
+    Stored snapshot and policy for each (item_id, store_id) in one query
+    Series without a stored policy get InventoryCalculations.DEFAULT_POLICY
+    '''
+    from database.inventory_store import InventoryStore, dataframe_rows
+    from inventory.calculations import InventoryCalculations
+
+    state = InventoryStore().get_inventory_state(
+        pairs=pairs, defaults=InventoryCalculations.DEFAULT_POLICY
+    )
+    rows = (dict(zip(state.columns, values)) for values in dataframe_rows(state))
+    return {(row['item_id'], row['store_id']): row for row in rows}
 
 @forecast_bp.route('/', methods=['GET', 'POST'])
 def forecast_page():
     '''Forecast web interface'''
+    from forecasting.forecaster import Forecaster
+    from inventory.calculations import InventoryCalculations
+    from inventory.alerts import AlertGenerator
+    from inventory.recommendations import RecommendationEngine
+
     context = {
         'forecast_result': None,
         'inventory_metrics': None,
@@ -55,8 +75,12 @@ def forecast_page():
             return render_template('forecast.html', **context)
         
         try:
+            # Fall back to the stored snapshot and policy for this series
+            state = _inventory_state([(item_id, store_id)])[(item_id, store_id)]
+            if current_inv is None:
+                current_inv = state['on_hand']
+            
             # Generate forecast
-            print(f"Generating forecast for item: {item_id}, store: {store_id}, horizon: {horizon}")
             forecaster = Forecaster(model_name='prophet')
             forecast_result = forecaster.generate_forecast(item_id, store_id, horizon)
             
@@ -65,17 +89,20 @@ def forecast_page():
                 return render_template('forecast.html', **context)
             
             context['forecast_result'] = forecast_result
-            print(f"Forecast generated successfully: {len(forecast_result['forecast'])} predictions")
+            log.info('forecast_generated', item_id=item_id, store_id=store_id,
+                     horizon=horizon, predictions=len(forecast_result))
             
             # Calculate inventory metrics
             inventory_metrics = InventoryCalculations.calculate_all_metrics(
-                forecast_result['forecast'],
+                forecast_result,
                 current_inventory=current_inv,
-                lead_time_days=7,
-                service_level=0.95
+                lead_time_days=state['lead_time_days'],
+                service_level=state['service_level'],
+                order_cost=state['order_cost'],
+                holding_cost_per_unit=state['holding_cost_per_unit']
             )
             context['inventory_metrics'] = inventory_metrics
-            print(f"Inventory metrics calculated: ROP={inventory_metrics['reorder_point']}")
+            log.debug('inventory_metrics_calculated', reorder_point=inventory_metrics['reorder_point'])
             
             # Generate alerts
             alerts = AlertGenerator.generate_all_alerts(
@@ -84,7 +111,7 @@ def forecast_page():
                 current_inventory=current_inv
             )
             context['alerts'] = alerts
-            print(f"Generated {len(alerts)} alerts")
+            log.debug('alerts_generated', count=len(alerts))
             
             # Generate recommendations
             recommendations = RecommendationEngine.generate_recommendations(
@@ -93,21 +120,21 @@ def forecast_page():
                 current_inventory=current_inv
             )
             context['recommendations'] = recommendations
-            print(f"Generated {len(recommendations)} recommendations")
+            log.debug('recommendations_generated', count=len(recommendations))
             
             # Generate NLG summary
             try:
-                nlg = NLGSummarizer()
-                summary = nlg.generate_forecast_summary(
-                    forecast_result,
-                    inventory_metrics,
-                    alerts,
-                    recommendations
-                )
+                with metrics.span('nlg_summary', pipeline='forecast'):
+                    nlg = NLGSummarizer()
+                    summary = nlg.generate_forecast_summary(
+                        forecast_result,
+                        inventory_metrics,
+                        alerts,
+                        recommendations
+                    )
                 context['summary'] = summary
-                print("NLG summary generated successfully")
             except Exception as e:
-                print(f"NLG summary generation failed: {e}")
+                log.warning('nlg_summary_failed', error=str(e))
                 context['summary'] = f"⚠️ AI summary unavailable. Using basic summary.\n\n"
                 context['summary'] += f"Expected to sell {inventory_metrics['avg_daily_demand']:.1f} units/day "
                 context['summary'] += f"over the next {horizon} days (total: {inventory_metrics['total_forecast']:.0f} units). "
@@ -115,35 +142,33 @@ def forecast_page():
             
             # Generate chart data
             try:
-                chart_gen = ChartGenerator()
-                
-                # Main forecast chart
-                chart_data = chart_gen.create_forecast_chart(
-                    forecast_result['forecast'],
-                    forecast_result.get('historical_data')
-                )
-                context['chart_data'] = chart_data
-                
-                # Metrics chart
-                metrics_chart = chart_gen.create_metrics_chart(inventory_metrics)
-                context['metrics_chart'] = metrics_chart
-                
-                # Comparison chart
-                comparison_chart = chart_gen.create_demand_comparison_chart(
-                    forecast_result['summary']['historical_mean'],
-                    forecast_result['summary']['forecast_mean']
-                )
-                context['comparison_chart'] = comparison_chart
+                with metrics.span('charts', pipeline='forecast'):
+                    chart_gen = ChartGenerator()
+                    
+                    # Main forecast chart
+                    chart_data = chart_gen.create_forecast_chart(
+                        forecast_result.forecast_columns(),
+                        forecast_result.history
+                    )
+                    context['chart_data'] = chart_data
+                    
+                    # Metrics chart
+                    metrics_chart = chart_gen.create_metrics_chart(inventory_metrics)
+                    context['metrics_chart'] = metrics_chart
+                    
+                    # Comparison chart
+                    comparison_chart = chart_gen.create_demand_comparison_chart(
+                        forecast_result['summary']['historical_mean'],
+                        forecast_result['summary']['forecast_mean']
+                    )
+                    context['comparison_chart'] = comparison_chart
                 
-                print("Charts generated successfully")
-            except Exception as e:
-                print(f"Chart generation failed: {e}")
-                traceback.print_exc()
+            except Exception:
+                log.exception('chart_generation_failed', item_id=item_id, store_id=store_id)
             
         except Exception as e:
             context['error'] = f"Error: {str(e)}"
-            print(f"Forecast error: {e}")
-            traceback.print_exc()
+            log.exception('forecast_failed', item_id=item_id, store_id=store_id)
     
     return render_template('forecast.html', **context)
 
@@ -160,9 +185,20 @@ def api_generate_forecast():
         "horizon": 28,
         "current_inventory": 150,
         "lead_time_days": 7,
-        "service_level": 0.95
+        "service_level": 0.95,
+        "simulate": false,
+        "simulation_policy": "sQ"
     }
+    
+    current_inventory, lead_time_days and service_level default to the
+    stored inventory snapshot and policy for the series.
     '''
+    from forecasting.forecaster import Forecaster
+    from inventory.calculations import InventoryCalculations
+    from inventory.alerts import AlertGenerator
+    from inventory.recommendations import RecommendationEngine
+    from inventory.simulation import InventorySimulator
+
     try:
         data = request.get_json()
         
@@ -170,12 +206,26 @@ def api_generate_forecast():
         store_id = data.get('store_id')
         horizon = data.get('horizon', 28)
         current_inventory = data.get('current_inventory')
-        lead_time_days = data.get('lead_time_days', 7)
-        service_level = data.get('service_level', 0.95)
+        lead_time_days = data.get('lead_time_days')
+        service_level = data.get('service_level')
+        simulate = data.get('simulate', False)
+        simulation_policy = data.get('simulation_policy', 'sQ')
         
         if not item_id or not store_id:
             return jsonify({'error': 'item_id and store_id are required'}), 400
         
+        if simulate and simulation_policy not in InventorySimulator.POLICIES:
+            return jsonify({'error': f'simulation_policy must be one of {list(InventorySimulator.POLICIES)}'}), 400
+        
+        # Fill anything not in the payload from the stored snapshot and policy
+        state = _inventory_state([(item_id, store_id)])[(item_id, store_id)]
+        if current_inventory is None:
+            current_inventory = state['on_hand']
+        if lead_time_days is None:
+            lead_time_days = state['lead_time_days']
+        if service_level is None:
+            service_level = state['service_level']
+        
         # Generate forecast
         forecaster = Forecaster(model_name='prophet')
         forecast_result = forecaster.generate_forecast(item_id, store_id, horizon)
@@ -185,10 +235,12 @@ def api_generate_forecast():
         
         # Calculate inventory metrics
         inventory_metrics = InventoryCalculations.calculate_all_metrics(
-            forecast_result['forecast'],
+            forecast_result,
             current_inventory=current_inventory,
             lead_time_days=lead_time_days,
-            service_level=service_level
+            service_level=service_level,
+            order_cost=state['order_cost'],
+            holding_cost_per_unit=state['holding_cost_per_unit']
         )
         
         # Generate alerts
@@ -207,24 +259,39 @@ def api_generate_forecast():
         
         # Generate NLG summary
         try:
-            nlg = NLGSummarizer()
-            summary = nlg.generate_forecast_summary(
-                forecast_result,
-                inventory_metrics,
-                alerts,
-                recommendations
-            )
+            with metrics.span('nlg_summary', pipeline='forecast'):
+                nlg = NLGSummarizer()
+                summary = nlg.generate_forecast_summary(
+                    forecast_result,
+                    inventory_metrics,
+                    alerts,
+                    recommendations
+                )
         except Exception as e:
             summary = f"Forecast generated. Expected demand: {inventory_metrics['avg_daily_demand']:.1f} units/day"
         
-        return jsonify({
+        response = {
             'success': True,
-            'forecast': forecast_result,
-            'inventory_metrics': inventory_metrics,
-            'alerts': alerts,
-            'recommendations': recommendations,
+            # Arrays become records (ISO dates) only here
+            'forecast': forecast_result.to_dict(),
+            'inventory_metrics': inventory_metrics.to_dict(),
+            'alerts': [alert.to_dict() for alert in alerts],
+            'recommendations': [rec.to_dict() for rec in recommendations],
             'summary': summary
-        })
+        }
+        
+        # Optional Monte Carlo policy simulation over the forecast intervals
+        if simulate:
+            with metrics.span('simulation', pipeline='forecast'):
+                simulator = InventorySimulator()
+                response['simulation'] = simulator.simulate_forecast(
+                    forecast_result,
+                    inventory_metrics,
+                    current_inventory=current_inventory,
+                    policy=simulation_policy
+                )
+        
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -295,7 +362,12 @@ def api_batch_forecast():
         ],
         "horizon": 28
     }
+    
+    Inventory snapshots and policies for all items are read in one query.
     '''
+    from forecasting.forecaster import Forecaster
+    from inventory.calculations import InventoryCalculations
+
     try:
         data = request.get_json()
         items = data.get('items', [])
@@ -304,6 +376,11 @@ def api_batch_forecast():
         if not items:
             return jsonify({'error': 'items list is required'}), 400
         
+        states = _inventory_state([
+            (item.get('item_id'), item.get('store_id'))
+            for item in items if item.get('item_id') and item.get('store_id')
+        ])
+        
         forecaster = Forecaster(model_name='prophet')
         results = []
         
@@ -325,11 +402,14 @@ def api_batch_forecast():
                 
                 if forecast_result['success']:
                     # Calculate basic metrics
+                    state = states[(item_id, store_id)]
                     inventory_metrics = InventoryCalculations.calculate_all_metrics(
-                        forecast_result['forecast'],
-                        current_inventory=None,
-                        lead_time_days=7,
-                        service_level=0.95
+                        forecast_result,
+                        current_inventory=state['on_hand'],
+                        lead_time_days=state['lead_time_days'],
+                        service_level=state['service_level'],
+                        order_cost=state['order_cost'],
+                        holding_cost_per_unit=state['holding_cost_per_unit']
                     )
                     
                     results.append({
@@ -339,7 +419,10 @@ def api_batch_forecast():
                         'avg_daily_demand': inventory_metrics['avg_daily_demand'],
                         'total_forecast': inventory_metrics['total_forecast'],
                         'reorder_point': inventory_metrics['reorder_point'],
-                        'safety_stock': inventory_metrics['safety_stock']
+                        'safety_stock': inventory_metrics['safety_stock'],
+                        'eoq': inventory_metrics['eoq'],
+                        'current_inventory': state['on_hand'],
+                        'days_of_stock': inventory_metrics['days_of_stock']
                     })
                 else:
                     results.append({
@@ -372,6 +455,142 @@ def api_batch_forecast():
         }), 500
 
 
+@forecast_bp.route('/api/alerts/scan', methods=['POST'])
+def api_scan_alerts():
+    '''
+    Scan every item-store series for stockout, overstock and demand surge alerts
+    
+    POST /forecast/api/alerts/scan
+    Body: {
+        "store_id": "CA_1",          (optional, default: all stores)
+        "source": "auto",            (auto | cache | baseline)
+        "lead_time_days": 7,          (optional, default: stored policy)
+        "service_level": 0.95,        (optional, default: stored policy)
+        "limit": 100
+    }
+    '''
+    from database.inventory_store import dataframe_rows
+    from inventory.alert_scan import FleetAlertScanner
+    from inventory.demand_stats import DemandStatsLoader
+
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        store_id = data.get('store_id')
+        source = data.get('source', 'auto')
+        limit = data.get('limit', 100)
+        
+        if source not in DemandStatsLoader.SOURCES:
+            return jsonify({'error': f'source must be one of {list(DemandStatsLoader.SOURCES)}'}), 400
+        
+        scanner = FleetAlertScanner(
+            lead_time_days=data.get('lead_time_days'),
+            service_level=data.get('service_level'),
+            source=source
+        )
+        scan = scanner.scan(store_id=store_id, limit=limit)
+        alerts = scan['alerts']
+        
+        return jsonify({
+            'success': True,
+            'scope': scan['scope'],
+            'scanned_at': scan['scanned_at'],
+            'series_scanned': scan['series_scanned'],
+            'count': len(alerts),
+            'alerts': [dict(zip(alerts.columns, row)) for row in dataframe_rows(alerts)]
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@forecast_bp.route('/api/alerts', methods=['GET'])
+def api_list_alerts():
+    '''
+    Get the most recent stored alert scan
+    
+    GET /forecast/api/alerts
+    Query params: store_id (default: all stores), limit (default: 100)
+    '''
+    from database.inventory_store import InventoryStore, dataframe_rows
+
+    try:
+        scope = request.args.get('store_id') or 'ALL'
+        limit = request.args.get('limit', 100, type=int)
+        
+        alerts = InventoryStore().load_alerts(scope, limit)
+        
+        return jsonify({
+            'success': True,
+            'scope': scope,
+            'count': len(alerts),
+            'alerts': [dict(zip(alerts.columns, row)) for row in dataframe_rows(alerts)]
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@forecast_bp.route('/api/replenishment/plan', methods=['POST'])
+def api_replenishment_plan():
+    '''
+    Build a purchase-order plan for every SKU in a store or region
+    
+    POST /forecast/api/replenishment/plan
+    Body: {
+        "store_id": "CA_1",          (or "state_id": "CA"; default: all stores)
+        "source": "auto",            (auto | cache | baseline)
+        "budget": 25000,             (optional spend limit)
+        "capacity": 1200,            (optional volume limit)
+        "include_all": false,        (include SKUs that need no order)
+        "limit": 500
+    }
+    '''
+    from database.inventory_store import dataframe_rows
+    from inventory.demand_stats import DemandStatsLoader
+    from inventory.replenishment import ReplenishmentPlanner
+
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        source = data.get('source', 'auto')
+        limit = data.get('limit', 500)
+        
+        if source not in DemandStatsLoader.SOURCES:
+            return jsonify({'error': f'source must be one of {list(DemandStatsLoader.SOURCES)}'}), 400
+        
+        planner = ReplenishmentPlanner(source=source)
+        result = planner.plan(
+            store_id=data.get('store_id'),
+            state_id=data.get('state_id'),
+            budget=data.get('budget'),
+            capacity=data.get('capacity'),
+            include_all=data.get('include_all', False)
+        )
+        plan = result.pop('plan')
+        if limit:
+            plan = plan.head(limit)
+        
+        return jsonify({
+            'success': True,
+            **result,
+            'columns': list(plan.columns),
+            'rows': [list(row) for row in dataframe_rows(plan)]
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @forecast_bp.route('/test', methods=['GET'])
 def test_forecast():
     '''Test endpoint to verify forecast system is working'''
@@ -382,6 +601,9 @@ def test_forecast():
             'web_interface': '/forecast/',
             'api_generate': '/forecast/api/generate',
             'api_items': '/forecast/api/items',
-            'api_batch': '/forecast/api/batch'
+            'api_batch': '/forecast/api/batch',
+            'api_alerts_scan': '/forecast/api/alerts/scan',
+            'api_alerts': '/forecast/api/alerts',
+            'api_replenishment_plan': '/forecast/api/replenishment/plan'
         }
     })
@@ -0,0 +1,44 @@
+import time
+from flask import Blueprint, Response, g, request
+from utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.before_app_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@metrics_bp.after_app_request
+def _record_request(response):
+    '''
+    Per-endpoint latency and status counts for every request
+
+    Server-Sent Event streams are timed when the stream is closed, not when
+    the Response is returned before any event has been generated.
+    '''
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        method = request.method
+
+        def record():
+            metrics.observe('http_request_duration_seconds', time.perf_counter() - start,
+                            endpoint=endpoint, method=method)
+
+        if response.mimetype == 'text/event-stream':
+            response.call_on_close(record)
+        else:
+            record()
+        metrics.inc('http_requests_total', endpoint=endpoint, method=method,
+                    status=response.status_code)
+    return response
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    '''
+    Phase timings, LLM token counts, cache hit/miss counts and result row
+    counts in Prometheus text format
+
+    GET /metrics
+    '''
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
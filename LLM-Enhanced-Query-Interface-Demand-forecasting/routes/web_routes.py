@@ -1,16 +1,8 @@
 from flask import Blueprint, render_template, request
 from database.schema import get_schema
-from llm.gemini_client import GeminiClient
-from llm.prompt_builder import (
-    build_sql_prompt, 
-    build_explanation_prompt,
-    build_natural_language_answer_prompt
-)
-from utils.validator import validate_sql
-from utils.executor import execute_query
+from utils.query_pipeline import run_query_pipeline
 
 web_bp = Blueprint('web', __name__)
-gemini_client = GeminiClient()
 
 @web_bp.route('/', methods=['GET', 'POST'])
 def index():
@@ -31,36 +23,12 @@ def index():
         
         if natural_query:
             try:
-                # Generate SQL using Gemini
-                sql_prompt = build_sql_prompt(natural_query, schema)
-                sql = gemini_client.generate_sql(sql_prompt)
-                
-                # Generate explanation
-                explanation_prompt = build_explanation_prompt(sql)
-                explanation = gemini_client.generate_explanation(explanation_prompt)
-                context['explanation'] = explanation
-                
-                # Validate SQL
-                is_valid, error_msg, sql = validate_sql(sql)
-                context['sql_query'] = sql
-                
-                if not is_valid:
-                    context['error'] = error_msg
-                else:
-                    # Execute query
-                    result = execute_query(sql)
-                    
-                    if result['success']:
-                        context['results'] = result
-                        
-                        # Generate natural language answer from results
-                        nl_prompt = build_natural_language_answer_prompt(
-                            natural_query, sql, result
-                        )
-                        natural_answer = gemini_client.generate_natural_language_answer(nl_prompt)
-                        context['natural_answer'] = natural_answer
-                    else:
-                        context['error'] = result['error']
+                output = run_query_pipeline(natural_query, schema)
+                context['sql_query'] = output['sql']
+                context['explanation'] = output['explanation']
+                context['results'] = output['results']
+                context['natural_answer'] = output['natural_answer']
+                context['error'] = output['error']
                         
             except Exception as e:
                 context['error'] = f"Error processing query: {str(e)}"
@@ -1,4 +1,5 @@
 from .validator import validate_sql
 from .executor import execute_query
+from .result_cache import ResultCache, result_cache, normalize_sql
 
-__all__ = ['validate_sql', 'execute_query']
\ No newline at end of file
+__all__ = ['validate_sql', 'execute_query', 'ResultCache', 'result_cache', 'normalize_sql']
\ No newline at end of file
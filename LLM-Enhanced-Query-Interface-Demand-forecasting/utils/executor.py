@@ -1,14 +1,29 @@
+from config import Config
 from database.connection import get_db_connection
+from .query_rewriter import rewrite_for_rollups
+from .result_cache import result_cache
 
-def execute_query(sql):
+def execute_query(sql, use_cache=True):
     '''
     Execute SQL query and return results
+    Identical queries (after normalisation) are answered from the result
+    cache until the database changes; aggregates the rollup tables can
+    answer are redirected to them
     Returns: dict with success status, columns, data, and row_count
     '''
+    use_cache = use_cache and Config.RESULT_CACHE_ENABLED
+    if use_cache:
+        cached = result_cache.get(sql)
+        if cached is not None:
+            return cached
+        # Taken before running, so a write that lands mid-query is noticed
+        cache_version = result_cache.version()
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute(sql)
+        run_sql = (rewrite_for_rollups(sql, conn) if Config.ROLLUPS_ENABLED else None) or sql
+        cursor.execute(run_sql)
         
         # Get column names
         columns = [description[0] for description in cursor.description]
@@ -17,12 +32,15 @@ def execute_query(sql):
         rows = cursor.fetchall()
         results = [dict(row) for row in rows]
         
-        return {
+        output = {
             'success': True,
             'columns': columns,
             'data': results,
             'row_count': len(results)
         }
+        if use_cache:
+            result_cache.set(sql, output, cache_version)
+        return output
     except Exception as e:
         return {
             'success': False,
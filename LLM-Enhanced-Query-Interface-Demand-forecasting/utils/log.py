@@ -0,0 +1,111 @@
+import json
+import logging
+import sys
+import threading
+from config import Config
+
+ROOT_LOGGER = 'app'
+
+_configured = False
+_configure_lock = threading.Lock()
+
+class StructuredFormatter(logging.Formatter):
+    '''
+    Render records as `time level logger event key=value ...` or one JSON
+    object per line (LOG_FORMAT=json)
+    '''
+
+    def __init__(self, fmt='text'):
+        super().__init__()
+        self.fmt = fmt
+
+    @staticmethod
+    def _text_value(value):
+        if not isinstance(value, str):
+            return json.dumps(value, default=str, separators=(',', ':'))
+        return json.dumps(value) if (' ' in value or '=' in value or not value) else value
+
+    def format(self, record):
+        fields = getattr(record, 'fields', {})
+        timestamp = self.formatTime(record, '%Y-%m-%dT%H:%M:%S')
+        logger = record.name[len(ROOT_LOGGER) + 1:] or record.name
+
+        if self.fmt == 'json':
+            payload = {'ts': timestamp, 'level': record.levelname, 'logger': logger,
+                       'event': record.getMessage(), **fields}
+            if record.exc_info:
+                payload['exc_info'] = self.formatException(record.exc_info)
+            return json.dumps(payload, default=str)
+
+        line = f"{timestamp} {record.levelname:<7} {logger} {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f"{k}={self._text_value(v)}" for k, v in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+def configure_logging(level=None, fmt=None):
+    '''
+    Attach the structured handler to the application logger
+
+    Args:
+        level: Level name, defaults to Config.LOG_LEVEL
+        fmt: 'text' or 'json', defaults to Config.LOG_FORMAT
+    '''
+    global _configured
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(StructuredFormatter(fmt or Config.LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel((level or Config.LOG_LEVEL).upper())
+        root.propagate = False
+        _configured = True
+
+class StructuredLogger:
+    '''
+    Logger taking an event name and keyword fields
+
+    Fields whose value is callable are only evaluated when the level is
+    enabled, so expensive diagnostics cost nothing at higher levels:
+
+        log.debug('data_quality', stats=lambda: expensive_stats(df))
+    '''
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+    def is_enabled_for(self, level):
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level, event, fields, exc_info=False):
+        if not self._logger.isEnabledFor(level):
+            return
+        resolved = {k: v() if callable(v) else v for k, v in fields.items()}
+        self._logger.log(level, event, exc_info=exc_info, extra={'fields': resolved},
+                         stacklevel=3)
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        '''Log at ERROR with the active exception's traceback'''
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+def get_logger(name):
+    '''Structured logger for a module, configuring logging on first use'''
+    if not _configured:
+        configure_logging()
+    return StructuredLogger(name)
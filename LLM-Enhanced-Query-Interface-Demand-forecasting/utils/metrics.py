@@ -0,0 +1,172 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+
+# name: (prometheus type, help text)
+METRIC_DEFINITIONS = {
+    'phase_duration_seconds': ('summary', 'Time spent in each request phase'),
+    'http_request_duration_seconds': ('summary', 'End-to-end request latency per endpoint'),
+    'http_requests_total': ('counter', 'Requests served per endpoint and status code'),
+    'llm_requests_total': ('counter', 'LLM calls by outcome'),
+    'llm_stream_fallbacks_total': ('counter', 'Streaming LLM calls retried without streaming'),
+    'llm_tokens_total': ('counter', 'LLM tokens used, by prompt/completion'),
+    'llm_queue_seconds': ('summary', 'Time LLM calls waited for rate limit quota and a slot'),
+    'llm_queue_timeouts_total': ('counter', 'LLM calls rejected after waiting too long in the queue'),
+    'llm_coalesced_total': ('counter', 'LLM calls served by an identical prompt already in flight'),
+    'llm_retries_total': ('counter', 'LLM attempts retried, by the error that caused the retry'),
+    'llm_hedges_total': ('counter', 'Hedged duplicate LLM requests, by whether the hedge answered first'),
+    'llm_circuit_state': ('gauge', 'LLM circuit breaker state (0 closed, 1 half-open, 2 open)'),
+    'llm_circuit_transitions_total': ('counter', 'LLM circuit breaker state changes, by new state'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and hit/miss'),
+    'cache_stale_results_total': ('counter', 'Results not cached because the database changed while they ran'),
+    'query_result_rows': ('summary', 'Rows returned per executed query'),
+    'answer_results_tokens': ('summary', 'Estimated tokens of query results in answer prompts'),
+    'sql_templates_total': ('counter', 'Questions by matched SQL template (none = sent to the LLM)'),
+    'sql_structured_output_total': ('counter', 'Combined SQL + explanation replies, by how they parsed'),
+    'sql_repairs_total': ('counter', 'SQL repair attempts by the stage that failed'),
+    'sql_repair_results_total': ('counter', 'Queries that needed repair, by final outcome'),
+    'rollup_rewrites_total': ('counter', 'Queries redirected from sales_long to a rollup table'),
+    'few_shot_examples_total': ('counter', 'Few-shot examples retrieved into prompts and captured'),
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+class _Summary:
+    '''Count, sum and a sliding window of recent samples for quantiles'''
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return [(q, math.nan) for q in QUANTILES]
+        last = len(ordered) - 1
+        return [(q, ordered[min(last, int(math.ceil(q * len(ordered))) - 1)]) for q in QUANTILES]
+
+class MetricsRegistry:
+    '''In-process counters, gauges and latency summaries rendered as Prometheus text'''
+
+    def __init__(self, window=None):
+        self.window = window or Config.METRICS_WINDOW
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        '''Add value to a counter'''
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        '''Set a gauge to value'''
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        '''Record one sample in a summary'''
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary(self.window)
+            summary.observe(float(value))
+
+    @contextmanager
+    def span(self, phase, **labels):
+        '''Time the enclosed block into phase_duration_seconds'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('phase_duration_seconds', time.perf_counter() - start,
+                         phase=phase, **labels)
+
+    def snapshot(self, name):
+        '''
+        Current values of one metric, for logging and tests
+
+        Returns:
+            dict of label tuple -> counter or gauge value, or -> dict with count,
+            sum and p50/p95/p99 for summaries
+        '''
+        with self._lock:
+            metric_type = METRIC_DEFINITIONS.get(name, ('counter',))[0]
+            if metric_type in ('counter', 'gauge'):
+                values = self._gauges if metric_type == 'gauge' else self._counters
+                return {key: value for (n, key), value in values.items() if n == name}
+            return {
+                key: dict(count=s.count, sum=s.total,
+                          **{f'p{int(q * 100)}': v for q, v in s.quantiles()})
+                for (n, key), s in self._summaries.items() if n == name
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    def render(self):
+        '''Prometheus text exposition format (version 0.0.4)'''
+        with self._lock:
+            counters = sorted(self._counters.items()) + sorted(self._gauges.items())
+            summaries = sorted(
+                (key, s.count, s.total, s.quantiles()) for key, s in self._summaries.items()
+            )
+
+        by_name = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+            )
+        for (name, labels), count, total, quantiles in summaries:
+            lines = by_name.setdefault(name, [])
+            for q, value in quantiles:
+                lines.append(f"{name}{_format_labels(labels, [('quantile', str(q))])} {_format_value(value)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        output = []
+        for name in sorted(by_name):
+            metric_type, help_text = METRIC_DEFINITIONS.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {metric_type}")
+            output.extend(by_name[name])
+        return '\n'.join(output) + '\n'
+
+# Process-wide registry used by the routes, LLM client and caches
+metrics = MetricsRegistry()
@@ -0,0 +1,238 @@
+from config import Config
+from llm.gemini_client import get_gemini_client
+from llm.resilience import request_deadline
+from llm.few_shot import example_library
+from llm.sql_templates import match_sql_template, format_template_answer
+from llm.prompt_builder import (
+    build_sql_prompt,
+    build_sql_repair_prompt,
+    build_explanation_prompt,
+    build_natural_language_answer_prompt
+)
+from .validator import validate_sql
+from .executor import execute_query
+from .log import get_logger
+from .metrics import metrics
+
+log = get_logger(__name__)
+
+def run_query_pipeline(natural_query, schema):
+    '''
+    Natural language question -> SQL -> results -> natural language answer
+
+    Shared by the web and API routes; every phase is timed into
+    phase_duration_seconds{pipeline="query"}. Common parameterised questions
+    are answered from SQL templates (llm.sql_templates) without calling the
+    LLM at all. SQL that fails validation or execution is sent back to the
+    LLM with the error, up to Config.SQL_REPAIR_ATTEMPTS times. All LLM
+    calls share one Config.LLM_REQUEST_BUDGET_SECONDS time budget.
+
+    Args:
+        natural_query: The user's question
+        schema: Schema dict from get_schema()
+
+    Returns:
+        dict with sql, sql_source ('template' or 'llm'), explanation, results,
+        natural_answer, repair_attempts, error and error_stage ('validation'
+        or 'execution') when the final SQL still failed
+
+    Raises:
+        LLMError: An LLM call failed after its retries, or the budget ran out
+    '''
+    output = {
+        'sql': None,
+        'sql_source': None,
+        'explanation': None,
+        'results': None,
+        'natural_answer': None,
+        'repair_attempts': 0,
+        'error': None,
+        'error_stage': None
+    }
+    with request_deadline():
+        for event, data in iter_query_pipeline(natural_query, schema):
+            if event == 'results':
+                output['results'] = data
+            elif event in ('sql', 'explanation', 'error', 'done'):
+                output.update(data)
+    return output
+
+def iter_query_pipeline(natural_query, schema, stream_answer=False):
+    '''
+    The query pipeline as a sequence of (event, data) pairs, for streaming
+
+    Events, in order:
+        sql: {sql, sql_source, repair_attempts}, again whenever the SQL to run
+             changes (LIMIT added by validation, repairs)
+        explanation: {explanation}
+        results: the execute_query result
+        answer: {text}, one chunk of the natural language answer (a single
+                chunk unless stream_answer is set)
+        done: {natural_answer}
+    A failure ends the sequence with error: {sql, error, error_stage}, after
+    the explanation only when one came with the SQL (no LLM call is made to
+    explain SQL that failed). Run it inside request_deadline() to bound the time
+    spent on LLM calls.
+    '''
+    # Try the SQL templates before the LLM
+    template = None
+    if Config.SQL_TEMPLATES_ENABLED:
+        with metrics.span('match_template', pipeline='query'):
+            template = match_sql_template(natural_query)
+        metrics.inc('sql_templates_total', template=template['template'] if template else 'none')
+
+    explanation = None
+    if template:
+        sql = template['sql']
+        sql_source = 'template'
+        explanation = template['explanation']
+    else:
+        sql_source = 'llm'
+
+        # Retrieve similar verified questions as few-shot examples
+        with metrics.span('retrieve_examples', pipeline='query'):
+            examples = example_library.search(natural_query)
+
+        # Generate SQL using Gemini, with its explanation in the same call
+        with metrics.span('generate_sql', pipeline='query'):
+            sql, explanation = _generate_sql(natural_query, schema, examples)
+
+    # Sent before validation so a streaming client sees it as early as possible
+    yield 'sql', {'sql': sql, 'sql_source': sql_source, 'repair_attempts': 0}
+
+    sql, result, error, error_stage, repair_attempts, repair_explanation = yield from _validate_and_execute(
+        natural_query, sql, schema, sql_source
+    )
+    if repair_attempts:
+        # Repaired SQL came from the LLM, so it gets the LLM's explanation and answer
+        template = None
+        explanation = repair_explanation
+
+    if error:
+        # No explanation call for SQL that is reported as failed
+        if explanation is not None:
+            yield 'explanation', {'explanation': explanation}
+        yield 'error', {'sql': sql, 'error': error, 'error_stage': error_stage}
+        return
+
+    # Generate explanation unless it came with the SQL
+    if explanation is None:
+        with metrics.span('generate_explanation', pipeline='query'):
+            explanation_prompt = build_explanation_prompt(sql)
+            explanation = get_gemini_client().generate_explanation(explanation_prompt)
+    yield 'explanation', {'explanation': explanation}
+
+    metrics.observe('query_result_rows', result['row_count'])
+    yield 'results', result
+
+    if template:
+        natural_answer = format_template_answer(template, result)
+        yield 'answer', {'text': natural_answer}
+        yield 'done', {'natural_answer': natural_answer}
+        return
+
+    # Queries that ran and returned rows become examples for later questions
+    example_library.capture(natural_query, sql, result['row_count'])
+
+    # Generate natural language answer from results
+    with metrics.span('natural_language_answer', pipeline='query'):
+        nl_prompt = build_natural_language_answer_prompt(natural_query, sql, result)
+        gemini_client = get_gemini_client()
+        if stream_answer:
+            chunks = []
+            for chunk in gemini_client.generate_natural_language_answer_stream(nl_prompt):
+                chunks.append(chunk)
+                yield 'answer', {'text': chunk}
+            natural_answer = ''.join(chunks).strip()
+        else:
+            natural_answer = gemini_client.generate_natural_language_answer(nl_prompt)
+            yield 'answer', {'text': natural_answer}
+
+    yield 'done', {'natural_answer': natural_answer}
+
+def _generate_sql(natural_query, schema, examples):
+    '''
+    SQL for the question, and its explanation when the combined call worked
+
+    With Config.SQL_STRUCTURED_OUTPUT one prompt asks for both as JSON; a
+    reply without usable SQL falls back to the plain SQL prompt.
+
+    Returns:
+        (sql, explanation or None)
+    '''
+    return _generate_sql_and_explanation(
+        natural_query, lambda **kwargs: build_sql_prompt(natural_query, schema, examples, **kwargs)
+    )
+
+def _generate_sql_and_explanation(natural_query, build_prompt):
+    '''
+    Combined SQL + explanation call (Config.SQL_STRUCTURED_OUTPUT), falling
+    back to the plain SQL prompt when the reply has no usable SQL
+
+    Args:
+        build_prompt: Prompt builder taking with_explanation
+
+    Returns:
+        (sql, explanation or None)
+    '''
+    client = get_gemini_client()
+    if Config.SQL_STRUCTURED_OUTPUT:
+        sql, explanation = client.generate_sql_with_explanation(build_prompt(with_explanation=True))
+        if sql:
+            metrics.inc('sql_structured_output_total', outcome='parsed' if explanation else 'sql_only')
+            return sql, explanation
+        metrics.inc('sql_structured_output_total', outcome='fallback')
+        log.info('sql_structured_output_unparsed', query=natural_query)
+
+    return client.generate_sql(build_prompt()), None
+
+def _validate_and_execute(natural_query, sql, schema, sql_source):
+    '''
+    Validate and run sql, asking the LLM to repair it after each failure
+
+    Only the SQL (and, in the same call, its explanation) is regenerated;
+    the error message and the schema of the tables involved go into the
+    repair prompt. Yields an sql event whenever
+    the SQL about to run differs from the one last sent.
+
+    Returns:
+        (final sql, execute_query result or None, error or None, error
+        stage, number of repairs, explanation that came with the last
+        repair or None)
+    '''
+    repair_attempts = 0
+    explanation = None
+    sent = (sql, 0)
+    while True:
+        with metrics.span('validate_sql', pipeline='query'):
+            is_valid, error, sql = validate_sql(sql)
+
+        if (sql, repair_attempts) != sent:
+            sent = (sql, repair_attempts)
+            yield 'sql', {'sql': sql, 'sql_source': sql_source, 'repair_attempts': repair_attempts}
+
+        if is_valid:
+            with metrics.span('execute_query', pipeline='query'):
+                result = execute_query(sql)
+            if result['success']:
+                if repair_attempts:
+                    metrics.inc('sql_repair_results_total', outcome='repaired')
+                return sql, result, None, None, repair_attempts, explanation
+            error, error_stage = result['error'], 'execution'
+        else:
+            error_stage = 'validation'
+
+        if repair_attempts >= Config.SQL_REPAIR_ATTEMPTS:
+            if repair_attempts:
+                metrics.inc('sql_repair_results_total', outcome='failed')
+            return sql, None, error, error_stage, repair_attempts, explanation
+
+        repair_attempts += 1
+        metrics.inc('sql_repairs_total', stage=error_stage)
+        log.info('sql_repair', stage=error_stage, attempt=repair_attempts, error=error)
+        with metrics.span('repair_sql', pipeline='query'):
+            sql, explanation = _generate_sql_and_explanation(
+                natural_query,
+                lambda **kwargs: build_sql_repair_prompt(natural_query, sql, error, schema, **kwargs)
+            )
+        sql_source = 'llm'
@@ -0,0 +1,245 @@
+import re
+from database.rollups import ROLLUP_GRAINS, RollupStore
+from .metrics import metrics
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'\x00(\d+)\x00')
+_IDENTIFIER = re.compile(r'\b([a-z_]\w*)\b(?!\s*\()')
+_ALIAS = re.compile(r'\bas\s+"?(\w+)')
+_TABLE_SOURCE = re.compile(r'\bfrom\s+(\(|"?(\w+)"?\s*,?)')
+
+# Keywords that may appear around the allowed columns; anything else that
+# looks like an identifier (another table, item_id, rowid, a table alias,
+# JOIN ... ON) means the query cannot be answered from a rollup
+SQL_KEYWORDS = {
+    'select', 'from', 'where', 'group', 'by', 'order', 'limit', 'offset', 'having', 'as',
+    'and', 'or', 'not', 'in', 'is', 'null', 'like', 'glob', 'between', 'case', 'when', 'then',
+    'else', 'end', 'distinct', 'asc', 'desc', 'all', 'union', 'except', 'intersect', 'exists',
+    'integer', 'real', 'text', 'numeric', 'collate', 'nocase', 'escape',
+}
+ROLLUP_COLUMNS = {'date', 'store_id', 'state_id', 'dept_id', 'cat_id', 'sales'}
+
+_AGGREGATE_CALL = re.compile(r'\b(?:sum|avg|count|min|max|total|group_concat)\s*\(')
+_SALES_AGGREGATE = re.compile(r'\b(?:sum|avg|count)\s*\(\s*sales\s*\)')
+_OTHER_COUNT = re.compile(r'\bcount\s*\(\s*(?!\*|1\s*\)|sales\s*\)|distinct\b)')
+_MONTH_EXPRESSION = re.compile(r'\bstrftime\s*\(\s*\x00(\d+)\x00\s*,\s*date\s*\)', re.IGNORECASE)
+
+# COUNT over no rows is 0 where SUM is NULL, hence the COALESCE
+_REPLACEMENTS = [
+    (re.compile(r'\bcount\s*\(\s*(?:\*|1|sales)\s*\)', re.IGNORECASE), 'COALESCE(SUM(n_rows), 0)'),
+    (re.compile(r'\bavg\s*\(\s*sales\s*\)', re.IGNORECASE), '(SUM(sales) * 1.0 / SUM(n_rows))'),
+]
+
+def _select_list_end(code):
+    '''Index of the outermost query's first FROM (end of its select list)'''
+    depth = 0
+    for match in re.finditer(r'[()]|\bfrom\b', code, re.IGNORECASE):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            return match.start()
+    return len(code)
+
+def _split_top_level(text, separator=','):
+    '''Split on separator outside parentheses'''
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+def _without_aggregates(expr):
+    '''expr with every aggregate call (and its arguments) removed'''
+    while True:
+        match = _AGGREGATE_CALL.search(expr)
+        if match is None:
+            return expr
+        depth, end = 0, len(expr)
+        for i in range(match.end() - 1, len(expr)):
+            if expr[i] == '(':
+                depth += 1
+            elif expr[i] == ')':
+                depth -= 1
+                if depth == 0:
+                    end = i + 1
+                    break
+        expr = expr[:match.start()] + ' ' + expr[end:]
+
+def _query_parts(lower):
+    '''
+    Every simple SELECT in the statement, subqueries and compound members
+    included
+
+    Returns:
+        List of (start, text) where text has the SELECTs nested in it
+        blanked out (same length, so offsets still line up with lower)
+    '''
+    spans, stack = [(0, len(lower))], []
+    for i, char in enumerate(lower):
+        if char == '(':
+            stack.append((i, re.match(r'\(\s*select\b', lower[i:]) is not None))
+        elif char == ')' and stack:
+            start, is_query = stack.pop()
+            if is_query:
+                spans.append((start + 1, i))
+
+    parts = []
+    for start, end in spans:
+        text = lower[start:end]
+        for inner_start, inner_end in spans:
+            if start < inner_start and inner_end < end:
+                text = (text[:inner_start - start] + ' ' * (inner_end - inner_start)
+                        + text[inner_end - start:])
+        offset = 0
+        for member in re.split(r'(\b(?:union\s+all|union|intersect|except)\b)', text):
+            if member.strip() and not re.fullmatch(r'union\s+all|union|intersect|except', member):
+                parts.append((start + offset, member))
+            offset += len(member)
+    return parts
+
+def _is_grouped(part):
+    '''
+    True when a simple SELECT aggregates (GROUP BY or an aggregate function)
+    and every column in its select list is grouped on or aggregated, so it
+    returns the same rows from a rollup as from sales_long
+    '''
+    select_end = _select_list_end(part)
+    select_list = re.sub(r'^\s*select\s+(?:distinct\s+|all\s+)?', '', part[:select_end])
+    items = [re.sub(r'\s+as\s+"?\w+"?$', '', item) for item in _split_top_level(select_list)]
+    aliases = {alias: item for item, alias in zip(items, (
+        (_ALIAS.search(raw) or [None, None])[1] for raw in _split_top_level(select_list)))}
+
+    group = re.search(r'\bgroup\s+by\b(.*?)(?=\bhaving\b|\border\s+by\b|\blimit\b|$)',
+                      part, re.DOTALL)
+    if group is None and not any(_AGGREGATE_CALL.search(item) for item in items):
+        return False
+
+    terms = set()
+    for term in _split_top_level(group.group(1)) if group else []:
+        if term.isdigit() and 0 < int(term) <= len(items):
+            term = items[int(term) - 1]
+        terms.add(' '.join(aliases.get(term, term).split()))
+    grouped_columns = {term for term in terms if re.fullmatch(r'\w+', term)}
+
+    for item in items:
+        if ' '.join(item.split()) in terms:
+            continue
+        for match in _IDENTIFIER.finditer(_without_aggregates(item)):
+            if match.group(1) not in SQL_KEYWORDS and match.group(1) not in grouped_columns:
+                return False
+    return True
+
+def _choose_grain(lower, literals):
+    '''
+    'monthly' when date is only used as strftime('%Y-%m', date) (or not at
+    all), otherwise 'daily'
+    '''
+    date_uses = sum(1 for m in _IDENTIFIER.finditer(lower) if m.group(1) == 'date')
+    month_uses = [m for m in _MONTH_EXPRESSION.finditer(lower)
+                  if literals[int(m.group(1))] == "'%Y-%m'"]
+    return 'monthly' if date_uses == len(month_uses) else 'daily'
+
+def rewrite_for_rollups(sql, conn):
+    '''
+    Redirect an aggregate over sales_long to the matching rollup table
+
+    Applies when the query reads only sales_long (subqueries included), uses
+    only the store/state/department/category/date columns, and touches sales
+    only through SUM, AVG or COUNT. Every SELECT reading sales_long must
+    aggregate, with each selected column grouped on or aggregated; only
+    those SELECTs are rewritten, so an outer aggregate over a derived table
+    keeps counting its rows. COUNT and AVG are rewritten over n_rows.
+    Queries that group or filter by month only use the monthly rollup,
+    everything else the daily one. Rewritten aggregates in the select list
+    keep their original column names.
+
+    Args:
+        sql: Validated SELECT statement
+        conn: Connection used to check the rollups are up to date
+
+    Returns:
+        Rewritten SQL, or None when the query must run against sales_long
+    '''
+    if 'sales_long' not in sql.lower():
+        return None
+
+    # Equal literals share a placeholder, so a repeated expression such as
+    # strftime('%Y-%m', date) in SELECT and GROUP BY still compares equal
+    literals = []
+
+    def mask(match):
+        if match.group(0) not in literals:
+            literals.append(match.group(0))
+        return f"\x00{literals.index(match.group(0))}\x00"
+
+    code = _LITERAL.sub(mask, sql)
+    lower = code.lower()
+
+    if re.search(r'\bselect\s+(?:distinct\s+)?\*|\.\s*\*', lower):
+        return None
+    for match in _TABLE_SOURCE.finditer(lower):
+        if match.group(1) != '(' and (match.group(2) != 'sales_long' or match.group(1).endswith(',')):
+            return None
+    aliases = set(_ALIAS.findall(lower))
+    for match in _IDENTIFIER.finditer(lower):
+        word = match.group(1)
+        if word not in SQL_KEYWORDS and word not in ROLLUP_COLUMNS and word not in aliases \
+                and word != 'sales_long':
+            return None
+    if re.search(r'\bsales\b', _SALES_AGGREGATE.sub('', lower)) or _OTHER_COUNT.search(lower):
+        return None
+
+    grain = _choose_grain(lower, literals)
+    table, period, _ = ROLLUP_GRAINS[grain]
+    if not RollupStore(conn).is_fresh():
+        return None
+
+    # Only SELECTs reading sales_long directly are rewritten; aggregates
+    # over a derived table count its rows, not sales rows
+    regions = []
+    for start, part in _query_parts(lower):
+        source = _TABLE_SOURCE.search(part)
+        if source is None or source.group(1) == '(':
+            continue
+        if not _is_grouped(part):
+            return None
+        regions.append((start, part, start + _select_list_end(part)))
+
+    replacements = list(_REPLACEMENTS)
+    if grain == 'monthly':
+        replacements.append((_MONTH_EXPRESSION, period))
+    combined = re.compile('|'.join(f'(?P<r{i}>{pattern.pattern})'
+                                   for i, (pattern, _) in enumerate(replacements)), re.IGNORECASE)
+    flat = [' '] * len(code)
+    for start, part, _ in regions:
+        flat[start:start + len(part)] = part
+
+    pieces, last = [], 0
+    for match in combined.finditer(''.join(flat)):
+        select_end = next(select for start, part, select in regions
+                          if start <= match.start() < start + len(part))
+        index = next(int(name[1:]) for name, value in match.groupdict().items() if value is not None)
+        pieces.append(code[last:match.start()])
+        pieces.append(replacements[index][1])
+        # Unaliased select-list expressions would otherwise be renamed
+        if match.start() < select_end and re.match(r'\s*(,|from\b)', code[match.end():], re.IGNORECASE):
+            original = _PLACEHOLDER.sub(lambda m: literals[int(m.group(1))], code[match.start():match.end()])
+            pieces.append(' AS "' + original.replace('"', '""') + '"')
+        last = match.end()
+    pieces.append(code[last:])
+
+    rewritten = ''.join(pieces)
+    rewritten = re.sub(r'\bsales_long\b', table, rewritten)
+    rewritten = _PLACEHOLDER.sub(lambda m: literals[int(m.group(1))], rewritten)
+
+    metrics.inc('rollup_rewrites_total', table=table)
+    return rewritten
@@ -0,0 +1,218 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from config import Config
+from .metrics import metrics
+
+# String literals and quoted identifiers are kept verbatim when normalising
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|[^\s'\"]+")
+_WORD = re.compile(r'\b[A-Za-z]+\b')
+_TABLE_REFERENCE = re.compile(r'\b(?:from|join)\s+["`\[]?(\w+)', re.IGNORECASE)
+
+# Clause keywords lower-cased in the cache key. The outermost select list is
+# kept verbatim: SQLite names an unaliased result column after the expression
+# exactly as written (SUM(x), x IS NULL, spacing included)
+SQL_KEYWORDS = {
+    'select', 'from', 'where', 'group', 'by', 'order', 'limit', 'offset', 'having', 'as',
+    'and', 'or', 'not', 'in', 'is', 'like', 'between', 'on', 'join', 'inner', 'left',
+    'outer', 'cross', 'asc', 'desc', 'distinct', 'union', 'all', 'with', 'exists',
+}
+_WORD_OR_PAREN = re.compile(r'[()]|\b[A-Za-z]+\b')
+
+def _select_list_span(sql):
+    '''(start, end) of the outermost select list, or None when sql has none'''
+    depth, start = 0, None
+    for token in _SQL_TOKEN.finditer(sql):
+        if token.group(0)[0] in '\'"' or token.group(0).isspace():
+            continue
+        for match in _WORD_OR_PAREN.finditer(token.group(0)):
+            word = match.group(0)
+            if word == '(':
+                depth += 1
+            elif word == ')':
+                depth -= 1
+            elif depth == 0 and start is None and word.lower() == 'select':
+                start = token.start() + match.end()
+            elif depth == 0 and start is not None and word.lower() == 'from':
+                return start, token.start() + match.start()
+    return None if start is None else (start, len(sql))
+
+def _normalize_clauses(sql):
+    parts = []
+    for token in _SQL_TOKEN.findall(sql):
+        if token[0] in '\'"':
+            parts.append(token)
+        elif token.isspace():
+            parts.append(' ')
+        else:
+            parts.append(_WORD.sub(
+                lambda m: m.group(0).lower() if m.group(0).lower() in SQL_KEYWORDS else m.group(0),
+                token
+            ))
+    return ''.join(parts)
+
+def normalize_sql(sql):
+    '''
+    Cache key for sql: whitespace collapsed and keywords lower-cased outside
+    string literals and the outermost select list, trailing semicolons dropped
+    '''
+    sql = sql.strip().rstrip(';').strip()
+    span = _select_list_span(sql)
+    if span is None:
+        return _normalize_clauses(sql)
+    start, end = span
+    return ' '.join(part for part in (
+        _normalize_clauses(sql[:start]).strip(), sql[start:end].strip(),
+        _normalize_clauses(sql[end:]).strip()
+    ) if part)
+
+def referenced_tables(sql):
+    '''Lower-cased names of the tables sql reads from'''
+    return frozenset(name.lower() for name in _TABLE_REFERENCE.findall(sql))
+
+def _database_token():
+    '''Changes whenever the database file (or its WAL) is written'''
+    path = Config.DATABASE_PATH
+    token = [path]
+    for suffix in ('', '-wal'):
+        try:
+            stat = os.stat(f"{path}{suffix}")
+            token += [stat.st_mtime_ns, stat.st_size]
+        except (OSError, TypeError):
+            token += [None, None]
+    return tuple(token)
+
+class ResultCache:
+    '''
+    Thread-safe LRU cache of execute_query results keyed on normalised SQL
+
+    Results are stored column by column (one tuple per column) and expanded
+    back into row dicts on a hit. The cache is bounded by entries and by the
+    total number of cells, and emptied when the database file changes. The
+    app's own writes go through record_write so they only drop the entries
+    reading the written tables.
+
+    A query that was running while the database changed must not be cached:
+    callers take version() before executing and pass it to set(), which
+    drops the result if any invalidation happened in between.
+    '''
+
+    def __init__(self, max_entries=256, max_cells=2_000_000, name='query_results'):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_cells = max_cells
+        self._entries = OrderedDict()
+        self._cells = 0
+        self._token = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_token(self):
+        '''Drop everything if the database changed behind our back (lock held)'''
+        token = _database_token()
+        if token != self._token:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._cells = 0
+            self._token = token
+            self._generation += 1
+
+    def version(self):
+        '''Marker of the database state results are cached for; see set()'''
+        with self._lock:
+            self._check_token()
+            return self._generation
+
+    def get(self, sql):
+        '''Return a fresh execute_query-style result dict, or None'''
+        key = normalize_sql(sql)
+        with self._lock:
+            self._check_token()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                metrics.inc('cache_requests_total', cache=self.name, result='miss')
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.inc('cache_requests_total', cache=self.name, result='hit')
+        columns, values, _, _ = entry
+        return {
+            'success': True,
+            'columns': list(columns),
+            'data': [dict(zip(columns, row)) for row in zip(*values)],
+            'row_count': len(values[0]) if values else 0
+        }
+
+    def set(self, sql, result, version=None):
+        '''
+        Store a successful execute_query result
+
+        Args:
+            version: version() taken before the query ran; the result is
+                     dropped if the database changed since
+        '''
+        columns = tuple(result['columns'])
+        cells = len(columns) * result['row_count']
+        if cells > self.max_cells:
+            return
+        values = tuple(tuple(row.get(col) for row in result['data']) for col in columns)
+        key = normalize_sql(sql)
+        with self._lock:
+            self._check_token()
+            if version is not None and version != self._generation:
+                metrics.inc('cache_stale_results_total', cache=self.name)
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._cells -= old[2]
+            self._entries[key] = (columns, values, cells, referenced_tables(sql))
+            self._cells += cells
+            while len(self._entries) > self.max_entries or self._cells > self.max_cells:
+                _, evicted = self._entries.popitem(last=False)
+                self._cells -= evicted[2]
+
+    def record_write(self, *tables):
+        '''
+        Note a write made by the app itself
+
+        Entries reading any of tables are dropped and the current file state
+        becomes the new baseline, so the rest of the cache survives.
+        '''
+        written = {t.lower() for t in tables}
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e[3] & written]:
+                self._cells -= self._entries.pop(key)[2]
+            self._token = _database_token()
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._cells = 0
+            self._generation += 1
+
+    def stats(self):
+        '''Hit/miss counters and size for monitoring'''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'cells': self._cells,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Shared by execute_query
+result_cache = ResultCache(Config.RESULT_CACHE_SIZE, Config.RESULT_CACHE_MAX_CELLS)
+
+def record_database_write(*tables):
+    '''Tell the result cache that the app wrote to tables'''
+    result_cache.record_write(*tables)
@@ -0,0 +1,141 @@
+import gzip
+import json
+from flask import Response, request
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+RESULT_FORMATS = ('rows', 'columnar', 'arrow')
+
+# Streams and already-encoded bodies are passed through untouched
+_UNCOMPRESSED_MIMETYPES = ('text/event-stream', 'image/', 'application/gzip', 'application/zip')
+
+def to_columnar(result):
+    '''
+    execute_query result as column arrays
+
+    Returns:
+        dict with columns (names), data (one list per column, in the same
+        order) and row_count
+    '''
+    columns = result['columns']
+    rows = result['data']
+    return {
+        'columns': columns,
+        'data': [[row.get(col) for row in rows] for col in columns],
+        'row_count': result['row_count']
+    }
+
+def _default(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+def dumps(payload):
+    '''Compact JSON bytes, through orjson when it is installed'''
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=_default).encode('utf-8')
+
+def json_response(payload, status=200):
+    '''Like jsonify, but with the faster compact encoder'''
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def sse_event(event, data):
+    '''One Server-Sent Events message with a JSON payload'''
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+def arrow_response(result, metadata=None, status=200):
+    '''
+    Result columns as an Apache Arrow IPC stream
+
+    Args:
+        result: execute_query result
+        metadata: str -> str pairs stored in the schema metadata (sql,
+                  explanation, natural answer, ...)
+    '''
+    # Imported here: pyarrow is optional and slow to import
+    import pyarrow as pa
+
+    columnar = to_columnar(result)
+    arrays = []
+    for values in columnar['data']:
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # SQLite columns may mix types; fall back to text
+            arrays.append(pa.array([None if v is None else str(v) for v in values]))
+    table = pa.Table.from_arrays(arrays, names=columnar['columns'])
+    table = table.replace_schema_metadata({k: str(v) for k, v in (metadata or {}).items() if v is not None})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), status=status, mimetype=ARROW_MIMETYPE)
+
+def arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def requested_result_format(data):
+    '''
+    Result format for an API request: the "format" field of the body,
+    else an Arrow Accept header, else Config.API_RESULT_FORMAT
+    '''
+    if data.get('format'):
+        return data['format']
+    if ARROW_MIMETYPE in request.headers.get('Accept', ''):
+        return 'arrow'
+    return Config.API_RESULT_FORMAT
+
+def _accepted_encodings():
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            accepted.add(name.lower())
+    return accepted
+
+def compress_response(response):
+    '''
+    Compress the body with br or gzip, as negotiated from Accept-Encoding
+
+    Registered as an after_request hook; small, streamed, already-encoded
+    and binary responses are left alone.
+    '''
+    if (not Config.RESPONSE_COMPRESSION
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or (response.mimetype or '').startswith(_UNCOMPRESSED_MIMETYPES)):
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    accepted = _accepted_encodings()
+    if brotli is not None and 'br' in accepted:
+        encoding, compressed = 'br', brotli.compress(body, quality=Config.RESPONSE_BROTLI_QUALITY)
+    elif 'gzip' in accepted:
+        encoding, compressed = 'gzip', gzip.compress(body, compresslevel=Config.RESPONSE_GZIP_LEVEL)
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
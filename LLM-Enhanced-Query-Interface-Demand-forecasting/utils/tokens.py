@@ -0,0 +1,3 @@
+def estimate_tokens(text):
+    '''Rough LLM token count (about 4 characters per token for English and SQL)'''
+    return (len(text) + 3) // 4
@@ -8,9 +8,10 @@ def validate_sql(sql):
     '''
     sql_lower = sql.lower().strip()
     
-    # Check for dangerous operations
+    # Check for dangerous operations (whole words, so columns such as
+    # created_at or updated_at are not mistaken for CREATE or UPDATE)
     for keyword in Config.DANGEROUS_KEYWORDS:
-        if keyword in sql_lower:
+        if re.search(rf'\b{keyword}\b', sql_lower):
             return False, f"Dangerous operation detected: {keyword.upper()}", sql
     
     # Ensure it's a SELECT query
@@ -1,41 +1,107 @@
-import json
-from datetime import datetime
+from config import Config
+
+def _columns(data, fields):
+    '''
+    Chart series as NumPy arrays, from a DataFrame, a dict of columns or a
+    list of row dicts; missing numeric values become 0
+
+    Returns:
+        dict of field -> float array, plus 'dates' (datetime64[D] or, for
+        unparseable dates, the raw values) and 'days' (x positions for LTTB)
+    '''
+    import numpy as np
+
+    if hasattr(data, 'columns'):
+        raw = {f: data[f].to_numpy() for f in fields if f in data.columns}
+    elif isinstance(data, dict):
+        raw = {f: np.asarray(data[f]) for f in fields if f in data}
+    else:
+        rows = list(data)
+        raw = {f: np.array([row.get(f) for row in rows]) for f in fields}
+
+    length = len(raw['date'])
+    columns = {}
+    for field in fields[1:]:
+        values = raw.get(field)
+        columns[field] = (np.zeros(length) if values is None
+                          else np.nan_to_num(np.asarray(values, dtype=np.float64)))
+
+    try:
+        dates = np.asarray(raw['date'], dtype='datetime64[D]')
+        days = dates.astype(np.int64)
+    except (TypeError, ValueError):
+        try:
+            # Strings with a time part only parse at second resolution
+            dates = np.asarray(raw['date'], dtype='datetime64[s]').astype('datetime64[D]')
+            days = dates.astype(np.int64)
+        except (TypeError, ValueError):
+            dates = np.asarray(raw['date'], dtype=object)
+            days = np.arange(length)
+    columns['dates'] = dates
+    columns['days'] = days
+    return columns
+
+def _date_labels(dates):
+    '''YYYY-MM-DD strings for a datetime64[D] array, in one vectorized call'''
+    import numpy as np
+
+    if np.issubdtype(dates.dtype, np.datetime64):
+        return np.datetime_as_string(dates, unit='D').tolist()
+    return [str(d) for d in dates]
+
+def _values(values):
+    '''Plain floats for the chart JSON, rounded to keep the payload small'''
+    import numpy as np
+
+    return np.round(values, 3).tolist()
 
 class ChartGenerator:
     '''Generate charts for visualization'''
     
     @staticmethod
-    def create_forecast_chart(forecast_data, historical_data=None):
+    def create_forecast_chart(forecast_data, historical_data=None, max_points=None):
         '''
         Create forecast chart data for Chart.js visualization
         
+        Columns are handled as NumPy arrays: dates are formatted in one
+        vectorized pass and series longer than max_points are reduced with
+        LTTB downsampling, so multi-year histories keep a constant payload.
+        
         Args:
-            forecast_data: List of dicts with forecast predictions
-            historical_data: Optional list of dicts with historical sales
+            forecast_data: Forecast predictions (date, predicted_demand,
+                           lower_bound, upper_bound) as a DataFrame, a dict
+                           of columns or a list of row dicts
+            historical_data: Optional historical sales (date, sales), same forms
+            max_points: Points kept across history and forecast,
+                        Config.CHART_MAX_POINTS by default
         
         Returns:
             dict with chart configuration for Chart.js
         '''
-        # Extract dates and values from forecast
-        forecast_dates = []
-        predicted = []
-        lower = []
-        upper = []
-        
-        for f in forecast_data:
-            # Handle date formatting
-            date_val = f.get('date')
-            if hasattr(date_val, 'strftime'):
-                date_str = date_val.strftime('%Y-%m-%d')
-            elif isinstance(date_val, str):
-                date_str = date_val
-            else:
-                date_str = str(date_val)
-            
-            forecast_dates.append(date_str)
-            predicted.append(float(f.get('predicted_demand', 0)))
-            lower.append(float(f.get('lower_bound', 0)))
-            upper.append(float(f.get('upper_bound', 0)))
+        # Imported here: downsample needs NumPy, kept out of app start-up
+        from .downsample import lttb_indices
+        
+        max_points = max_points or Config.CHART_MAX_POINTS
+        forecast = _columns(forecast_data, ('date', 'predicted_demand', 'lower_bound', 'upper_bound'))
+        history = _columns(historical_data, ('date', 'sales')) if historical_data is not None else None
+        if history is not None and not len(history['dates']):
+            history = None
+        
+        # The forecast keeps its full resolution unless it alone exceeds the
+        # budget; the history gets what is left
+        forecast_keep = lttb_indices(forecast['days'], forecast['predicted_demand'], max_points)
+        forecast_dates = _date_labels(forecast['dates'][forecast_keep])
+        predicted = _values(forecast['predicted_demand'][forecast_keep])
+        lower = _values(forecast['lower_bound'][forecast_keep])
+        upper = _values(forecast['upper_bound'][forecast_keep])
+        
+        if history is not None:
+            history_points = max(max_points - len(forecast_keep), Config.CHART_MIN_HISTORY_POINTS)
+            history_keep = lttb_indices(history['days'], history['sales'], history_points)
+            hist_dates = _date_labels(history['dates'][history_keep])
+            hist_sales = _values(history['sales'][history_keep])
+        else:
+            hist_dates = hist_sales = None
         
         # Build chart configuration
         chart_data = {
@@ -45,22 +111,7 @@ class ChartGenerator:
         }
         
         # Add historical data if available
-        if historical_data:
-            hist_dates = []
-            hist_sales = []
-            
-            for h in historical_data:
-                date_val = h.get('date')
-                if hasattr(date_val, 'strftime'):
-                    date_str = date_val.strftime('%Y-%m-%d')
-                elif isinstance(date_val, str):
-                    date_str = date_val
-                else:
-                    date_str = str(date_val)
-                
-                hist_dates.append(date_str)
-                hist_sales.append(float(h.get('sales', 0)))
-            
+        if hist_dates is not None:
             chart_data['labels'] = hist_dates + forecast_dates
             
             # Historical sales dataset
@@ -78,7 +129,7 @@ class ChartGenerator:
             chart_data['labels'] = forecast_dates
         
         # Predicted demand dataset
-        predicted_offset = [None] * (len(historical_data) if historical_data else 0)
+        predicted_offset = [None] * (len(hist_dates) if hist_dates is not None else 0)
         chart_data['datasets'].append({
             'label': 'Predicted Demand',
             'data': predicted_offset + predicted,
@@ -0,0 +1,47 @@
+import numpy as np
+
+def lttb_indices(x, y, threshold):
+    '''
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    point kept from the previous bucket and the average of the next one.
+    Peaks and troughs survive, unlike with plain striding or averaging.
+
+    Args:
+        x: Increasing x values (e.g. day numbers)
+        y: y values, same length; NaN is treated as 0
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted integer index array into x and y (all indices when there are
+        no more than threshold points)
+    '''
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n) if threshold >= n else np.linspace(0, n - 1, max(threshold, 0)).astype(np.intp)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    # Bucket edges over the points between the first and the last
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.intp)
+    # Average point of every bucket, for use as the "next" vertex
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        bx, by = x[start:stop], y[start:stop]
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected